@@ -0,0 +1,255 @@
+# benchmark
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Benchmarks of the genealogy objects and of the seed of a GEDCOM
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from objects import Individual, Family
+from genealogy import Genealogy
+
+# --------------------------------------------------------------------------------------------------
+#
+# dict based objects (_object, Data, Individual and Family as before the slotted records) for comparison
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class _DictObject(dict):
+
+    def __init__(self, defaults, *args, **kwargs):
+        super().__init__(defaults, *args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if key not in self.keys():
+            display(f"Object new key [{key}] with value [{value}]", error=True)
+        super().__setitem__(key, value)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __getattr__(self, key):
+        return self.get(key, None)
+
+    def __contains__(self, item):
+        return hasattr(self, item) and not getattr(self, item, None) is None
+
+
+class _DictData(_DictObject):
+
+    def __init__(self, family, *args, **kwargs):
+        if family:
+            defaults = {
+                'gedcomid': None,
+                'spousesid': [],
+                'childsid': []
+            }
+            events = ['marriage', 'divorce']
+
+        else:
+            defaults = {
+                'gedcomid': None,
+                'url': None,
+                'firstname': None,
+                'lastname': None,
+                'sex': None,
+                'occupation': None,
+                'notes': [],
+                'familyid': None,
+                'parentsid': [],
+                'siblingsid': [],
+                'familiesid': []
+            }
+            events = ['birth', 'death', 'baptem', 'burial']
+
+        for event in events:
+            defaults[f"{event}"] = defaults[f"{event}date"] = defaults[f"{event}place"] = None
+
+        super().__init__(defaults, *args, **kwargs)
+
+
+class _DictIndividual(_DictObject):
+
+    def __init__(self, *args, **kwargs):
+        defaults = {
+            'ref': None,
+            'data': _DictData(family=False),
+            'parentsref': [],
+            'siblingsref': [],
+            'familiesref': [],
+            'families': [],
+        }
+
+        super().__init__(defaults, *args, **kwargs)
+
+
+class _DictFamily(_DictObject):
+
+    def __init__(self, *args, **kwargs):
+        defaults = {
+            'spousesref': [],
+            'data': _DictData(family=True),
+            'childsref': [],
+        }
+
+        super().__init__(defaults, *args, **kwargs)
+
+# --------------------------------------------------------------------------------------------------
+#
+# benchmark
+#
+# --------------------------------------------------------------------------------------------------
+
+
+def benchmark(name, individual, family, size):
+    """
+    Function to measure the memory and time to build and read a tree of individuals
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+
+    tree = []
+    for idx in range(size):
+        person = individual()
+        person.ref = f"p=first{idx}&n=last{idx}"
+        person.data.firstname = f"First{idx}"
+        person.data.lastname = f"Last{idx}"
+        person.data.birthdate = "1 JAN 1900"
+        person.parentsref = [f"p=father{idx}&n=last{idx}", f"p=mother{idx}&n=last{idx}"]
+        person.families = [family()]
+        tree += [person]
+
+    build = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    count = sum(1 for person in tree if person.data.birthdate and person.data.lastname)
+    read = time.perf_counter() - start_time
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    display(f"{name:>8}: {size:,} individuals, {current / 1024 / 1024:,.1f} MB, build {build:,.2f}s, read {read:,.3f}s ({count:,})")
+
+    return current
+
+# --------------------------------------------------------------------------------------------------
+#
+# seed
+#
+# --------------------------------------------------------------------------------------------------
+
+
+def gedcom(path, size):
+    """
+    Function to write a GEDCOM of ancestors: the parents of idx are 2 * idx + 1 and 2 * idx + 2
+    """
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("0 HEAD\n1 CHAR UTF-8\n")
+
+        for idx in range(size):
+            file.write(f"0 @I{idx}@ INDI\n1 NAME First{idx} /Name{idx % 500}/\n1 SEX {'M' if idx % 2 else 'F'}\n"
+                       f"1 BIRT\n2 DATE {1 + idx % 28} JAN {1700 + idx % 300}\n2 PLAC Paris, Paris, Île-de-France, France\n"
+                       "3 MAP\n4 LATI N48.8534\n4 LONG E2.3488\n"
+                       f"1 DEAT\n2 DATE {1 + idx % 28} FEB {1760 + idx % 300}\n2 PLAC Lyon, Rhône, Auvergne-Rhône-Alpes, France\n"
+                       "3 MAP\n4 LATI N45.7485\n4 LONG E4.8467\n"
+                       f"1 SOUR https://gw.geneanet.org/bench?lang=fr&n=name{idx % 500}&p=first{idx}\n"
+                       f"1 NOTE Note of the individual {idx} with a few words about the life of First{idx}\n")
+            if 2 * idx + 2 < size:
+                file.write(f"1 FAMC @F{idx}@\n")
+            if idx > 0:
+                file.write(f"1 FAMS @F{(idx - 1) // 2}@\n")
+
+        for idx in range(size):
+            if 2 * idx + 2 < size:
+                file.write(f"0 @F{idx}@ FAM\n1 HUSB @I{2 * idx + 1}@\n1 WIFE @I{2 * idx + 2}@\n1 CHIL @I{idx}@\n"
+                           f"1 MARR\n2 DATE {1690 + idx % 300}\n")
+
+        file.write("0 TRLR\n")
+
+
+def seed(path):
+    """
+    Function to measure the time to seed a genealogy with a GEDCOM
+    """
+
+    megabytes = Path(path).stat().st_size / 1024 / 1024
+
+    start_time = time.perf_counter()
+    genealogy = Genealogy(0, False, False, False)
+    genealogy.seed(path)
+    duration = time.perf_counter() - start_time
+
+    display(f"    seed: {megabytes:,.1f} MB, {len(genealogy.individuals):,} individuals, {len(genealogy.families):,} families, "
+            f"{duration:,.2f}s ({megabytes / duration:,.1f} MB/s)")
+
+    return duration
+
+###################################################################################################################################
+# main
+###################################################################################################################################
+
+
+def main():
+    """
+    Main function to compare the dict based and the slotted records or to measure the seed of a GEDCOM
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the genealogy objects")
+    parser.add_argument("-n", "--size", default=100000, type=int, help="Number of individuals (100000 by default)")
+    parser.add_argument("--seed", default=False, action='store_true', help="Measure the seed of a GEDCOM instead (off by default)")
+    parser.add_argument("--gedcom", default=None, type=str, help="GEDCOM file to seed (one of --size individuals is generated by default)")
+    args = parser.parse_args()
+
+    if args.seed:
+        if args.gedcom is not None:
+            seed(args.gedcom)
+        else:
+            with tempfile.TemporaryDirectory() as folder:
+                path = Path(folder) / "benchmark.ged"
+                gedcom(path, args.size)
+                seed(path)
+        return
+
+    before = benchmark("dict", _DictIndividual, _DictFamily, args.size)
+    after = benchmark("slots", Individual, Family, args.size)
+
+    display(f"Slotted records use {after / before:.0%} of the dict based memory")
+
+
+if __name__ == '__main__':
+    main()
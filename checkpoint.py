@@ -0,0 +1,206 @@
+# checkpoint
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the checkpoints of a crawl to resume it after a crash or an interruption
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import os
+import pickle
+import signal
+import time
+from pathlib import Path
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from storage import DiskStore
+
+# --------------------------------------------------------------------------------------------------
+#
+# Checkpoint class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Checkpoint:
+    """
+    Class to save the state of a crawl atomically (temporary file, fsync and rename)
+    A checkpoint is due every interval seconds or every count visits
+    The state only holds the frontier of the crawl, the records changed since the last checkpoint are added to a store on disk
+    """
+
+    # set by the SIGINT handler to stop the crawl at the next visit (see handle_sigint)
+    stop = False
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path, interval=60, count=100):
+
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._interval = interval
+        self._count = count
+
+        self._last = time.monotonic()
+        self._visits = 0
+
+        # records (individuals, families, notes...) saved so far, opened on first use
+        self._records_path = self._path.with_suffix(".sqlite")
+        self._records = None
+
+    # -------------------------------------------------------------------------
+    # _store
+    # -------------------------------------------------------------------------
+
+    def _store(self):
+        """
+        Function to open the store of the records
+        """
+
+        if self._records is None:
+            self._records = DiskStore(self._records_path, cache_size=0, mutable=False)
+
+        return self._records
+
+    # -------------------------------------------------------------------------
+    # due
+    # -------------------------------------------------------------------------
+
+    def due(self):
+        """
+        Function to count one visit and check if a checkpoint is due
+        """
+
+        self._visits += 1
+
+        return self._visits >= self._count or time.monotonic() - self._last >= self._interval
+
+    # -------------------------------------------------------------------------
+    # save
+    # -------------------------------------------------------------------------
+
+    def save(self, state, records=()):
+        """
+        Function to add the records changed: (key, object) then to write the state atomically
+        The records are committed before the state, a state read back never refers to missing records
+        """
+
+        store = self._store()
+        count = 0
+        for key, value in records:
+            store[key] = value
+            count += 1
+        store.flush()
+
+        temporary = self._path.with_suffix(self._path.suffix + ".tmp")
+
+        with open(temporary, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, self._path)
+
+        self._last = time.monotonic()
+        self._visits = 0
+
+        display(f"Checkpoint saved: {self._path} ({count:,} records added)")
+
+    # -------------------------------------------------------------------------
+    # load
+    # -------------------------------------------------------------------------
+
+    def load(self):
+        """
+        Function to read the last state saved (None if none)
+        """
+
+        if not self._path.exists():
+            return None
+
+        try:
+            with open(self._path, "rb") as file:
+                state = pickle.load(file)
+        except Exception as e:
+            display(f"Checkpoint load: {type(e).__name__}", error=True)
+            return None
+
+        display(f"Checkpoint loaded: {self._path}")
+
+        return state
+
+    # -------------------------------------------------------------------------
+    # records
+    # -------------------------------------------------------------------------
+
+    def records(self):
+        """
+        Function to read the records saved by the checkpoints: (key, object) in the order saved
+        """
+
+        if self._records is None and not self._records_path.exists():
+            return iter(())
+
+        return self._store().items()
+
+    # -------------------------------------------------------------------------
+    # remove
+    # -------------------------------------------------------------------------
+
+    def remove(self):
+        """
+        Function to remove the checkpoint once the crawl is complete (or started again)
+        """
+
+        if self._records is not None:
+            self._records.close()
+            self._records = None
+
+        self._path.unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{self._records_path}{suffix}").unlink(missing_ok=True)
+
+    # -------------------------------------------------------------------------
+    # handle_sigint
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def handle_sigint(cls):
+        """
+        Function to stop the crawl after the current visit on Ctrl-C (a second Ctrl-C interrupts at once)
+        Installed once for all the checkpoints, returns the previous handler
+        """
+
+        def handler(signum, frame):
+            if cls.stop:
+                signal.default_int_handler(signum, frame)
+            cls.stop = True
+            display("Interrupted: saving checkpoint after the current individual (Ctrl-C again to stop now)", error=True)
+
+        return signal.signal(signal.SIGINT, handler)
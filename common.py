@@ -23,10 +23,14 @@ Package with common elements
 #
 # ---------------------------------------------------------------------------------------------------------------------------------
 
+from collections.abc import Mapping
 from pathlib import Path
 from datetime import datetime
 import base64
+import logging
+import re
 import traceback
+import unicodedata
 
 # https://www.selenium.dev
 # https://pypi.org/project/selenium/
@@ -44,22 +48,21 @@ from selenium.common.exceptions import TimeoutException
 # pip3 install bs4
 from bs4 import BeautifulSoup
 
-# https://wkhtmltopdf.org
-# download and install
-# https://pypi.org/project/pdfkit/
-# pip3 install pdfkit
-import pdfkit
-
 # https://rich.readthedocs.io/en/stable/
 # https://pypi.org/project/rich/
 # pip3 install rich
 
-from rich.console import Console
 from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.text import Text
-from rich.pretty import pprint
-from rich.pretty import Pretty
+from rich.table import Table
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+from logs import logger, console, plain, segment
+from renderer import renderer
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 # get_folder
@@ -76,63 +79,80 @@ def get_folder():
     return folder
 
 # ---------------------------------------------------------------------------------------------------------------------------------
-# display
+# fold
 # ---------------------------------------------------------------------------------------------------------------------------------
 
 
-console = Console(record=True, width=132)
+def fold(text):
+    """
+    Function to fold a text for comparison: lower case, no accent, no punctuation, single spaces
+    """
+
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", ' ', text.replace('œ', 'oe').replace('æ', 'ae'))
+
+    return text.strip()
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+# display
+# ---------------------------------------------------------------------------------------------------------------------------------
 
 
-def display(what=None, title=None, level=0, error=False, exception=False):
+def display(what=None, title=None, level=0, error=False, exception=False, verbose=False):
     """
-    Function to print with Rich console
+    Function to log a record (printed by the Rich console view if any)
+    Nothing is done when the level of the record (debug if verbose, error or info) is disabled
     """
 
-    try:
-        if isinstance(what, list):
-            if title:
-                console.print('\n', Panel(Text(title), style="green"))
-            console.print(Pretty(what))
+    severity = logging.ERROR if error or exception else logging.DEBUG if verbose else logging.INFO
+    if not logger.isEnabledFor(severity):
+        return
 
-        elif isinstance(what, dict):
+    try:
+        record = {'kind': 'text', 'title': title}
+        message = ""
 
-            if title:
-                console.print('\n', Panel(Text(title), style="green"))
-            console.print(Pretty(what))
+        if isinstance(what, (list, Mapping)):
+            record['kind'] = 'data'
+            record['data'] = plain(what)
 
         elif isinstance(what, str):
+            message = what
             if exception:
-                #console.print(Panel(Text(traceback.format_exc()), title=what, style="red"))
-                console.print(Panel(Text(what), style="red"))
-                console.print(traceback.format_exc())
-
+                record['kind'] = 'exception'
+                record['trace'] = traceback.format_exc()
             elif error:
-                console.print(Text(f"[ERROR] {what}",style="bright_white on red"))
-
+                record['kind'] = 'error'
             elif level == 1:
-                console.print(Panel(Text(what.upper()), style="black"))
-
+                record['kind'] = 'heading'
             elif level > 1:
-                console.print('\n', Panel(Text(what), style="cyan"), '\n')
-
+                record['kind'] = 'section'
             elif title:
-                # console.print(Panel(Text(what), title=title))
-                console.print('\n', Panel(Text(title), style="cyan"))
-                console.print(what)
-
-            else:
-                console.print(Text(what))
+                record['kind'] = 'titled'
 
         elif isinstance(what, Markdown):
+            record['kind'] = 'markdown'
+            message = what.markup
 
-            console.print(what)
+        elif isinstance(what, Table):
+            record['kind'] = 'table'
+            record['data'] = {
+                'columns': [str(column.header) for column in what.columns],
+                'rows': [list(row) for row in zip(*[[str(cell) for cell in column.cells] for column in what.columns])],
+            }
 
         elif what:
-            pprint(what)
+            record['kind'] = 'data'
+            record['data'] = plain(what)
+
+        else:
+            return
+
+        logger.log(severity, message, extra=record)
 
     except Exception as e:
-        display(f"Display: {type(e).__name__}", error=True)
-        console.print_exception(show_locals=False, max_frames=1)
+        logger.error(f"Display: {type(e).__name__}", extra={'kind': 'error'})
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 # console_clear
@@ -152,31 +172,25 @@ def console_clear():
 
 def console_save(output):
     """
-    Function to save text from Rich console into a PDF file
+    Function to save the records of the current segment into a JSON Lines file and a PDF file
+    The PDF file is rendered by a worker process, the main process goes on at once (see renderer)
     """
 
-    content = console.export_html(inline_styles=True)
-
-    output_file = Path(output).resolve().with_suffix(".pdf")
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    output_file.unlink(missing_ok=True)
-
-    start_time = datetime.now()
-    display(f"Writing pdfkit {len(content):,} bytes to {str(output_file.relative_to(Path(get_folder())))} at {start_time.strftime('%H:%M:%S')}...")
+    spool = segment(output)
+    if spool is None:
+        return None
 
-    options = {
-    'orientation': 'landscape',     # Set the orientation to landscape
-    'page-size': 'A4',              # Optional: Page size
-    'encoding': 'UTF-8',            # Make sure to set encoding to UTF-8
-    'dpi': 72,                      # Reduces the DPI for lower quality but smaller file size
-    }
+    name = str(spool.with_suffix(".pdf").relative_to(Path(get_folder()).resolve()))
+    display(f"Rendering {name} at {datetime.now().strftime('%H:%M:%S')}...")
 
-    pdfkit.from_string(content, str(output_file), options=options)
-
-    duration = (datetime.now() - start_time).total_seconds()
-    display(f"... completed in {duration:,.2f}s\n")
+    def done(future):
+        try:
+            _, pages, duration = future.result()
+            display(f"... {name}: {pages:,} pages rendered in {duration:,.2f}s\n")
+        except Exception as e:
+            display(f"... {name}: {type(e).__name__} {e}", error=True)
 
-    console._record_buffer = []
+    return renderer.submit(spool, output, done)
 
 # -------------------------------------------------------------------------
 # load_chrome
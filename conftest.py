@@ -0,0 +1,18 @@
+"""
+Fixtures of the tests: the output files go to a temporary folder instead of the iCloud folder of the user
+"""
+
+import importlib
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def folder(tmp_path_factory):
+    path = tmp_path_factory.mktemp("GeneanetScrap")
+
+    # common first: the modules imported afterwards get the temporary folder too
+    with pytest.MonkeyPatch.context() as patch:
+        for name in ('common', 'countries', 'gazetteer', 'geneanet'):
+            patch.setattr(importlib.import_module(name), 'get_folder', lambda: path)
+        yield path
@@ -0,0 +1,248 @@
+# countries
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with a lazily loaded multilingual index of countries
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import gettext
+import hashlib
+import json
+from importlib import metadata
+
+# https://pypi.org/project/pycountry/
+# pip3 install pycountry
+import pycountry
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display, fold, get_folder
+
+# --------------------------------------------------------------------------------------------------
+#
+# Countries class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Countries:
+    """
+    Class to get the ISO 3166 alpha 2 code of a country from its english, french or historical name
+    or from its alpha 2 or alpha 3 code (written in upper case only: "DE" is Germany, "De" is not)
+    """
+
+    # version of the saved index (the saved index is computed again when it changes)
+    _format = 2
+
+    # historical or usual names not in ISO 3166 mapped to the current country
+    _historical = {
+        'Angleterre': 'GB',
+        'Écosse': 'GB',
+        'Pays de Galles': 'GB',
+        'Irlande du Nord': 'GB',
+        'Grande-Bretagne': 'GB',
+        'England': 'GB',
+        'Scotland': 'GB',
+        'Wales': 'GB',
+        'Great Britain': 'GB',
+        'Hollande': 'NL',
+        'Holland': 'NL',
+        'Prusse': 'DE',
+        'Prussia': 'DE',
+        'Bavière': 'DE',
+        'Bavaria': 'DE',
+        'Empire allemand': 'DE',
+        'German Empire': 'DE',
+        'Allemagne de l\'Ouest': 'DE',
+        'RFA': 'DE',
+        'RDA': 'DE',
+        'Autriche-Hongrie': 'AT',
+        'Austria-Hungary': 'AT',
+        'URSS': 'RU',
+        'USSR': 'RU',
+        'Union soviétique': 'RU',
+        'Soviet Union': 'RU',
+        'Russie': 'RU',
+        'Tchécoslovaquie': 'CZ',
+        'Czechoslovakia': 'CZ',
+        'Bohême': 'CZ',
+        'Bohemia': 'CZ',
+        'Yougoslavie': 'RS',
+        'Yugoslavia': 'RS',
+        'Royaume de Sardaigne': 'IT',
+        'Sardaigne': 'IT',
+        'Royaume de Naples': 'IT',
+        'Pays-Bas autrichiens': 'BE',
+        'Algérie française': 'DZ',
+        'Indochine': 'VN',
+        'Tonkin': 'VN',
+        'Annam': 'VN',
+        'Cochinchine': 'VN',
+        'Congo belge': 'CD',
+        'Zaïre': 'CD',
+        'Dahomey': 'BJ',
+        'Haute-Volta': 'BF',
+        'Soudan français': 'ML',
+        'Ceylan': 'LK',
+        'Perse': 'IR',
+        'Siam': 'TH',
+        'Birmanie': 'MM',
+        'USA': 'US',
+        'Etats-Unis': 'US',
+        'Etats-Unis d\'Amérique': 'US',
+    }
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path=None):
+
+        self._path = path
+        self._index = None
+        self._codes = None
+        self._names = None
+
+    # -------------------------------------------------------------------------
+    # _build
+    # -------------------------------------------------------------------------
+
+    def _build(self):
+        """
+        Function to compute the indexes (names and codes) from the ISO 3166 database and its french translation
+        """
+
+        index = {}
+        codes = {}
+        names = {}
+
+        try:
+            french = gettext.translation('iso3166-1', pycountry.LOCALES_DIR, languages=['fr'])
+        except OSError:
+            french = gettext.NullTranslations()
+
+        for country in pycountry.countries:
+            english = [getattr(country, key, None) for key in ['name', 'common_name', 'official_name']]
+            english = [name for name in english if name]
+
+            for name in english + [french.gettext(name) for name in english]:
+                index.setdefault(fold(name), country.alpha_2)
+
+            for code in [country.alpha_2, country.alpha_3]:
+                codes[code] = country.alpha_2
+
+            names[country.alpha_2] = french.gettext(country.name)
+
+        for name, code in self._historical.items():
+            index.setdefault(fold(name), code)
+
+        return index, codes, names
+
+    # -------------------------------------------------------------------------
+    # _version
+    # -------------------------------------------------------------------------
+
+    def _version(self):
+        """
+        Function to get the version of the index: format, pycountry release and historical names
+        """
+
+        try:
+            release = metadata.version('pycountry')
+        except metadata.PackageNotFoundError:
+            release = str(len(pycountry.countries))
+
+        content = json.dumps([self._format, release, self._historical], ensure_ascii=False, sort_keys=True)
+
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    # -------------------------------------------------------------------------
+    # _load
+    # -------------------------------------------------------------------------
+
+    def _load(self):
+        """
+        Function to load the precomputed index (computed and saved at first use or when its version changed)
+        """
+
+        if self._index is None:
+
+            if self._path is None:
+                self._path = get_folder() / "countries.json"
+
+            version = self._version()
+
+            try:
+                content = json.loads(self._path.read_text(encoding='utf-8'))
+                if content['version'] != version:
+                    raise ValueError(content['version'])
+                self._index, self._codes, self._names = content['index'], content['codes'], content['names']
+            except (OSError, ValueError, KeyError):
+                self._index, self._codes, self._names = self._build()
+                try:
+                    content = {'version': version, 'index': self._index, 'codes': self._codes, 'names': self._names}
+                    self._path.write_text(json.dumps(content, ensure_ascii=False), encoding='utf-8')
+                except OSError as e:
+                    display(f"Countries save: {type(e).__name__}", error=True)
+
+        return self._index
+
+    # -------------------------------------------------------------------------
+    # get
+    # -------------------------------------------------------------------------
+
+    def get(self, name):
+        """
+        Function to get the alpha 2 code of a country name or code (None if not a country)
+        """
+
+        if not name:
+            return None
+
+        index = self._load()
+
+        name = name.strip()
+        if name.isupper() and name.isalpha() and len(name) in (2, 3):
+            code = self._codes.get(name)
+            if code is not None:
+                return code
+
+        return index.get(fold(name))
+
+    # -------------------------------------------------------------------------
+    # name
+    # -------------------------------------------------------------------------
+
+    def name(self, code):
+        """
+        Function to get the french name of a country from its alpha 2 code
+        """
+
+        self._load()
+
+        return self._names.get(code, code)
+
+
+countries = Countries()
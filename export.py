@@ -0,0 +1,304 @@
+# export
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to export the individuals, families and events as tables (Parquet or JSON Lines)
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import json
+import re
+from pathlib import Path
+
+try:
+    # https://pypi.org/project/pyarrow/
+    # pip3 install pyarrow
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+
+# -------------------------------------------------------------------------
+# tables
+# -------------------------------------------------------------------------
+
+_columns = {
+    'individuals': [
+        ('ref', 'string'), ('gedcomid', 'string'), ('url', 'string'),
+        ('firstname', 'string'), ('lastname', 'string'), ('sex', 'string'), ('occupation', 'string'),
+        ('level', 'int'), ('father', 'string'), ('mother', 'string'),
+        ('families', 'int'), ('notes', 'int'),
+    ],
+    'families': [
+        ('family', 'string'), ('gedcomid', 'string'),
+        ('husband', 'string'), ('wife', 'string'), ('childs', 'int'),
+    ],
+    'events': [
+        ('owner', 'string'), ('kind', 'string'), ('event', 'string'),
+        ('date', 'string'), ('year', 'int'),
+        ('place', 'string'), ('latitude', 'float'), ('longitude', 'float'),
+    ],
+}
+
+_events = {
+    'individual': ['birth', 'baptem', 'death', 'burial'],
+    'family': ['marriage', 'divorce'],
+}
+
+# --------------------------------------------------------------------------------------------------
+#
+# TableWriter class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class TableWriter:
+    """
+    Class to write the rows of a table by batches: Parquet if pyarrow is installed, JSON Lines otherwise
+    Only one batch is kept in memory
+    """
+
+    _types = {'string': 'string', 'int': 'int64', 'float': 'float64'}
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path, columns, batch_size=10000, parquet=True):
+
+        self._parquet = parquet and pa is not None
+
+        self._path = Path(path).with_suffix(".parquet" if self._parquet else ".jsonl")
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.unlink(missing_ok=True)
+
+        self._columns = [name for name, _ in columns]
+        self._batch_size = batch_size
+        self._batch = []
+        self.count = 0
+
+        if self._parquet:
+            self._schema = pa.schema([(name, getattr(pa, self._types[kind])()) for name, kind in columns])
+            self._file = pq.ParquetWriter(str(self._path), self._schema)
+        else:
+            self._file = open(self._path, "w", encoding="utf-8")
+
+    # -------------------------------------------------------------------------
+    # write
+    # -------------------------------------------------------------------------
+
+    def write(self, row):
+        """
+        Function to add a row (dict of the columns)
+        """
+
+        self._batch += [row]
+        self.count += 1
+
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    # -------------------------------------------------------------------------
+    # flush
+    # -------------------------------------------------------------------------
+
+    def flush(self):
+        """
+        Function to write the rows of the batch
+        """
+
+        if len(self._batch) == 0:
+            return
+
+        if self._parquet:
+            self._file.write_table(pa.Table.from_pylist(self._batch, schema=self._schema))
+        else:
+            self._file.write(''.join(json.dumps({name: row.get(name) for name in self._columns}, ensure_ascii=False) + "\n" for row in self._batch))
+
+        self._batch = []
+
+    # -------------------------------------------------------------------------
+    # close
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    @property
+    def path(self):
+        """
+        Property to get the path of the file written
+        """
+        return self._path
+
+# -------------------------------------------------------------------------
+# _year
+# -------------------------------------------------------------------------
+
+
+def _year(date):
+    """
+    Function to get the (first) year of a GEDCOM date
+    """
+
+    match = re.search(r'\b(\d{3,4})\b', date) if date else None
+
+    return int(match.group(1)) if match else None
+
+# -------------------------------------------------------------------------
+# event_rows
+# -------------------------------------------------------------------------
+
+
+def event_rows(owner, kind, data):
+    """
+    Function to get the rows of the events of an individual or a family
+    """
+
+    for event in _events[kind]:
+        if not data[event]:
+            continue
+
+        date = data[f"{event}date"] or None
+        place = data[f"{event}place"]
+
+        yield {
+            'owner': owner,
+            'kind': kind,
+            'event': event,
+            'date': date,
+            'year': _year(date),
+            'place': place.fullname if place else None,
+            'latitude': place.latitude if place else None,
+            'longitude': place.longitude if place else None,
+        }
+
+# -------------------------------------------------------------------------
+# couple
+# -------------------------------------------------------------------------
+
+
+def couple(refs, individuals=None):
+    """
+    Function to get the man and the woman of a couple by their sex (in the order given if unknown or not known)
+    """
+
+    man = woman = None
+    others = []
+    for ref in [ref for ref in refs if ref][:2]:
+        sex = individuals[ref].portrait['sex'] if individuals is not None and ref in individuals else None
+        if sex == 'M' and man is None:
+            man = ref
+        elif sex == 'F' and woman is None:
+            woman = ref
+        else:
+            others += [ref]
+
+    for ref in others:
+        if man is None:
+            man = ref
+        else:
+            woman = ref
+
+    return man, woman
+
+# -------------------------------------------------------------------------
+# individual_row
+# -------------------------------------------------------------------------
+
+
+def individual_row(ref, individual, level=None, individuals=None):
+    """
+    Function to get the row of an individual (the father and the mother by their sex if the individuals are given)
+    """
+
+    data = individual.portrait
+    father, mother = couple(individual.parentsref, individuals)
+
+    return {
+        'ref': ref,
+        'gedcomid': data['gedcomid'],
+        'url': data['url'],
+        'firstname': data['firstname'],
+        'lastname': data['lastname'],
+        'sex': data['sex'],
+        'occupation': data['occupation'],
+        'level': level,
+        'father': father,
+        'mother': mother,
+        'families': len(individual.families),
+        'notes': len(data['notes'] or []),
+    }
+
+# -------------------------------------------------------------------------
+# export
+# -------------------------------------------------------------------------
+
+
+def export(genealogy, folder, batch_size=10000, parquet=True):
+    """
+    Function to write the tables of individuals, families and events into a folder
+    Individuals and families are read one by one (from the disk if stored) and written by batches
+    """
+
+    tables = {name: TableWriter(Path(folder) / name, columns, batch_size, parquet) for name, columns in _columns.items()}
+
+    try:
+        levels = genealogy.levels
+        individuals = genealogy.individuals
+
+        for ref, individual in individuals.items():
+            tables['individuals'].write(individual_row(ref, individual, levels.get(ref), individuals))
+
+            for row in event_rows(ref, 'individual', individual.portrait):
+                tables['events'].write(row)
+
+        for key, family in genealogy.families.items():
+            husband, wife = couple(family.spousesref, individuals)
+            owner = json.dumps(list(key))
+
+            tables['families'].write({
+                'family': owner,
+                'gedcomid': family.portrait['gedcomid'],
+                'husband': husband,
+                'wife': wife,
+                'childs': len(family.childsref),
+            })
+
+            for row in event_rows(owner, 'family', family.portrait):
+                tables['events'].write(row)
+
+    finally:
+        for table in tables.values():
+            table.close()
+
+    for name, table in tables.items():
+        display(f"Export {name}: {table.count:,} rows in {table.path}")
+
+    return {name: table.path for name, table in tables.items()}
@@ -0,0 +1,310 @@
+# frontier
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the frontier of the crawl (breadth-first)
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import heapq
+import threading
+import time
+from collections import namedtuple
+
+# --------------------------------------------------------------------------------------------------
+#
+# Frontier class
+#
+# --------------------------------------------------------------------------------------------------
+
+Visit = namedtuple("Visit", "ref url level force sosa dated", defaults=(None, False))
+
+
+class Frontier:
+    """
+    Class of the queue of individuals to visit by priority (breadth-first by default)
+        - the minimum level reached is kept for each reference
+        - a reference reached again at a lower level is visited again (to expand its relatives further)
+        - relatives are only followed in a direction while the level is below the limit of this direction
+    Priorities:
+        - generation: lowest level first (breadth-first)
+        - sosa: ancestors by Sosa number first, then the other relatives by level
+        - cached: pages already loaded first, then by level
+        - dates: relatives of individuals with dates first, then by level
+    The frontier is thread safe so that it can be shared by sequential, concurrent or replay drivers
+    """
+
+    directions = ('parents', 'spouses', 'childs')
+
+    priorities = ('generation', 'sosa', 'cached', 'dates')
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, limits, priority='generation', cached=None):
+
+        # direction -> maximum level to expand (None or negative if not followed)
+        self._limits = {direction: limits.get(direction) for direction in self.directions}
+
+        if priority not in self.priorities:
+            raise ValueError(f"Unknown priority: {priority}")
+        self._priority = priority
+
+        # function to check if the page of an url is already loaded
+        self._cached = cached
+
+        self._queue = []
+        self._count = 0
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # _key
+    # -------------------------------------------------------------------------
+
+    def _key(self, visit):
+        """
+        Function to get the priority of a visit (lowest first)
+        """
+
+        if self._priority == 'sosa':
+            return (0, visit.sosa) if visit.sosa else (1, visit.level)
+
+        if self._priority == 'cached':
+            return (0 if self._cached is not None and self._cached(visit.url) else 1, visit.level)
+
+        if self._priority == 'dates':
+            return (0 if visit.dated else 1, visit.level)
+
+        return (visit.level,)
+
+    # -------------------------------------------------------------------------
+    # _append
+    # -------------------------------------------------------------------------
+
+    def _append(self, visit, key):
+        # the counter keeps the order of arrival for the same priority
+        heapq.heappush(self._queue, (key, self._count, visit))
+        self._count += 1
+
+    # -------------------------------------------------------------------------
+    # push
+    # -------------------------------------------------------------------------
+
+    def push(self, ref, url, level=0, force=False, sosa=None, dated=False):
+        """
+        Function to add an individual to visit (if not already reached at the same or a lower level)
+        """
+
+        with self._lock:
+            if ref in self._levels and self._levels[ref] <= level:
+                return False
+
+            self._levels[ref] = level
+
+            visit = Visit(ref, url, level, force, sosa, dated)
+            self._append(visit, self._key(visit))
+
+            return True
+
+    # -------------------------------------------------------------------------
+    # pop
+    # -------------------------------------------------------------------------
+
+    def pop(self):
+        """
+        Function to get the next individual to visit (None when the frontier is empty)
+        Visits superseded by a lower level of the same reference are skipped
+        """
+
+        with self._lock:
+            while len(self._queue) > 0:
+                _, _, visit = heapq.heappop(self._queue)
+                if self._levels.get(visit.ref) == visit.level:
+                    return visit
+
+            return None
+
+    # -------------------------------------------------------------------------
+    # retry
+    # -------------------------------------------------------------------------
+
+    def retry(self, visit):
+        """
+        Function to visit again first an individual whose visit was interrupted
+        """
+
+        with self._lock:
+            if self._levels.get(visit.ref) == visit.level:
+                self._append(visit, (-1,))
+
+    # -------------------------------------------------------------------------
+    # expand
+    # -------------------------------------------------------------------------
+
+    def expand(self, visit, relatives, dated=False):
+        """
+        Function to add the relatives of a visited individual
+        relatives is a dict of direction -> list of (ref, url), parents as father then mother
+        dated tells if the visited individual has dates
+        """
+
+        count = 0
+        for direction, items in relatives.items():
+            limit = self._limits.get(direction)
+            if limit is None or visit.level >= limit:
+                continue
+
+            for position, (ref, url) in enumerate(items):
+                sosa = 2 * visit.sosa + position if direction == 'parents' and visit.sosa and position < 2 else None
+                if ref and self.push(ref, url, visit.level + 1, visit.force, sosa, dated):
+                    count += 1
+
+        return count
+
+    # -------------------------------------------------------------------------
+    # follows
+    # -------------------------------------------------------------------------
+
+    def follows(self, direction):
+        """
+        Function to check if the relatives of a direction are followed
+        """
+
+        limit = self._limits.get(direction)
+
+        return limit is not None and limit > 0
+
+    # -------------------------------------------------------------------------
+    # level
+    # -------------------------------------------------------------------------
+
+    def level(self, ref):
+        """
+        Function to get the minimum level reached by a reference (None if not reached)
+        """
+        return self._levels.get(ref)
+
+    @property
+    def levels(self):
+        """
+        Property to get the minimum level reached by each reference
+        """
+        return self._levels
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __getstate__(self):
+        # the lock and the cache function are not saved with the frontier
+        state = self.__dict__.copy()
+        state.pop('_lock', None)
+        state.pop('_cached', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._cached = None
+
+    # -------------------------------------------------------------------------
+    # cached
+    # -------------------------------------------------------------------------
+
+    @property
+    def cached(self):
+        """
+        Property to get the function checking if the page of an url is already loaded
+        """
+        return self._cached
+
+    @cached.setter
+    def cached(self, cached):
+        self._cached = cached
+
+# --------------------------------------------------------------------------------------------------
+#
+# Budget class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Budget:
+    """
+    Class of the hard limits of a crawl (None for no limit)
+        - max_pages: number of individuals scraped
+        - max_time: wall time in seconds
+        - max_fetches: number of pages loaded from the web (not from cache) per repository
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, max_pages=None, max_time=None, max_fetches=None):
+
+        self._max_pages = max_pages
+        self._max_time = max_time
+        self._max_fetches = max_fetches
+
+        self._start = time.monotonic()
+        self._pages = 0
+        self._fetches = {}
+
+    # -------------------------------------------------------------------------
+    # exhausted
+    # -------------------------------------------------------------------------
+
+    def exhausted(self):
+        """
+        Function to get the reason why the crawl has to stop (None if it can go on)
+        """
+
+        if self._max_pages is not None and self._pages >= self._max_pages:
+            return f"{self._pages:,} pages"
+
+        if self._max_time is not None and time.monotonic() - self._start >= self._max_time:
+            return f"{self._max_time:,} seconds"
+
+        return None
+
+    # -------------------------------------------------------------------------
+    # fetch
+    # -------------------------------------------------------------------------
+
+    def fetch(self, repository):
+        """
+        Function to check if one more page can be loaded from the web for a repository
+        """
+        return self._max_fetches is None or self._fetches.get(repository, 0) < self._max_fetches
+
+    # -------------------------------------------------------------------------
+    # count
+    # -------------------------------------------------------------------------
+
+    def count(self, repository, fetched):
+        """
+        Function to count one individual scraped (and its page loaded from the web)
+        """
+
+        self._pages += 1
+        if fetched:
+            self._fetches[repository] = self._fetches.get(repository, 0) + 1
@@ -0,0 +1,331 @@
+# gazetteer
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with an offline GeoNames gazetteer built from the GeoNames dump files
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import argparse
+import io
+import sqlite3
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display, get_folder
+from countries import countries
+
+# --------------------------------------------------------------------------------------------------
+#
+# Gazetteer class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Gazetteer:
+    """
+    Class to build and query a local SQLite index of the GeoNames dumps
+    https://download.geonames.org/export/dump/
+    """
+
+    # GeoNames feature class names as returned by searchJSON
+    _feature_classes = {
+        'A': 'country, state, region,...',
+        'H': 'stream, lake, ...',
+        'L': 'parks,area, ...',
+        'P': 'city, village,...',
+        'R': 'road, railroad',
+        'S': 'spot, building, farm',
+        'T': 'mountain,hill,rock,...',
+        'U': 'undersea',
+        'V': 'forest,heath,...',
+    }
+
+    _batch = 50000
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path=None):
+
+        self._path = Path(path) if path else None
+        self._db = None
+        self._available = None
+
+    # -------------------------------------------------------------------------
+    # _connect
+    # -------------------------------------------------------------------------
+
+    def _connect(self, create=False):
+        """
+        Function to open the SQLite index (lazily)
+        """
+
+        if self._db is None:
+            if self._path is None:
+                self._path = get_folder() / "geonames.sqlite"
+
+            if not create and not self._path.exists():
+                return None
+
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self._path), check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS geonames (
+                    geonameid INTEGER PRIMARY KEY,
+                    name TEXT, asciiname TEXT, alternatenames TEXT,
+                    latitude TEXT, longitude TEXT,
+                    fclass TEXT, fcode TEXT, country TEXT, admin1 TEXT, admin2 TEXT,
+                    population INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS admin1 (code TEXT PRIMARY KEY, name TEXT);
+                CREATE TABLE IF NOT EXISTS admin2 (code TEXT PRIMARY KEY, name TEXT);
+                CREATE TABLE IF NOT EXISTS countries (code TEXT PRIMARY KEY, name TEXT);
+                CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(
+                    name, asciiname, alternatenames,
+                    content='geonames', content_rowid='geonameid',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+            """)
+
+        return self._db
+
+    # -------------------------------------------------------------------------
+    # available
+    # -------------------------------------------------------------------------
+
+    @property
+    def available(self):
+        """
+        Property to know if the local index exists and is not empty
+        """
+
+        if self._available is None:
+            try:
+                db = self._connect()
+                self._available = db is not None and db.execute("SELECT 1 FROM geonames LIMIT 1").fetchone() is not None
+            except Exception as e:
+                display(f"Gazetteer: {type(e).__name__}", error=True)
+                self._available = False
+
+        return self._available
+
+    # -------------------------------------------------------------------------
+    # _lines
+    # -------------------------------------------------------------------------
+
+    def _lines(self, file):
+        """
+        Function to iterate over the tab separated lines of a dump (plain or zipped)
+        """
+
+        file = Path(file)
+
+        if file.suffix.lower() == '.zip':
+            with zipfile.ZipFile(file) as archive:
+                for member in archive.namelist():
+                    if member.endswith('.txt') and not member.startswith('readme'):
+                        with archive.open(member) as stream:
+                            for line in io.TextIOWrapper(stream, encoding='utf-8'):
+                                if not line.startswith('#'):
+                                    yield line.rstrip('\n').split('\t')
+        else:
+            with file.open(encoding='utf-8') as stream:
+                for line in stream:
+                    if not line.startswith('#'):
+                        yield line.rstrip('\n').split('\t')
+
+    # -------------------------------------------------------------------------
+    # _insert
+    # -------------------------------------------------------------------------
+
+    def _insert(self, sql, rows):
+        """
+        Function to insert rows by batch
+        """
+
+        db = self._connect(create=True)
+
+        count = 0
+        batch = []
+        for row in rows:
+            batch += [row]
+            if len(batch) >= self._batch:
+                db.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            db.executemany(sql, batch)
+            count += len(batch)
+
+        return count
+
+    # -------------------------------------------------------------------------
+    # build
+    # -------------------------------------------------------------------------
+
+    def build(self, files, feature_classes=('A', 'P')):
+        """
+        Function to import GeoNames dump files into the local index
+            - countryInfo.txt, admin1CodesASCII.txt, admin2Codes.txt for names of the hierarchy
+            - any other file (FR.txt, allCountries.txt or zip) for the geonames
+        """
+
+        db = self._connect(create=True)
+
+        for file in files:
+            start_time = datetime.now()
+            name = Path(file).name.lower()
+
+            if name.startswith('countryinfo'):
+                count = self._insert("INSERT OR REPLACE INTO countries VALUES (?, ?)",
+                                     ((cols[0], cols[4]) for cols in self._lines(file) if len(cols) > 4))
+
+            elif name.startswith('admin1codes'):
+                count = self._insert("INSERT OR REPLACE INTO admin1 VALUES (?, ?)",
+                                     ((cols[0], cols[1]) for cols in self._lines(file) if len(cols) > 1))
+
+            elif name.startswith('admin2codes'):
+                count = self._insert("INSERT OR REPLACE INTO admin2 VALUES (?, ?)",
+                                     ((cols[0], cols[1]) for cols in self._lines(file) if len(cols) > 1))
+
+            else:
+                count = self._insert("INSERT OR REPLACE INTO geonames VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     ((int(cols[0]), cols[1], cols[2], cols[3], cols[4], cols[5], cols[6], cols[7],
+                                       cols[8], cols[10], cols[11], int(cols[14] or 0))
+                                      for cols in self._lines(file) if len(cols) > 14 and cols[6] in feature_classes))
+
+            db.commit()
+
+            duration = (datetime.now() - start_time).total_seconds()
+            display(f"Gazetteer: {count:,} rows from {file} in {duration:,.2f}s")
+
+        db.execute("INSERT INTO names(names) VALUES('rebuild')")
+        db.commit()
+
+        self._available = None
+
+    # -------------------------------------------------------------------------
+    # search
+    # -------------------------------------------------------------------------
+
+    def search(self, q, country=None, feature_class='P', max_rows=10):
+        """
+        Function to search the local index with the searchJSON semantic
+        Return a list of geonames with the same keys as the GeoNames web service (style=full)
+        """
+
+        geonames = []
+
+        if not q or not self.available:
+            return geonames
+
+        try:
+            sql = """
+                SELECT g.*, bm25(names) AS rank,
+                       c.name AS countryname, a1.name AS admin1name, a2.name AS admin2name
+                FROM names
+                JOIN geonames g ON g.geonameid = names.rowid
+                LEFT JOIN countries c ON c.code = g.country
+                LEFT JOIN admin1 a1 ON a1.code = g.country || '.' || g.admin1
+                LEFT JOIN admin2 a2 ON a2.code = g.country || '.' || g.admin1 || '.' || g.admin2
+                WHERE names MATCH ? AND g.fclass = ?
+            """
+            params = ['"' + q.replace('"', '""') + '"', feature_class]
+
+            if country:
+                sql += " AND g.country = ?"
+                params += [country]
+
+            # exact names first, then best text rank, then biggest places
+            sql += " ORDER BY (lower(g.name) = lower(?) OR lower(g.asciiname) = lower(?)) DESC, rank, g.population DESC LIMIT ?"
+            params += [q, q, max_rows]
+
+            for row in self._db.execute(sql, params):
+                loc = {
+                    'geonameId': row['geonameid'],
+                    'toponymName': row['name'],
+                    'name': row['name'],
+                    'asciiName': row['asciiname'],
+                    'lat': row['latitude'],
+                    'lng': row['longitude'],
+                    'fcl': row['fclass'],
+                    'fclName': self._feature_classes.get(row['fclass'], row['fclass']),
+                    'fcode': row['fcode'],
+                    'countryCode': row['country'],
+                    'countryName': row['countryname'] or countries.name(row['country']),
+                    'adminCode1': row['admin1'],
+                    'population': row['population'],
+                    'score': -row['rank'],
+                }
+                if row['admin1name']:
+                    loc['adminName1'] = row['admin1name']
+                if row['admin2']:
+                    loc['adminCode2'] = row['admin2']
+                if row['admin2name']:
+                    loc['adminName2'] = row['admin2name']
+
+                geonames += [loc]
+
+        except Exception as e:
+            display(f"Gazetteer search - {q}: {type(e).__name__}", error=True)
+
+        return geonames
+
+
+gazetteer = Gazetteer()
+
+###################################################################################################################################
+# main
+###################################################################################################################################
+
+
+def main():
+    """
+    Main function to build the local gazetteer from GeoNames dump files
+    """
+
+    display("GeoNames Gazetteer", level=1)
+
+    parser = argparse.ArgumentParser(description="Build the local GeoNames index from dump files")
+    parser.add_argument("-o", "--output", default=None, type=str, help="SQLite index file (geonames.sqlite in home folder by default)")
+    parser.add_argument("files", type=str, nargs='+', help="GeoNames dump files (FR.txt, allCountries.zip, admin1CodesASCII.txt, admin2Codes.txt, countryInfo.txt)")
+    args = parser.parse_args()
+
+    Gazetteer(args.output).build(args.files)
+
+###################################################################################################################################
+# __main__
+###################################################################################################################################
+
+
+if __name__ == '__main__':
+
+    main()
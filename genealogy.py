@@ -23,9 +23,13 @@ Package to manage Individuals and Families
 #
 # -------------------------------------------------------------------------
 
+import copy
+import hashlib
+import io
+import pickle
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import urlunparse, urlparse
-import textwrap
 
 # -------------------------------------------------------------------------
 #
@@ -34,7 +38,19 @@ import textwrap
 # -------------------------------------------------------------------------
 
 from common import display
+from objects import Place
 from geneanet import Geneanet
+from spatial import SpatialIndex
+from storage import DiskStore
+from notes import note_table
+from frontier import Frontier, Budget
+from graph import RelationGraph, family_key
+from kinship import Kinship
+from linkage import Linkage
+from names import NameIndex
+from idmap import IdMap
+from importer import GedcomImporter
+from report import Report
 
 # from objects import Individual, Family
 
@@ -50,30 +66,143 @@ class GBase():
     Class of common functions
     """
 
+    # GEDCOM ids set by setids
+    _idkeys = ()
+
     # -------------------------------------------------------------------------
     # _event
     # -------------------------------------------------------------------------
 
     def _event(self, data, events):
         """
-        Function to get GEDCOM for one event made of TAG, DATE and PLACE
+        Function to get GEDCOM lines for one event made of TAG, DATE and PLACE
         """
 
-        text = ""
         for event in events:
             if event[1] in data and data[event[1]]:
-                text += f"1 {event[0]}\n"
+                yield f"1 {event[0]}\n"
                 if f"{event[1]}date" in data and data[f"{event[1]}date"] is not None:
-                    text += f"2 DATE {data[f'{event[1]}date']}\n"
+                    yield f"2 DATE {data[f'{event[1]}date']}\n"
                 if f"{event[1]}place" in data and data[f"{event[1]}place"]:
-                    place = data[f'{event[1]}place']
-                    text += f"2 PLAC {place.fullname}\n"
-                    if 'latitude' in place and 'longitude' in place and place.latitude and place.longitude:
-                        text += "3 MAP\n"
-                        text += f"4 LATI {'N' if float(place.latitude) > 0 else 'S'}{abs(float(place.latitude)):.4f}\n"
-                        text += f"4 LONG {'E' if float(place.longitude) > 0 else 'W'}{abs(float(place.longitude)):.4f}\n"
+                    yield data[f'{event[1]}place'].node.gedcom
+
+    # -------------------------------------------------------------------------
+    # _split
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _split(line, width=200):
+        """
+        Function to split a line in parts of width characters at most for CONC lines
+        The whitespaces are kept and a line is never split next to a space (GEDCOM readers strip them)
+        """
+
+        parts = []
+        while len(line) > width:
+            cut = width
+            while cut > 1 and (line[cut] == ' ' or line[cut - 1] == ' '):
+                cut -= 1
+            if cut == 1:
+                cut = width
+            parts += [line[:cut]]
+            line = line[cut:]
+
+        return parts + [line]
+
+    # -------------------------------------------------------------------------
+    # _note
+    # -------------------------------------------------------------------------
+
+    def _note(self, note, noteid):
+        """
+        Function to get GEDCOM lines for one shared NOTE record
+        """
+
+        first = True
+        for line in note.splitlines():
+            wrapped_line = self._split(line)
+
+            if first:
+                yield f"0 @{noteid}@ NOTE {wrapped_line[0]}\n"
+            else:
+                yield f"1 CONT {wrapped_line[0]}\n"
+
+            wrapped_line.pop(0)
+
+            for sub_line in wrapped_line:
+                yield f"1 CONC {sub_line}\n"
+
+            first = False
+
+        yield "\n"
+
+    # -------------------------------------------------------------------------
+    # portrait
+    # -------------------------------------------------------------------------
+
+    @property
+    def portrait(self):
+        """
+        Property to get the data of the record (of an individual or of a family)
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} has no portrait")
+
+    # -------------------------------------------------------------------------
+    # digest
+    # -------------------------------------------------------------------------
+
+    @property
+    def digest(self):
+        """
+        Property to get the hash of the data rendered in GEDCOM
+        Places are hashed by their GEDCOM lines (not by their search results or counters)
+        """
+
+        values = [(key, value.node.gedcom if isinstance(value, Place) and value.node else value) for key, value in self.portrait.items()]
+
+        return hashlib.blake2b(repr(values).encode('utf-8'), digest_size=16).hexdigest()
+
+    # -------------------------------------------------------------------------
+    # _ids
+    # -------------------------------------------------------------------------
+
+    def _ids(self):
+        """
+        Function to get the GEDCOM ids of the record (to know whether setids changed them)
+        """
+
+        return [self.portrait[key] for key in self._idkeys]
+
+    # -------------------------------------------------------------------------
+    # _remap
+    # -------------------------------------------------------------------------
+
+    def _remap(self, refs, mapping, unique=True):
+        """
+        Function to replace merged references (without duplicates if unique)
+        """
+
+        refs = [mapping.get(ref, ref) for ref in refs]
+
+        return list(dict.fromkeys(refs)) if unique else refs
 
-        return text
+    # -------------------------------------------------------------------------
+    # _absorb
+    # -------------------------------------------------------------------------
+
+    def _absorb(self, data, other):
+        """
+        Function to complete the data with the values only known by another record of the same individual or family
+        """
+
+        for key, value in other.items():
+            if key.endswith('id') or key.endswith('sid'):
+                continue
+            if isinstance(value, list):
+                data[key] = list(dict.fromkeys(data[key] + value))
+            elif value and not data[key]:
+                data[key] = value
 
     # -------------------------------------------------------------------------
     # _shorten_place
@@ -81,10 +210,10 @@ class GBase():
 
     def _shorten_place(self, place):
         """
-        Remove address
+        Remove node and search
         """
 
-        place = {key: value for key, value in place.items() if key != 'address' and key != 'search'}
+        place = {key: value for key, value in place.items() if key != 'node' and key != 'search'}
 
         return place
 
@@ -143,6 +272,8 @@ class GFamily(GBase):
     Class of one family
     """
 
+    _idkeys = ('gedcomid', 'spousesid', 'childsid')
+
     # -------------------------------------------------------------------------
     # __init__
     # -------------------------------------------------------------------------
@@ -157,35 +288,44 @@ class GFamily(GBase):
 
     def setids(self, individuals_table, families_table):
         """
-        Function to set GEDCOM ids
+        Function to set GEDCOM ids (True if they changed)
         """
 
-        try:
-            self._family.data.gedcomid = families_table[tuple(self._family.spousesref)]
-        except Exception as e:
-            display(f"Family gedcom (1): {type(e).__name__}", error=True)
-            try:
-                self._family.data.gedcomid = families_table[tuple(self._family.spousesref)[::-1]]
-            except Exception as e2:
-                display(f"Family gedcom (2): {type(e2).__name__}", error=True)
-
-        self._family.data.spousesid = []
-        for spouse in self._family.spousesref:
-            try:
-                self._family.data.spousesid += [individuals_table[spouse]]
-            except KeyError:
-                self._family.data.spousesid += [None]
-            except Exception as e:
-                display(f"Family spousesid: {type(e).__name__}", error=True)
-
-        self._family.data.childsid = []
-        for child in self._family.childsref:
-            try:
-                self._family.data.childsid += [individuals_table[child]]
-            except KeyError:
-                self._family.data.childsid += [None]
-            except Exception as e:
-                display(f"Family childid: {type(e).__name__}", error=True)
+        ids = self._ids()
+
+        self._family.data.gedcomid = families_table.get(family_key(self._family.spousesref))
+        if self._family.data.gedcomid is None:
+            display(f"Family gedcom: {self._family.spousesref} not found", error=True)
+
+        self._family.data.spousesid = [individuals_table.get(spouse) for spouse in self._family.spousesref]
+
+        self._family.data.childsid = [individuals_table.get(child) for child in self._family.childsref]
+
+        return self._ids() != ids
+
+    # -------------------------------------------------------------------------
+    # remap
+    # -------------------------------------------------------------------------
+
+    def remap(self, mapping):
+        """
+        Function to replace the references of merged individuals
+        """
+
+        self._family.spousesref = self._remap(self._family.spousesref, mapping, unique=False)
+        self._family.childsref = self._remap(self._family.childsref, mapping)
+
+    # -------------------------------------------------------------------------
+    # absorb
+    # -------------------------------------------------------------------------
+
+    def absorb(self, other):
+        """
+        Function to merge another record of the same family
+        """
+
+        self._family.childsref = list(dict.fromkeys(self._family.childsref + list(other.childsref)))
+        self._absorb(self._family.data, other.portrait)
 
     # -------------------------------------------------------------------------
     # spousesref
@@ -207,6 +347,16 @@ class GFamily(GBase):
         """
         return self._family.childsref
 
+    # -------------------------------------------------------------------------
+    # portrait
+    # -------------------------------------------------------------------------
+    @property
+    def portrait(self):
+        """
+        Property to get the data of the family
+        """
+        return self._family.data
+
     # -------------------------------------------------------------------------
     # places
     # -------------------------------------------------------------------------
@@ -235,42 +385,45 @@ class GFamily(GBase):
         """
         Property to get the GEDCOM of the family
         """
+        return ''.join(self.lines())
+
+    def lines(self):
+        """
+        Function to get the GEDCOM lines of the family
+        """
 
-        text = ""
         if self._family.data.gedcomid:
 
-            text += f"0 @{self._family.data.gedcomid}@ FAM\n"
+            yield f"0 @{self._family.data.gedcomid}@ FAM\n"
 
             if self._family.data.spousesid[0]:
-                text += f"1 HUSB @{self._family.data.spousesid[0]}@\n"
+                yield f"1 HUSB @{self._family.data.spousesid[0]}@\n"
 
             if self._family.data.spousesid[1]:
-                text += f"1 WIFE @{self._family.data.spousesid[1]}@\n"
+                yield f"1 WIFE @{self._family.data.spousesid[1]}@\n"
 
             for childid in self._family.data.childsid:
                 if childid:
-                    text += f"1 CHIL @{childid}@\n"
+                    yield f"1 CHIL @{childid}@\n"
 
             events = [('MARR', 'marriage'), ('DIV', 'divorce')]
-            text += self._event(self._family.data, events)
-
-            text += "\n"
+            yield from self._event(self._family.data, events)
 
-        return text
+            yield "\n"
 
     # -------------------------------------------------------------------------
     # print
     # -------------------------------------------------------------------------
 
-    def print(self, short=False):
+    def print(self, short=False, verbose=False):
         """
-        Function to print the family
+        Function to print the family (debug record if verbose)
         """
 
         p = self._shorten_event(self._family.data.copy(), ['marriage', 'divorce'], short)
         p = self._shorten_data(p.copy(), short)
 
-        display(p, title=f"Family: {self._family.spousesref}")
+        display(p, title=f"Family: {self._family.spousesref}", verbose=verbose)
 
 # --------------------------------------------------------------------------------------------------
 #
@@ -284,6 +437,8 @@ class GIndividual(GBase):
     Class of one individual
     """
 
+    _idkeys = ('gedcomid', 'notesid', 'parentsid', 'siblingsid', 'familyid', 'familiesid')
+
     # -------------------------------------------------------------------------
     # __init__
     # -------------------------------------------------------------------------
@@ -307,83 +462,142 @@ class GIndividual(GBase):
         except Exception as e:
             display(f"{e}: Add processing for {url}", error=True)
 
-        self.print(True)
+        self.print(True, verbose=True)
 
         for family in self._individual.families:
-            family.print(True)
+            family.print(True, verbose=True)
+
+    # -------------------------------------------------------------------------
+    # load
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, individual):
+        """
+        Function to get an individual already known (e.g. read from a GEDCOM) without scraping its page
+        """
+
+        self = cls.__new__(cls)
+
+        self._individual = individual
+        self._individual.families = [GFamily(family) for family in self._individual.familiesref]
+
+        return self
+
+    # -------------------------------------------------------------------------
+    # __getstate__
+    # -------------------------------------------------------------------------
+
+    def __getstate__(self):
+        # the parser (and its html) is not saved with the individual
+        # its families are saved by key, they are saved in the families table (see attach)
+        state = self.__dict__.copy()
+        state.pop('_parser', None)
+        if self._individual is not None:
+            individual = self._individual.copy()
+            individual.families = [family_key(family.spousesref) for family in self._individual.families]
+            individual.familiesref = []
+            state['_individual'] = individual
+        return state
+
+    # -------------------------------------------------------------------------
+    # attach
+    # -------------------------------------------------------------------------
+
+    def attach(self, families):
+        """
+        Function to get the families of an individual read back (saved by key) from the families table
+        """
+
+        self._individual.families = [families[key] for key in self._individual.families if key in families]
+
+        return self
 
     # -------------------------------------------------------------------------
     # setids
     # -------------------------------------------------------------------------
-    def setids(self, individuals_table, families_table):
+    def setids(self, individuals_table, families_table, notes_table=None):
         """
-        Function to set GEDCOM ids
+        Function to set GEDCOM ids (notes get their ids from the notes table when first seen), True if they changed
         """
 
+        ids = self._ids()
+
+        # NOTE ids
+
+        self._individual.data.notesid = []
+        if notes_table is not None:
+            for note in self._individual.data.notes:
+                self._individual.data.notesid += [notes_table[note]]
+
         # INDI id
 
-        self._individual.data.gedcomid = None
-        try:
-            self._individual.data.gedcomid = individuals_table[self._individual.ref]
-        except KeyError:
-            pass
-        except Exception as e:
-            display(f"Gedcom individual: {type(e).__name__}", error=True)
+        self._individual.data.gedcomid = individuals_table.get(self._individual.ref)
 
         # Parents INDI id
 
-        self._individual.data.parentsid = []
-        for parent in self._individual.parentsref:
-            try:
-                self._individual.data.parentsid += [individuals_table[parent]]
-            except KeyError:
-                pass
-            except Exception as e:
-                display(f"Parentsid: {type(e).__name__}", error=True)
-                self._individual.data.parentsid += [None]
+        self._individual.data.parentsid = [individuals_table[parent] for parent in self._individual.parentsref if parent in individuals_table]
 
         # Siblings INDI id
 
-        self._individual.data.siblingsid = []
-        for sibling in self._individual.siblingsref:
-            try:
-                self._individual.data.siblingsid += [individuals_table[sibling]]
-            except KeyError:
-                self._individual.data.siblingsid += [None]
-            except Exception as e:
-                display(f"Siblingsid: {type(e).__name__}", error=True)
-                self._individual.data.siblingsid += [None]
+        self._individual.data.siblingsid = [individuals_table.get(sibling) for sibling in self._individual.siblingsref]
 
         # Parents FAM id
 
-        self._individual.data.familyid = None
-        try:
-            self._individual.data.familyid = families_table[tuple(self._individual.parentsref)]
-        except KeyError:
-            try:
-                self._individual.data.familyid = families_table[tuple(self._individual.parentsref)[::-1]]
-            except KeyError:
-                pass
-            except Exception as e2:
-                display(f"Familyid (2): {type(e2).__name__}", error=True)
-        except Exception as e:
-            display(f"Familyid (1): {type(e).__name__}", error=True)
+        self._individual.data.familyid = families_table.get(family_key(self._individual.parentsref))
 
         # FAM id
 
         self._individual.data.familiesid = []
         for family in self._individual.families:
-            try:
-                self._individual.data.familiesid += [families_table[tuple(family.spousesref)]]
-            except KeyError:
-                try:
-                    self._individual.data.familiesid += [families_table[tuple(family.spousesref)[::-1]]]
-                except Exception as e2:
-                    display(f"Familiesid (2): {type(e2).__name__}", error=True)
-                    self._individual.data.familiesid += [None]
-            except Exception as e:
-                display(f"Familiesid (1): {type(e).__name__}", error=True)
-                self._individual.data.familiesid += [None]
+            familyid = families_table.get(family_key(family.spousesref))
+            if familyid is None:
+                display(f"Familiesid: {family.spousesref} not found", error=True)
+            self._individual.data.familiesid += [familyid]
+
+        return self._ids() != ids
+
+    # -------------------------------------------------------------------------
+    # remap
+    # -------------------------------------------------------------------------
+
+    def remap(self, mapping):
+        """
+        Function to replace the references of merged individuals (families of the same spouses are merged)
+        """
+
+        self._individual.parentsref = self._remap(self._individual.parentsref, mapping)
+        self._individual.siblingsref = [ref for ref in self._remap(self._individual.siblingsref, mapping) if ref != self._individual.ref]
+
+        families = {}
+        for family in self._individual.families:
+            family.remap(mapping)
+            key = family_key(family.spousesref)
+            if key in families:
+                families[key].absorb(family)
+            else:
+                families[key] = family
+        self._individual.families = list(families.values())
+
+    # -------------------------------------------------------------------------
+    # absorb
+    # -------------------------------------------------------------------------
+
+    def absorb(self, other):
+        """
+        Function to merge another record of the same individual
+        """
+
+        if len(self._individual.parentsref) == 0:
+            self._individual.parentsref = list(other.parentsref)
+        self._individual.siblingsref = list(dict.fromkeys(self._individual.siblingsref + list(other.siblingsref)))
+        self._individual.families = self._individual.families + list(other.families)
+
+        self._absorb(self._individual.data, other.portrait)
+
+        # the url of the record merged is kept as a source (its own sources are merged above)
+        self._individual.data.sources = [source for source in dict.fromkeys(self._individual.data.sources + [other.url])
+                                         if source and source != self._individual.data.url]
 
     # -------------------------------------------------------------------------
     # url
@@ -403,7 +617,7 @@ class GIndividual(GBase):
         """
         Property to get the list of notes of the individual
         """
-        return self._individual.data.notes if 'notes' in self._individual.data else None
+        return [note_table[key] for key in self._individual.data.notes] if 'notes' in self._individual.data else None
 
     # -------------------------------------------------------------------------
     # portrait
@@ -506,12 +720,17 @@ class GIndividual(GBase):
         """
         Property to get the GEDCOM of the individual
         """
+        return ''.join(self.lines())
+
+    def lines(self):
+        """
+        Function to get the GEDCOM lines of the individual
+        """
 
         # portrait
 
-        text = ""
         if self._individual.data.gedcomid:
-            text += f"0 @{self._individual.data.gedcomid}@ INDI\n"
+            yield f"0 @{self._individual.data.gedcomid}@ INDI\n"
 
         names = {'name': "", "first": "", "last": ""}
 
@@ -526,62 +745,47 @@ class GIndividual(GBase):
         if len(names['name']) > 0:
             names['name'] = f"1 NAME {names['name'].strip()}\n"
 
-        text += ''.join([name for key, name in names.items() if len(name) > 0])
+        for name in names.values():
+            if len(name) > 0:
+                yield name
 
         if 'sex' in self._individual.data:
-            text += f"1 SEX {self._individual.data['sex']}\n"
+            yield f"1 SEX {self._individual.data['sex']}\n"
 
         events = [('BIRT', 'birth'), ('DEAT', 'death'), ('BURI', 'burial')]
-        text += self._event(self._individual.data, events)
+        yield from self._event(self._individual.data, events)
 
         # family
 
         for family in self._individual.data.familiesid:
             if family:
-                text += f"1 FAMS @{family}@\n"
+                yield f"1 FAMS @{family}@\n"
 
         if self._individual.data.familyid is not None:
-            text += f"1 FAMC @{self._individual.data.familyid}@\n"
+            yield f"1 FAMC @{self._individual.data.familyid}@\n"
 
         # notes
 
-        if 'notes' in self._individual.data:
-            for note in self._individual.data.notes:
-                note = note.splitlines()
-                first = True
-                for line in note:
-                    wrapped_line = textwrap.wrap(line, width=200)
-                    if len(wrapped_line) == 0:
-                        wrapped_line = ['']
-
-                    if first:
-                        text += f"1 NOTE {wrapped_line[0]}\n"
-                    else:
-                        text += f"2 CONT {wrapped_line[0]}\n"
+        for noteid in self._individual.data.notesid:
+            yield f"1 NOTE @{noteid}@\n"
 
-                    wrapped_line.pop(0)
-
-                    for sub_line in wrapped_line:
-                        text += f"2 CONC {sub_line}\n"
-
-                    first = False
+        # sources (the urls of the records merged into the individual after its own)
 
         if self._individual.data.url is not None:
-            text += f"1 SOUR {self._individual.data.url}\n"
-
-        # sources
+            yield f"1 SOUR {self._individual.data.url}\n"
 
-        text += "\n"
+        for source in self._individual.data.sources:
+            yield f"1 SOUR {source}\n"
 
-        return text
+        yield "\n"
 
     # -------------------------------------------------------------------------
     # print
     # -------------------------------------------------------------------------
 
-    def print(self, short=False):
+    def print(self, short=False, verbose=False):
         """
-        Function to print the individual
+        Function to print the individual (debug record if verbose)
         """
 
         p = self._shorten_event(self._individual.data.copy(), ['birth', 'death', 'baptem', 'burial'], short)
@@ -594,7 +798,7 @@ class GIndividual(GBase):
                 else:
                     del p['notes']
 
-        display(p, title=f"Individual: {self._individual.ref}")
+        display(p, title=f"Individual: {self._individual.ref}", verbose=verbose)
 
 # --------------------------------------------------------------------------------------------------
 #
@@ -612,19 +816,71 @@ class Genealogy(GBase):
     # __init__
     # -------------------------------------------------------------------------
 
-    def __init__(self, max_level, ascendants, spouses, descendants):
+    def __init__(self, max_level, ascendants, spouses, descendants, storage=None, limits=None, checkpoint=None, resume=False,
+                 priority='generation', budget=None, progress=None):
 
         self._parser = None
 
         self._repositories = {}
 
-        self._individuals = {}
+        if storage:
+            # individuals and families on disk
+            self._individuals = DiskStore(Path(storage) / "individuals.sqlite", load=self._attach)
+            self._families = DiskStore(Path(storage) / "families.sqlite")
+            if not resume:
+                self._individuals.clear()
+                self._families.clear()
+        else:
+            self._individuals = {}
+            self._families = {}
+
         self._max_level = max_level
         self._ascendants = ascendants
         self._spouses = spouses
         self._descendants = descendants
 
-        self._families = {}
+        # levels to follow in each direction (breadth-first)
+
+        if limits is None:
+            limits = {
+                'parents': max_level if ascendants else None,
+                'spouses': max_level if spouses else None,
+                'childs': max_level if descendants else None,
+            }
+        self._frontier = Frontier(limits, priority, self._cached)
+
+        # limits of the crawl and visits postponed by the limit of fetches
+
+        self._budget = budget if budget is not None else Budget()
+        self._deferred = []
+
+        self._graph = RelationGraph()
+        self._kinship = None
+
+        # built on first use, again after the individuals or families changed
+        self._spatial = None
+
+        self._names = NameIndex()
+
+        # checkpoints of the crawl
+
+        self._checkpoint = checkpoint
+        self._visiting = None
+
+        # records changed since the last checkpoint: (kind, key) in order
+        self._changes = {}
+
+        # results written during the crawl and the copies of the records written by the isolated snapshots
+
+        self._progress = progress
+        self._copies = {'individuals': {}, 'families': {}}
+
+        if resume and checkpoint is not None:
+            state = checkpoint.load()
+            if state is not None:
+                self._restore(state, checkpoint.records())
+        elif checkpoint is not None:
+            checkpoint.remove()
 
     # -------------------------------------------------------------------------
     # add_individual
@@ -632,11 +888,102 @@ class Genealogy(GBase):
 
     def add_individual(self, url, force=False, level=0):
         """
-        Function to add one individual to the genealogy
+        Function to add one individual to the genealogy (and its relatives up to the levels)
         """
 
-        parsed_url = urlparse(url)
-        repository = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
+        self._set_parser(url)
+
+        self._frontier.push(self._parser.clean_query(url), url, level, force, sosa=1 if level == 0 else None)
+
+        self.crawl()
+
+    # -------------------------------------------------------------------------
+    # seed
+    # -------------------------------------------------------------------------
+
+    def seed(self, path):
+        """
+        Function to add the individuals of a GEDCOM before the crawl (e.g. written by an earlier run)
+        Individuals with their relatives in the GEDCOM (in the directions followed) are not scraped again
+        so that the crawl only fetches the frontier beyond them
+        """
+
+        importer = GedcomImporter(path, self._clean_query)
+
+        directions = [direction for direction in Frontier.directions if self._frontier.follows(direction)]
+
+        count = 0
+        for individual, known in importer.individuals():
+            ref = individual.ref
+
+            # individuals without url cannot be scraped again
+            if ref in self._individuals or (individual.data.url and not all(known[direction] for direction in directions)):
+                continue
+
+            self._individuals[ref] = GIndividual.load(individual)
+            self._changes[('individual', ref)] = None
+
+            for family in self._individuals[ref].families:
+                key = family_key(family.spousesref)
+                if key not in self._families:
+                    self._families[key] = family
+                    self._changes[('family', key)] = None
+
+            self._graph.add(ref, self._individuals[ref], (individual.data.url,))
+
+            self._index_name(ref, self._individuals[ref])
+
+            count += 1
+
+        self._spatial = None
+
+        importer.summary()
+        display(f"Seed: {count:,} individuals known, {len(importer) - count:,} to scrap again")
+
+    # -------------------------------------------------------------------------
+    # _clean_query
+    # -------------------------------------------------------------------------
+
+    def _clean_query(self, url):
+        """
+        Function to get the reference of an url
+        """
+
+        self._set_parser(url)
+
+        return self._parser.clean_query(url) if self._parser is not None else url
+
+    # -------------------------------------------------------------------------
+    # _cached
+    # -------------------------------------------------------------------------
+
+    def _cached(self, url):
+        """
+        Function to check if the page of an url is already loaded
+        """
+
+        return self._parser is not None and self._parser.cached(url)
+
+    # -------------------------------------------------------------------------
+    # complete
+    # -------------------------------------------------------------------------
+
+    @property
+    def complete(self):
+        """
+        Property to check if the crawl is complete (not stopped by a budget)
+        """
+
+        return len(self._frontier) == 0 and len(self._deferred) == 0
+
+    # -------------------------------------------------------------------------
+    # _set_parser
+    # -------------------------------------------------------------------------
+
+    def _set_parser(self, url):
+        """
+        Function to select the parser of an url
+        """
 
         if 'geneanet' in url:
             if not isinstance(self._parser, Geneanet):
@@ -644,11 +991,239 @@ class Genealogy(GBase):
         else:
             self._parser = None
 
-        ref = self._parser.clean_query(url)
+    # -------------------------------------------------------------------------
+    # crawl
+    # -------------------------------------------------------------------------
+
+    def crawl(self):
+        """
+        Function to visit the frontier until empty or until the budget is exhausted (sequential driver)
+        A checkpoint is saved when due, when stopped by the budget or Ctrl-C and when the crawl fails
+        """
+
+        try:
+            visit = self._frontier.pop()
+            while visit is not None:
+
+                exhausted = self._budget.exhausted()
+                if exhausted:
+                    self._frontier.retry(visit)
+                    display(f"Budget exhausted after {exhausted}: {len(self._frontier):,} individuals left to visit", error=True)
+                    if self._checkpoint is not None:
+                        self.save_checkpoint()
+                    break
+
+                self._visiting = visit
+                relatives = self.visit(visit)
+                if relatives is not None:
+                    self._frontier.expand(visit, relatives, len(self._individuals[visit.ref].dates) > 0)
+                self._visiting = None
+
+                if self._checkpoint is not None:
+                    if self._checkpoint.stop:
+                        raise KeyboardInterrupt
+                    if self._checkpoint.due():
+                        self.save_checkpoint()
+
+                if self._progress is not None and self._progress.due():
+                    self._progress.snapshot(self.snapshot(isolated=True))
+
+                visit = self._frontier.pop()
+
+        except BaseException:
+            if self._checkpoint is not None:
+                self.save_checkpoint()
+            raise
+
+    # -------------------------------------------------------------------------
+    # save_checkpoint
+    # -------------------------------------------------------------------------
+
+    def save_checkpoint(self):
+        """
+        Function to save the state of the crawl: the frontier and the records changed since the last checkpoint
+        (individuals and families on disk are flushed, only their notes and urls are saved)
+        """
+
+        on_disk = isinstance(self._individuals, DiskStore)
+        if on_disk:
+            self._individuals.flush()
+            self._families.flush()
+
+        def records():
+            for kind, key in self._changes:
+                if kind == 'individual' and key in self._individuals:
+                    individual = self._individuals[key]
+                    for note in individual.portrait['notes']:
+                        yield ('note', note), note_table[note]
+                    if not on_disk:
+                        yield (kind, key), individual
+                elif kind == 'family' and not on_disk and key in self._families:
+                    yield (kind, key), self._families[key]
+                elif kind == 'url' and self._graph.url(key) is not None:
+                    yield (kind, key), self._graph.url(key)
+
+        state = {
+            'frontier': self._frontier,
+            'visiting': self._visiting,
+            'deferred': self._deferred,
+            'repositories': self._repositories,
+            'places': self._parser.places if self._parser is not None else None,
+        }
+
+        try:
+            self._checkpoint.save(state, records())
+            self._changes = {}
+        except Exception as e:
+            display(f"Checkpoint save: {type(e).__name__}", error=True)
+
+    # -------------------------------------------------------------------------
+    # snapshot
+    # -------------------------------------------------------------------------
+
+    def snapshot(self, isolated=False):
+        """
+        Function to get a copy of the genealogy to write while the crawl goes on
+        Only the tables are copied (the individuals and families are shared) unless isolated: the records are copied too
+        so that the writer of the snapshot (e.g. its GEDCOM ids) and the crawl never change the same records
+        The copies are kept for the next isolated snapshot (written once the previous one is done): only the records added
+        or replaced since then are copied (the crawl replaces the records, it does not change them)
+        Stores on disk are read by another connection (the records read are copies)
+        """
+
+        snapshot = copy.copy(self)
+
+        if isinstance(self._individuals, DiskStore):
+            snapshot._families = self._families.reader()
+            snapshot._individuals = self._individuals.reader(load=snapshot._attach)
+        elif isolated:
+            snapshot._families = self._copy(self._families, self._copies['families'])
+            snapshot._individuals = self._copy(self._individuals, self._copies['individuals'], snapshot._attach)
+        else:
+            snapshot._individuals = dict(self._individuals)
+            snapshot._families = dict(self._families)
+
+        snapshot._repositories = dict(self._repositories)
+
+        return snapshot
+
+    @staticmethod
+    def _copy(records, copies, load=None):
+        """
+        Function to get copies of the records: key -> copy (copies: key -> (record, copy) of the previous snapshot)
+        """
+
+        copied = {}
+        for key, record in records.items():
+            source, value = copies.get(key, (None, None))
+            if source is not record:
+                value = pickle.loads(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+                if load is not None:
+                    value = load(value)
+                copies[key] = (record, value)
+            copied[key] = value
+
+        # records gone (e.g. merged)
+        if len(copies) > len(copied):
+            for key in copies.keys() - copied.keys():
+                del copies[key]
+
+        return copied
+
+    def release(self):
+        """
+        Function to close the stores of a snapshot
+        """
+
+        if isinstance(self._individuals, DiskStore):
+            self._individuals.close()
+            self._families.close()
+
+    # -------------------------------------------------------------------------
+    # _attach
+    # -------------------------------------------------------------------------
+
+    def _attach(self, individual):
+        """
+        Function to attach an individual read from disk to the families of the genealogy
+        """
+
+        return individual.attach(self._families)
+
+    # -------------------------------------------------------------------------
+    # _restore
+    # -------------------------------------------------------------------------
+
+    def _restore(self, state, records):
+        """
+        Function to restore the state of a crawl (the interrupted visit is done again first)
+        The records saved are added and the relationships are built again from the individuals
+        """
+
+        self._frontier = state['frontier']
+        self._frontier.cached = self._cached
+        for visit in state['deferred'] + ([state['visiting']] if state['visiting'] is not None else []):
+            self._frontier.retry(visit)
+
+        self._repositories = state['repositories']
+
+        urls = {}
+        individuals = []
+        for (kind, key), value in records:
+            if kind == 'individual':
+                self._individuals[key] = value
+                individuals += [value]
+            elif kind == 'family':
+                self._families[key] = value
+            elif kind == 'note':
+                note_table.add(value)
+            elif kind == 'url':
+                urls.setdefault(value, []).append(key)
+
+        for individual in individuals:
+            self._attach(individual)
+
+        self._graph = RelationGraph()
+        self._spatial = None
+
+        for ref, individual in self._individuals.items():
+            self._graph.add(ref, individual, [individual.url] + urls.get(ref, []))
+            self._index_name(ref, individual)
+
+        if state['places'] is not None:
+            self._parser = Geneanet()
+            self._parser.places = state['places']
+
+        display(f"Resume: {len(self._individuals):,} individuals, {len(self._frontier):,} to visit")
+
+    # -------------------------------------------------------------------------
+    # visit
+    # -------------------------------------------------------------------------
+
+    def visit(self, visit):
+        """
+        Function to scrap one individual of the frontier (if not yet done) and return its relatives
+        None is returned when the visit is postponed by the limit of fetches of its repository
+        """
+
+        url = visit.url
+        force = visit.force
+
+        parsed_url = urlparse(url)
+        repository = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
+
+        self._set_parser(url)
+
+        ref = visit.ref
 
         if ref not in self._individuals:
 
-            # Parser
+            # Budget
+
+            fetched = not self._parser.cached(url) or force
+            if fetched and not self._budget.fetch(repository):
+                self._deferred += [visit]
+                return None
 
             # Source
 
@@ -662,35 +1237,129 @@ class Genealogy(GBase):
             # Individual
 
             self._individuals[ref] = GIndividual(self._parser, url, force)
+            self._spatial = None
+            self._changes[('individual', ref)] = None
+
+            self._budget.count(repository, fetched)
+
+            self._index_name(ref, self._individuals[ref])
+
+            if self._progress is not None:
+                self._progress.individual(ref, self._individuals[ref], visit.level)
+
+        # Families (added again if the visit was interrupted)
+
+        try:
+            new_families = self._individuals[ref].families
+            for family in new_families:
+                key = family_key(family.spousesref)
+                if key not in self._families:
+                    self._families[key] = family
+                    self._changes[('family', key)] = None
+        except Exception as e:
+            display(f"Add individual: {type(e).__name__}", error=True)
+
+        # Relationships
+
+        try:
+            self._graph.add(ref, self._individuals[ref], (url, self._individuals[ref].url))
+            self._changes[('url', url)] = None
+        except Exception as e:
+            display(f"Add relationships: {type(e).__name__}", error=True)
+
+        # Ascendants, spouses and descendants
+
+        individual = self._individuals[ref]
+
+        relatives = {
+            'parents': individual.parentsref,
+            'spouses': individual.spousesref,
+            'childs': individual.childsref,
+        }
+
+        return {direction: [(relative, urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', relative, ''))) for relative in refs if relative]
+                for direction, refs in relatives.items()}
+
+    # -------------------------------------------------------------------------
+    # _index_name
+    # -------------------------------------------------------------------------
+
+    def _index_name(self, ref, individual):
+        """
+        Function to add the name of an individual to the index of names
+        """
+
+        try:
+            self._names.add(ref, individual.portrait['firstname'], individual.portrait['lastname'])
+        except Exception as e:
+            display(f"Index name: {type(e).__name__}", error=True)
+
+    # -------------------------------------------------------------------------
+    # link
+    # -------------------------------------------------------------------------
+
+    def link(self, threshold=0.85):
+        """
+        Function to merge the individuals found in several repositories
+        """
+
+        mapping = Linkage(self, threshold).mapping()
+
+        if len(mapping) > 0:
+            self.merge(mapping)
+
+        return mapping
+
+    # -------------------------------------------------------------------------
+    # merge
+    # -------------------------------------------------------------------------
+
+    def merge(self, mapping):
+        """
+        Function to merge individuals: merged reference -> kept reference
+        """
+
+        # individuals
+
+        urls = {}
+        for old, new in mapping.items():
+            self._names.remove(old)
+            merged = self._individuals.pop(old)
+            kept = self._individuals[new]
+            kept.absorb(merged)
+            self._individuals[new] = kept
+            self._index_name(new, kept)
+            urls.setdefault(new, []).append(merged.url)
 
-            # Families
+        for ref in list(self._individuals):
+            individual = self._individuals[ref]
+            individual.remap(mapping)
+            self._individuals[ref] = individual
 
-            try:
-                new_families = self._individuals[ref].families
-                for family in new_families:
-                    if tuple(family.spousesref) not in self._families and tuple(family.spousesref)[::-1] not in self._families:
-                        self._families[tuple(family.spousesref)] = family
-            except Exception as e:
-                display(f"Add individual: {type(e).__name__}", error=True)
+        # families (of the same spouses once merged)
 
-            # Ascendants descendants and childs
+        families = {}
+        for family in list(self._families.values()):
+            family.remap(mapping)
+            key = family_key(family.spousesref)
+            if key in families:
+                families[key].absorb(family)
+            else:
+                families[key] = family
 
-            if level < self._max_level:
+        self._families.clear()
+        for key, family in families.items():
+            self._families[key] = family
 
-                if self._ascendants:
-                    for parent in self._individuals[ref].parentsref:
-                        parent = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', parent, ''))
-                        self.add_individual(parent, force, level + 1)
+        # relationships
 
-                if self._spouses:
-                    for spouse in self._individuals[ref].spousesref:
-                        spouse = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', spouse, ''))
-                        self.add_individual(spouse, force, level + 1)
+        self._graph = RelationGraph()
+        for ref, individual in self._individuals.items():
+            self._graph.add(ref, individual, [individual.url] + urls.get(ref, []))
+        self._kinship = None
+        self._spatial = None
 
-                if self._descendants:
-                    for child in self._individuals[ref].childsref:
-                        child = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', child, ''))
-                        self.add_individual(child, force, level + 1)
+        display(f"Merge: {len(mapping):,} individuals, {len(self._individuals):,} individuals and {len(self._families):,} families left")
 
     # -------------------------------------------------------------------------
     # gedcom
@@ -702,68 +1371,128 @@ class Genealogy(GBase):
         Function to get the GEDCOM of the genealogy
         """
 
-        # set gedcom id
-        individuals_table = {key: f"I{index + 1:05d}" for index, key in enumerate(self._individuals)}
-        families_table = {key: f"F{index + 1:05d}" for index, key in enumerate(self._families)}
+        output = io.StringIO()
+        self.write(output)
 
-        for individual in self._individuals.values():
-            individual.setids(individuals_table, families_table)
+        return output.getvalue()
 
-        for family in self._families.values():
-            family.setids(individuals_table, families_table)
+    # -------------------------------------------------------------------------
+    # lines
+    # -------------------------------------------------------------------------
+
+    def lines(self, ids=None, cache=None):
+        """
+        Function to get the GEDCOM lines of the genealogy, record after record
+        ids keeps the GEDCOM ids from one run to the next, cache keeps the records rendered in a previous run
+        """
+
+        # set gedcom id (numbered in order without id map)
+        if ids is None:
+            ids = IdMap()
+        individuals_table = ids.table('individuals', self._individuals)
+        families_table = ids.table('families', self._families)
+        notes_table = ids.notes()
 
         # HEADER
 
-        gedcom = "0 HEAD\n"
-        gedcom = gedcom + "1 SOUR GenealogyScrapping\n"
-        gedcom = gedcom + "2 VERS 1.0\n"
-        gedcom = gedcom + "2 NAME Genealogy Scrapping\n"
-        gedcom = gedcom + "1 GEDC\n"
-        gedcom = gedcom + "2 VERS 5.5.1\n"
-        gedcom = gedcom + "2 FORM LINEAGE-LINKED\n"
-        gedcom = gedcom + "1 CHAR UTF-8\n"
-        gedcom = gedcom + "1 SUBM @B00000@\n"
-        gedcom = gedcom + "\n"
+        yield "0 HEAD\n"
+        yield "1 SOUR GenealogyScrapping\n"
+        yield "2 VERS 1.0\n"
+        yield "2 NAME Genealogy Scrapping\n"
+        yield "1 GEDC\n"
+        yield "2 VERS 5.5.1\n"
+        yield "2 FORM LINEAGE-LINKED\n"
+        yield "1 CHAR UTF-8\n"
+        yield "1 SUBM @B00000@\n"
+        yield "\n"
 
         # SUBM
 
-        gedcom = gedcom + "0 @B00000@ SUBM\n"
-        gedcom = gedcom + "1 NAME Laurent Burais\n"
-        gedcom = gedcom + "1 CHAN\n"
-        gedcom = gedcom + f"2 DATE {datetime.today().strftime('%d %b %Y').upper()}\n"
-        gedcom = gedcom + "\n"
+        yield "0 @B00000@ SUBM\n"
+        yield "1 NAME Laurent Burais\n"
+        yield "1 CHAN\n"
+        yield f"2 DATE {datetime.today().strftime('%d %b %Y').upper()}\n"
+        yield "\n"
 
         # REPO
-        idx = 0
-        for informations in self._repositories.values():
 
-            gedcom = gedcom + f"0 @R{idx:05d}@ REPO\n"
+        for idx, informations in enumerate(self._repositories.values()):
+
+            yield f"0 @R{idx:05d}@ REPO\n"
             if 'author' in informations:
-                gedcom = gedcom + f"1 NAME {informations.author}\n"
+                yield f"1 NAME {informations.author}\n"
             if 'lastchange' in informations:
-                gedcom = gedcom + "1 CHAN\n"
-                gedcom = gedcom + f"2 DATE {informations.lastchange}\n"
-            gedcom = gedcom + f"1 WWW {informations.url}\n"
-            # gedcom = gedcom + f"1 TYPE {informations.source}\n"
-            gedcom = gedcom + "\n"
-
-            idx = idx + 1
+                yield "1 CHAN\n"
+                yield f"2 DATE {informations.lastchange.upper()}\n"
+            yield f"1 WWW {informations.url}\n"
+            # yield f"1 TYPE {informations.source}\n"
+            yield "\n"
 
         # INDI with SOUR and NOTE
 
-        for individual in self._individuals.values():
-            gedcom = gedcom + individual.gedcom
+        on_disk = isinstance(self._individuals, DiskStore)
+
+        for ref, individual in self._individuals.items():
+            if individual.setids(individuals_table, families_table, notes_table) and on_disk:
+                self._individuals.touch(ref, individual)
+            if cache is None:
+                yield from individual.lines()
+            else:
+                yield cache.render(individual)
 
         # FAM
 
-        for family in self._families.values():
-            gedcom = gedcom + family.gedcom
+        for key, family in self._families.items():
+            if family.setids(individuals_table, families_table) and on_disk:
+                self._families.touch(key, family)
+            if cache is None:
+                yield from family.lines()
+            else:
+                yield cache.render(family)
+
+        # NOTE shared by individuals
+
+        for note, noteid in notes_table.items():
+            yield from self._note(note_table[note], noteid)
 
         # TAILER
 
-        gedcom = gedcom + "0 TRLR"
+        yield "0 TRLR"
+
+    # -------------------------------------------------------------------------
+    # write
+    # -------------------------------------------------------------------------
+
+    def write(self, output, buffer_size=65536, ids=None, cache=None, validator=None):
+        """
+        Function to write the GEDCOM of the genealogy to a file (path or file handle) or a sink (callable) by buffers
+        The buffers are also fed to the validator if any
+        """
 
-        return gedcom
+        if isinstance(output, (str, Path)):
+            with open(output, "w", encoding="utf-8") as file:
+                self.write(file, buffer_size, ids, cache, validator)
+            return
+
+        write = output.write if hasattr(output, 'write') else output
+
+        def sink(text):
+            write(text)
+            if validator is not None:
+                validator.feed(text)
+
+        buffer = []
+        size = 0
+        for line in self.lines(ids, cache):
+            buffer += [line]
+            size += len(line)
+            if size >= buffer_size:
+                sink(''.join(buffer))
+                buffer = []
+                size = 0
+
+        if len(buffer) > 0:
+            sink(''.join(buffer))
 
     # -------------------------------------------------------------------------
     # places
@@ -787,6 +1516,126 @@ class Genealogy(GBase):
 
         return places
 
+    # -------------------------------------------------------------------------
+    # individuals
+    # -------------------------------------------------------------------------
+
+    @property
+    def individuals(self):
+        """
+        Function to get all individuals by reference
+        """
+
+        return self._individuals
+
+    # -------------------------------------------------------------------------
+    # families
+    # -------------------------------------------------------------------------
+
+    @property
+    def families(self):
+        """
+        Function to get all families by spouses' references
+        """
+
+        return self._families
+
+    # -------------------------------------------------------------------------
+    # graph
+    # -------------------------------------------------------------------------
+
+    @property
+    def graph(self):
+        """
+        Function to get the relationship graph of the individuals
+        """
+
+        return self._graph
+
+    # -------------------------------------------------------------------------
+    # names
+    # -------------------------------------------------------------------------
+
+    @property
+    def names(self):
+        """
+        Function to get the index of names (normalized, without particles and phonetic)
+        """
+
+        return self._names
+
+    # -------------------------------------------------------------------------
+    # levels
+    # -------------------------------------------------------------------------
+
+    @property
+    def levels(self):
+        """
+        Property to get the level (generation from the roots) where each individual was reached
+        """
+        return self._frontier.levels
+
+    # -------------------------------------------------------------------------
+    # kinship
+    # -------------------------------------------------------------------------
+
+    @property
+    def kinship(self):
+        """
+        Function to get the kinship queries (memoized) on the relationship graph
+        """
+
+        if self._kinship is None:
+            self._kinship = Kinship(self)
+
+        return self._kinship
+
+    # -------------------------------------------------------------------------
+    # spatial
+    # -------------------------------------------------------------------------
+
+    @property
+    def spatial(self):
+        """
+        Function to get the spatial index of places and events (built once)
+        """
+
+        if self._spatial is None:
+            self._spatial = SpatialIndex(self)
+
+        return self._spatial
+
+    # -------------------------------------------------------------------------
+    # replace_places
+    # -------------------------------------------------------------------------
+
+    def replace_places(self, merged):
+        """
+        Function to replace all the references to some places: place name -> place kept
+        (events of the individuals, of their families and of the families, places known by the parser)
+        """
+
+        def replace(data):
+            keys = [key for key, value in data.items() if key.endswith('place') and value is not None and value.name in merged]
+            for key in keys:
+                data[key] = merged[data[key].name]
+            return len(keys) > 0
+
+        for ref in list(self._individuals):
+            individual = self._individuals[ref]
+            changed = [replace(individual.portrait)] + [replace(family.portrait) for family in individual.families]
+            if any(changed):
+                # saved again (for disk stores)
+                self._individuals[ref] = individual
+
+        for key in list(self._families):
+            family = self._families[key]
+            if replace(family.portrait):
+                self._families[key] = family
+
+        if self._parser is not None:
+            self._parser.places.replace(merged)
+
     # -------------------------------------------------------------------------
     # dates
     # -------------------------------------------------------------------------
@@ -811,21 +1660,16 @@ class Genealogy(GBase):
     # print
     # -------------------------------------------------------------------------
 
-    def print(self, all_details=False):
+    def print(self, page=None):
         """
-        Function to print the genealogy
+        Function to print the summary of the genealogy and the details of one page of individuals and families on request
         """
 
-        if all_details:
-            display(self._individuals, title=f"{len(self._individuals)} Individuals")
+        report = Report(self)
+        report.summary()
 
-            display(self._families, title=f"{len(self._families)} Families")
-
-        for individual in self._individuals.values():
-            individual.print(short=False)
-
-        for family in self._families.values():
-            family.print(short=False)
+        if page is not None:
+            report.details(page)
 
     # -------------------------------------------------------------------------
     # html
@@ -836,8 +1680,9 @@ class Genealogy(GBase):
         Function to retrieve html for one individual
         """
 
-        try:
-            return [v.html for v in self._individuals.values() if v.url == url][0]
-        except Exception as e:
-            display(f"Genealogy html: {type(e).__name__}", error=True)
+        ref = self._graph.url(url)
+        if ref is None or ref not in self._individuals:
+            display(f"Genealogy html: {url} not found", error=True)
             return ""
+
+        return self._individuals[ref].html
@@ -26,7 +26,11 @@ Genealogy Scrapping
 import os
 import sys
 import re
+import signal
 import argparse
+import functools
+import logging
+import multiprocessing
 import subprocess
 import urllib
 from datetime import datetime
@@ -46,7 +50,153 @@ import pygedcom
 # -------------------------------------------------------------------------
 
 from common import display, console_save, get_folder
+import logs
 from genealogy import Genealogy
+from checkpoint import Checkpoint
+from idmap import IdMap, RenderCache
+from validator import GedcomValidator
+from frontier import Frontier, Budget
+from export import export
+from progress import Progress
+from renderer import renderer
+from stages import OutputStage
+
+# -------------------------------------------------------------------------
+#
+# outputs (stages run once a root is crawled, the values of the root are bound with functools.partial)
+#
+# -------------------------------------------------------------------------
+
+
+def write_gedcom(genealogy, gedcom_file, user_folder, validator, checkpoint, prune=False):
+    """
+    Function to write the GEDCOM file (checked by the validator while written)
+    """
+
+    gedcom_file.parent.mkdir(parents=True, exist_ok=True)
+    gedcom_file.unlink(missing_ok=True)
+
+    ids = IdMap(user_folder / "gedcom.ids.json")
+    cache = RenderCache(user_folder / "gedcom.cache.sqlite")
+
+    genealogy.write(gedcom_file, ids=ids, cache=cache, validator=validator)
+
+    ids.save(prune)
+    cache.close(prune)
+
+    # Crawl complete (otherwise stopped by the budget and resumable)
+
+    if genealogy.complete:
+        checkpoint.remove()
+
+
+def validate_gedcom(_, gedcom_file, validator, verify=False):
+    """
+    Function to display the check of the GEDCOM file (parsed again with pygedcom if verify)
+    """
+
+    check = validator.close()
+
+    display("")
+    if check['status'] == 'ok':
+        display(check['stats'], title=f"Your {str(gedcom_file)} file is valid")
+    else:
+        display(check['message'], title=f"Your {str(gedcom_file)} file is not valid")
+
+    if verify:
+
+        parser = pygedcom.GedcomParser(str(gedcom_file))
+        parser.parse()
+        check = parser.verify()
+
+        if check['status'] == 'ok':
+            display(parser.get_stats(), title=f"Your {str(gedcom_file)} file is valid (pygedcom)")
+        else:
+            display(check['message'], title=f"Your {str(gedcom_file)} file is not valid (pygedcom)")
+
+
+def save_places(genealogy, user_folder):
+    """
+    Function to save the places in a CSV file
+    """
+
+    places = genealogy.places
+    df = pd.DataFrame.from_dict({key: dict(value) for key, value in places.items()}).transpose()
+    df.drop(['search','node'], axis=1, inplace=True, errors='ignore')
+
+    output_file = user_folder / "places.csv"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.unlink(missing_ok=True)
+    df.to_csv(str(output_file))
+
+    # output_file = user_folder / "places.xls"
+    # output_file.parent.mkdir(parents=True, exist_ok=True)
+    # output_file.unlink(missing_ok=True)
+    # df.to_excel(str(output_file), engine='openpyxl')
+
+
+def save_tables(genealogy, user_folder):
+    """
+    Function to save the individuals, families and events as tables
+    """
+    export(genealogy, user_folder / "tables")
+
+
+def save_heatmap(genealogy, user_folder):
+    """
+    Function to save the events per place
+    """
+    genealogy.spatial.heatmap(user_folder / "heatmap")
+
+
+def report_places(genealogy, user_folder):
+    """
+    Function to report the places
+    """
+
+    display("")
+
+    places = genealogy.places
+    display(places, title=f"Places [{len(places)}]")
+
+    console_save(user_folder / "places")
+
+
+def report_dates(genealogy, user_folder):
+    """
+    Function to report the dates
+    """
+
+    display("")
+
+    dates = genealogy.dates
+    display(dates, title=f"Dates [{len(dates)}]")
+
+    console_save(user_folder / "dates")
+
+
+def report_genealogy(genealogy, user_folder, gedcom_file, individuals, details=None):
+    """
+    Function to report the genealogy (with the GEDCOM and the HTML of a single root)
+    """
+
+    genealogy.print(details)
+
+    if len(individuals) == 1:
+        display(gedcom_file.read_text(), title="GEDCOM")
+        display(genealogy.html(individuals[0]), title="HTML")
+
+    console_save(user_folder / "genealogy")
+
+
+def report_logs(_, user_folder):
+    """
+    Function to report the logs (the records of the crawl and of the other outputs)
+    """
+
+    display("")
+
+    console_save(user_folder / "logs")
 
 # -------------------------------------------------------------------------
 #
@@ -55,7 +205,9 @@ from genealogy import Genealogy
 # -------------------------------------------------------------------------
 
 
-def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouses=False, max_levels=0, force=False, one=False):
+def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouses=False, max_levels=0, force=False, one=False, storage=False, resume=False,
+                        priority='generation', max_pages=None, max_time=None, max_fetches=None, verify=False, seed=None,
+                        progress=None, details=None, prune=False):
     """
     Main function to start processing of genealogy
     """
@@ -66,6 +218,10 @@ def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouse
 
     root_folder = get_folder()
 
+    # Ctrl-C saves a checkpoint before stopping (installed once, whatever the root being crawled)
+
+    sigint = Checkpoint.handle_sigint()
+
     # Process individuals
 
     for individual in individuals:
@@ -75,7 +231,13 @@ def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouse
 
             if individual is individuals[0]:
                 # first of all
-                genealogy = Genealogy(max_levels, ascendants, spouses, descendants)
+                checkpoint = Checkpoint(root_folder / "geneanet" / "checkpoint.pickle")
+                output = Progress(root_folder / "geneanet", "geneanet", progress, resume) if progress else None
+                genealogy = Genealogy(max_levels, ascendants, spouses, descendants, root_folder / "geneanet" / "storage" if storage else None,
+                                      checkpoint=checkpoint, resume=resume, priority=priority, budget=Budget(max_pages, max_time, max_fetches),
+                                      progress=output)
+                if seed:
+                    genealogy.seed(seed)
 
             elif individual is individuals[-1]:
                 # last of all
@@ -83,7 +245,13 @@ def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouse
         else:
             # each
             userid = re.sub(r'^/', '', urllib.parse.urlparse(individual).path)
-            genealogy = Genealogy(max_levels, ascendants, spouses, descendants)
+            checkpoint = Checkpoint(root_folder / f"{userid}" / "checkpoint.pickle")
+            output = Progress(root_folder / f"{userid}", userid, progress, resume) if progress else None
+            genealogy = Genealogy(max_levels, ascendants, spouses, descendants, root_folder / f"{userid}" / "storage" if storage else None,
+                                  checkpoint=checkpoint, resume=resume, priority=priority, budget=Budget(max_pages, max_time, max_fetches),
+                                  progress=output)
+            if seed:
+                genealogy.seed(seed)
 
         # disable screenlock
 
@@ -96,6 +264,11 @@ def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouse
             if genealogy:
                 genealogy.add_individual(individual, force)
 
+        except KeyboardInterrupt:
+            process.terminate()
+            display("Interrupted: run again with --resume to continue", error=True)
+            raise
+
         except Exception as e:
             exc_type, exc_obj, exc_tb = sys.exc_info()
             message = f'{e} with scrapping [{exc_type} - {exc_obj}] ' + \
@@ -109,77 +282,73 @@ def genealogy_scrapping(individuals, ascendants=False, descendants=False, spouse
 
         if userid:
 
-            # Process GEDCOM output
+            # End of the progressive output (the provisional GEDCOM being written is waited for)
 
-            gedcom_file = root_folder / f"{userid}" / f"{userid}.ged"
-            gedcom_file.parent.mkdir(parents=True, exist_ok=True)
-            gedcom_file.unlink(missing_ok=True)
+            if output is not None:
+                output.close()
 
-            gedcom = genealogy.gedcom
+            # Merge individuals found in several repositories
 
-            gedcom_file.write_text(gedcom)
+            if one:
+                genealogy.link()
 
-            # Validate GEDCOM output
+            # Merge places with same coordinates
 
-            parser = pygedcom.GedcomParser(str(gedcom_file))
-            parser.parse()
-            check = parser.verify()
+            genealogy.spatial.merge()
 
-            display("")
-            if check['status'] == 'ok':
-                display(parser.get_stats(), title=f"Your {str(gedcom_file)} file is valid")
-            else:
-                display(check['message'], title=f"Your {str(gedcom_file)} file is not valid")
+            # Outputs run concurrently: the GEDCOM is written first into the genealogy (GEDCOM ids),
+            # the other outputs read their own snapshot and the reports are captured in their own segment
 
-            # Save to excel
+            user_folder = root_folder / f"{userid}"
 
-            places = genealogy.places
-            df = pd.DataFrame.from_dict(places).transpose()
-            df.drop(['search','address','details'], axis=1, inplace=True)
+            gedcom_file = user_folder / f"{userid}.ged"
+            validator = GedcomValidator()
 
-            output_file = root_folder / f"{userid}" / "places.csv"
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.unlink(missing_ok=True)
-            df.to_csv(str(output_file))
+            stage = OutputStage(genealogy)
 
-            # output_file = root_folder / f"{userid}" / "places.xls"
-            # output_file.parent.mkdir(parents=True, exist_ok=True)
-            # output_file.unlink(missing_ok=True)
-            # df.to_excel(str(output_file), engine='openpyxl')
+            # Process GEDCOM output
 
-            # Save logs
+            stage.add("gedcom", functools.partial(write_gedcom, gedcom_file=gedcom_file, user_folder=user_folder, validator=validator,
+                                                  checkpoint=checkpoint, prune=prune), access='shared')
 
-            display("")
+            # Validate GEDCOM output (checked while written, parsed again with pygedcom on demand)
 
-            console_save(root_folder / f"{userid}" / "logs")
+            stage.add("validation", functools.partial(validate_gedcom, gedcom_file=gedcom_file, validator=validator, verify=verify),
+                      after=["gedcom"], access=None)
 
-            # Save places
+            # Save to excel
 
-            display("")
+            stage.add("places.csv", functools.partial(save_places, user_folder=user_folder))
 
-            places = genealogy.places
-            display(places, title=f"Places [{len(places)}]")
+            # Save individuals, families and events as tables (with their GEDCOM ids)
 
-            console_save(root_folder / f"{userid}" / "places")
+            stage.add("tables", functools.partial(save_tables, user_folder=user_folder), after=["gedcom"])
 
-            # Save dates
+            # Save events per place
 
-            display("")
+            stage.add("heatmap", functools.partial(save_heatmap, user_folder=user_folder))
 
-            dates = genealogy.dates
-            display(dates, title=f"Dates [{len(dates)}]")
+            # Save places
+
+            stage.add("places", functools.partial(report_places, user_folder=user_folder), report=True)
 
-            console_save(root_folder / f"{userid}" / "dates")
+            # Save dates
+
+            stage.add("dates", functools.partial(report_dates, user_folder=user_folder), report=True)
 
             # Save outcome
 
-            genealogy.print()
+            stage.add("genealogy", functools.partial(report_genealogy, user_folder=user_folder, gedcom_file=gedcom_file, individuals=individuals,
+                                                     details=details), after=["gedcom"], report=True)
+
+            # Save logs (the records of the crawl and of the other outputs)
 
-            if len(individuals) == 1:
-                display(gedcom, title="GEDCOM")
-                display(genealogy.html(individuals[0]), title="HTML")
+            stage.add("logs", functools.partial(report_logs, user_folder=user_folder),
+                      after=["validation", "places.csv", "tables", "heatmap", "places", "dates", "genealogy"], access=None)
 
-            console_save(root_folder / f"{userid}" / "genealogy")
+            stage.run()
+
+    signal.signal(signal.SIGINT, sigint)
 
 ###################################################################################################################################
 # main
@@ -203,9 +372,26 @@ def main():
     parser.add_argument("-f", "--force", default=False, action='store_true', help="Force preloading web page (off by default)")
     parser.add_argument("-o", "--one", default=False, action='store_true', help="All in one file (off by default)")
     parser.add_argument("-u", "--unique", default=False, action='store_true', help="To test specific individuals (off by default)")
+    parser.add_argument("--storage", default=False, action='store_true', help="Keep individuals and families on disk (off by default)")
+    parser.add_argument("--resume", default=False, action='store_true', help="Resume from the last checkpoint (off by default)")
+    parser.add_argument("--verify", default=False, action='store_true', help="Verify the GEDCOM file again with pygedcom (off by default)")
+    parser.add_argument("--prune", default=False, action='store_true', help="Drop the GEDCOM ids of the records not written by this run (off by default)")
+    parser.add_argument("--seed", default=None, type=str, help="GEDCOM file of individuals already known (none by default)")
+    parser.add_argument("--progress", default=None, type=int, help="Write a provisional GEDCOM every N minutes during the crawl (off by default)")
+    parser.add_argument("--details", default=None, type=int, help="Print the details of the individuals and families of page N in the genealogy report (none by default)")
+    parser.add_argument("--log-level", default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help="Level of the records logged (INFO by default)")
+    parser.add_argument("--quiet", default=False, action='store_true', help="No display of the records on the console (off by default)")
+    parser.add_argument("--priority", default='generation', choices=Frontier.priorities, help="Order of the individuals to visit (generation by default)")
+    parser.add_argument("--max-pages", default=None, type=int, help="Maximum number of individuals to scrap (no limit by default)")
+    parser.add_argument("--max-time", default=None, type=int, help="Maximum duration of the crawl in minutes (no limit by default)")
+    parser.add_argument("--max-fetches", default=None, type=int, help="Maximum number of pages to load from the web per repository (no limit by default)")
     parser.add_argument("searchedindividual", type=str, nargs='?', help="Url of the individual to search in Geneanet")
     args = parser.parse_args()
 
+    # Records logged in the background (log file, spool of the reports and console view)
+
+    logs.start(get_folder() / "logs", getattr(logging, args.log_level), view=not args.quiet)
+
     force = args.force
     ascendants = args.ascendants
     descendants = args.descendants
@@ -213,6 +399,17 @@ def main():
     max_levels = args.level
     one = args.one
     unique = args.unique
+    storage = args.storage
+    resume = args.resume
+    priority = args.priority
+    verify = args.verify
+    seed = args.seed
+    prune = args.prune
+    progress = args.progress * 60 if args.progress else None
+    details = args.details
+    max_pages = args.max_pages
+    max_time = args.max_time * 60 if args.max_time is not None else None
+    max_fetches = args.max_fetches
 
     if max_levels is None:
         max_levels = 0
@@ -263,11 +460,25 @@ def main():
         'descendants': descendants,
         'spouses': spouses,
         'max_levels': max_levels,
+        'storage': storage,
+        'resume': resume,
+        'priority': priority,
+        'verify': verify,
+        'log_level': args.log_level,
+        'seed': seed,
+        'prune': prune,
+        'progress': progress,
+        'details': details,
+        'max_pages': max_pages,
+        'max_time': max_time,
+        'max_fetches': max_fetches,
         'searchedindividuals': searchedindividuals
     }
     display(params, title="Parameters")
 
-    genealogy_scrapping(searchedindividuals, ascendants, descendants, spouses, max_levels, force, one)
+    genealogy_scrapping(searchedindividuals, ascendants, descendants, spouses, max_levels, force, one, storage, resume,
+                        priority, max_pages, max_time, max_fetches, verify, seed,
+                        progress, details, prune)
 
 ###################################################################################################################################
 # __main__
@@ -276,17 +487,26 @@ def main():
 
 if __name__ == '__main__':
 
+    # the reports are rendered by spawned processes, which run this executable again once frozen (pyinstaller)
+    multiprocessing.freeze_support()
+
     start_time = datetime.now()
 
-    main()
+    try:
+        main()
+
+        display(f"Start at {start_time.strftime('%H:%M:%S')}...")
+        display(f"End at   {datetime.now().strftime('%H:%M:%S')}...")
 
-    display(f"Start at {start_time.strftime('%H:%M:%S')}...")
-    display(f"End at   {datetime.now().strftime('%H:%M:%S')}...")
+        duration = (datetime.now() - start_time).total_seconds()
 
-    duration = (datetime.now() - start_time).total_seconds()
+        hours = f"{int(duration // 3600):d}h " if (duration // 3600) > 0 else ""
+        minutes = f"{int((duration % 3600) // 60):d}mn " if ((duration % 3600) // 60) > 0 else ""
+        seconds = f"{int(duration % 60):d}s"
 
-    hours = f"{int(duration // 3600):d}h " if (duration // 3600) > 0 else ""
-    minutes = f"{int((duration % 3600) // 60):d}mn " if ((duration % 3600) // 60) > 0 else ""
-    seconds = f"{int(duration % 60):d}s"
+        display(f"In       {hours}{minutes}{seconds}\n")
 
-    display(f"In       {hours}{minutes}{seconds}\n")
+    finally:
+        # reports left are rendered, then records left are written
+        renderer.close()
+        logs.stop()
@@ -39,7 +39,9 @@ from bs4 import BeautifulSoup, Comment
 # -------------------------------------------------------------------------
 
 from common import display, get_folder, load_chrome
-from objects import Informations, Individual, Family, Place, Date
+from objects import Informations, Individual, Family, Date
+from places import PlaceIndex
+from notes import note_table
 
 # -------------------------------------------------------------------------
 #
@@ -53,31 +55,49 @@ class Geneanet:
     Class to process Geneanet content
     """
 
+    _clean = re.compile(r'^(?:(?:m|v|p|n|oc|i)=[A-Za-z0-9+._-]+&)*(?:m|v|p|n|oc|i)=[A-Za-z0-9+._-]+$')
+
     # -------------------------------------------------------------------------
     # __init__
     # -------------------------------------------------------------------------
     def __init__(self):
         self._folder = get_folder()
         self._html = None
-        self._places = {}
+        self._places = PlaceIndex()
         self._images = []
         self._documents = {}
 
+    # -------------------------------------------------------------------------
+    # _cache_file
+    # -------------------------------------------------------------------------
+    def _cache_file(self, url):
+
+        output_folder = self._folder / re.sub(r'^/', '', urllib.parse.urlparse(url).path)
+
+        if len(urllib.parse.urlparse(url).query) == 0:
+            output_file = "repository"
+        else:
+            output_file = self.clean_query(url).replace('=', "_").replace('+', " ").replace('&', ".")
+
+        return output_folder / (output_file + ".txt")
+
+    # -------------------------------------------------------------------------
+    # cached
+    # -------------------------------------------------------------------------
+    def cached(self, url):
+        """
+        Function to check if the page of an url is already loaded
+        """
+        return self._cache_file(url).resolve().exists()
+
     # -------------------------------------------------------------------------
     # _load
     # -------------------------------------------------------------------------
     def _load(self, url, force=False):
 
         try:
-            output_folder = self._folder / re.sub(r'^/', '', urllib.parse.urlparse(url).path)
-            output_folder.mkdir(parents=True, exist_ok=True)
-
-            if len(urllib.parse.urlparse(url).query) == 0:
-                output_file = "repository"
-            else:
-                output_file = self.clean_query(url).replace('=', "_").replace('+', " ").replace('&', ".")
-
-            output_file = output_folder / (output_file + ".txt")
+            output_file = self._cache_file(url)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
 
             # force fr language
 
@@ -206,10 +226,7 @@ class Geneanet:
 
                 where = event.group('place').strip()
 
-                if where not in self._places:
-                    self._places[where] = Place(where)
-
-                place = self._places[where]
+                place = self._places.get(where)
 
             except AttributeError:
                 pass
@@ -610,7 +627,7 @@ class Geneanet:
                 # -------------------------------------------------------------
                 elif 'relation' in section.name.lower() or 'related' in section.name.lower() or 'notes' in section.name.lower():
                     if len(section.content) > 0:
-                        person.data.notes = person.data.notes + self._scrap_notes(str(section.content))
+                        person.data.notes = person.data.notes + [note_table.add(note) for note in self._scrap_notes(str(section.content))]
 
                 # -------------------------------------------------------------
                 # Sources section
@@ -624,7 +641,7 @@ class Geneanet:
                                 for element in h2_element.find_all_previous():
                                     element.decompose()
                             if len(section.content) > 0:
-                                person.data.notes = person.data.notes + self._scrap_notes(str(section.content))
+                                person.data.notes = person.data.notes + [note_table.add(note) for note in self._scrap_notes(str(section.content))]
                         except Exception as e:
                             display(f"Sources: {type(e).__name__}", error=True)
 
@@ -683,7 +700,15 @@ class Geneanet:
         Function to return the query part of an url without unnecessary geneanet queries
         """
 
-        queries = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+        # queries already clean (kept queries only, with n and p, plain values) are returned as they are
+
+        query = urllib.parse.urlparse(url).query
+        if self._clean.match(query):
+            keys = [item.split('=', 1)[0] for item in query.split('&')]
+            if 'n' in keys and 'p' in keys and len(keys) == len(set(keys)):
+                return query
+
+        queries = urllib.parse.parse_qs(query)
         if len(queries) > 0:
             queries_to_keep = ['m', 'v', 'p', 'n', 'oc', 'i']
 
@@ -701,6 +726,21 @@ class Geneanet:
         else:
             return url
 
+    # -------------------------------------------------------------------------
+    # places
+    # -------------------------------------------------------------------------
+
+    @property
+    def places(self):
+        """
+        Function to return the index of places
+        """
+        return self._places
+
+    @places.setter
+    def places(self, places):
+        self._places = places
+
     # -------------------------------------------------------------------------
     # html
     # -------------------------------------------------------------------------
@@ -0,0 +1,172 @@
+# graph
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the relationship graph of a genealogy indexed by integers
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+from array import array
+
+# -------------------------------------------------------------------------
+# family_key
+# -------------------------------------------------------------------------
+
+
+def family_key(spousesref):
+    """
+    Function to get the key of a family whatever the order of the spouses
+    """
+    return tuple(sorted(spousesref, key=lambda ref: ref or ''))
+
+# --------------------------------------------------------------------------------------------------
+#
+# RelationGraph class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class RelationGraph:
+    """
+    Class of the relationships between individuals
+        - references are interned to dense integer ids
+        - parents, childs and spouses edges are kept as arrays of ids per individual
+        - urls are mapped to the references of the individuals
+        - the version is incremented each time an individual or an edge is added
+    """
+
+    version = 0
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self):
+
+        self._ids = {}
+        self._refs = []
+
+        self._parents = []
+        self._childs = []
+        self._spouses = []
+
+        self._urls = {}
+
+    # -------------------------------------------------------------------------
+    # intern
+    # -------------------------------------------------------------------------
+
+    def intern(self, ref):
+        """
+        Function to get the integer id of a reference (added when first seen)
+        """
+
+        idx = self._ids.get(ref)
+        if idx is None:
+            idx = len(self._refs)
+            self._ids[ref] = idx
+            self._refs += [ref]
+            self._parents += [array('l')]
+            self._childs += [array('l')]
+            self._spouses += [array('l')]
+            self.version += 1
+
+        return idx
+
+    # -------------------------------------------------------------------------
+    # _link
+    # -------------------------------------------------------------------------
+
+    def _link(self, edges, idx, other):
+        if other not in edges[idx]:
+            edges[idx].append(other)
+            self.version += 1
+
+    # -------------------------------------------------------------------------
+    # add
+    # -------------------------------------------------------------------------
+
+    def add(self, ref, individual, urls=()):
+        """
+        Function to add an individual with the edges to its parents, spouses and childs
+        """
+
+        idx = self.intern(ref)
+
+        for url in urls:
+            if url:
+                self._urls[url] = ref
+
+        for parent in individual.parentsref:
+            if parent:
+                other = self.intern(parent)
+                self._link(self._parents, idx, other)
+                self._link(self._childs, other, idx)
+
+        for family in individual.families:
+            for spouse in family.spousesref:
+                if spouse and spouse != ref:
+                    other = self.intern(spouse)
+                    self._link(self._spouses, idx, other)
+                    self._link(self._spouses, other, idx)
+            for child in family.childsref:
+                if child:
+                    other = self.intern(child)
+                    self._link(self._childs, idx, other)
+                    self._link(self._parents, other, idx)
+
+        return idx
+
+    # -------------------------------------------------------------------------
+    # lookups
+    # -------------------------------------------------------------------------
+
+    def id(self, ref):
+        """
+        Function to get the integer id of a reference (None if unknown)
+        """
+        return self._ids.get(ref)
+
+    def ref(self, idx):
+        """
+        Function to get the reference of an integer id
+        """
+        return self._refs[idx]
+
+    def url(self, url):
+        """
+        Function to get the reference of an individual from its url (None if unknown)
+        """
+        return self._urls.get(url)
+
+    def parents(self, idx):
+        return self._parents[idx]
+
+    def childs(self, idx):
+        return self._childs[idx]
+
+    def spouses(self, idx):
+        return self._spouses[idx]
+
+    def __contains__(self, ref):
+        return ref in self._ids
+
+    def __len__(self):
+        return len(self._refs)
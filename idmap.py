@@ -0,0 +1,244 @@
+# idmap
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the GEDCOM ids kept from one run to the next and the cache of the rendered records
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import json
+import os
+from pathlib import Path
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from storage import DiskStore
+
+# --------------------------------------------------------------------------------------------------
+#
+# IdMap class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class IdMap:
+    """
+    Class of the GEDCOM ids of individuals, families and notes (saved in a json file if a path is given)
+    New references get the next free number so the ids of the others never change
+    Every id ever given is kept (a run of a smaller scope or stopped by its budget does not lose the others)
+    unless pruned on request, the ids pruned are not given again
+    """
+
+    _prefixes = {'individuals': 'I', 'families': 'F', 'notes': 'N'}
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path=None):
+
+        self._path = Path(path) if path else None
+
+        self._ids = {kind: {} for kind in self._prefixes}
+        self._next = {kind: 1 for kind in self._prefixes}
+
+        # keys of this run
+        self._used = {kind: set() for kind in self._prefixes}
+
+        if self._path is not None and self._path.exists():
+            try:
+                saved = json.loads(self._path.read_text())
+                self._ids.update(saved['ids'])
+                self._next.update(saved['next'])
+            except Exception as e:
+                display(f"Id map load: {type(e).__name__}", error=True)
+
+    # -------------------------------------------------------------------------
+    # _key
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(key):
+        # families are keyed by the tuple of their spouses
+        return json.dumps(list(key)) if isinstance(key, tuple) else key
+
+    # -------------------------------------------------------------------------
+    # id
+    # -------------------------------------------------------------------------
+
+    def id(self, kind, key):
+        """
+        Function to get the GEDCOM id of a reference (a new one if first seen)
+        """
+
+        ids = self._ids[kind]
+        key = self._key(key)
+        self._used[kind].add(key)
+
+        if key not in ids:
+            ids[key] = f"{self._prefixes[kind]}{self._next[kind]:05d}"
+            self._next[kind] += 1
+
+        return ids[key]
+
+    # -------------------------------------------------------------------------
+    # table
+    # -------------------------------------------------------------------------
+
+    def table(self, kind, keys):
+        """
+        Function to get the GEDCOM ids of the references of this run
+        """
+        return {key: self.id(kind, key) for key in keys}
+
+    # -------------------------------------------------------------------------
+    # notes
+    # -------------------------------------------------------------------------
+
+    def notes(self):
+        """
+        Function to get an empty table of notes where notes get their ids when first seen
+        """
+        return IdTable(self, 'notes')
+
+    # -------------------------------------------------------------------------
+    # save
+    # -------------------------------------------------------------------------
+
+    def save(self, prune=False):
+        """
+        Function to write the ids atomically (only the ids used by this run if pruned)
+        """
+
+        if self._path is None:
+            return
+
+        pruned = 0
+        if prune:
+            for kind, ids in self._ids.items():
+                used = {key: value for key, value in ids.items() if key in self._used[kind]}
+                pruned += len(ids) - len(used)
+                self._ids[kind] = used
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary = self._path.with_suffix(self._path.suffix + ".tmp")
+        temporary.write_text(json.dumps({'ids': self._ids, 'next': self._next}))
+        os.replace(temporary, self._path)
+
+        if pruned > 0:
+            display(f"GEDCOM ids: {pruned:,} ids of records gone dropped")
+
+# --------------------------------------------------------------------------------------------------
+#
+# IdTable class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class IdTable(dict):
+    """
+    Class of the ids used in one run, the missing ones are taken from the id map
+    """
+
+    def __init__(self, ids, kind):
+        super().__init__()
+        self._map = ids
+        self._kind = kind
+
+    def __missing__(self, key):
+        self[key] = self._map.id(self._kind, key)
+        return self[key]
+
+# --------------------------------------------------------------------------------------------------
+#
+# RenderCache class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class RenderCache:
+    """
+    Class of the GEDCOM text of each record with the hash of the data it was rendered from
+    The GEDCOM file is always written whole: the text of a record whose data did not change is taken from the cache
+    instead of being rendered again
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path):
+
+        self._store = DiskStore(path, mutable=False)
+
+        self.rendered = 0
+        self.reused = 0
+
+        # GEDCOM ids of this run
+        self._used = set()
+
+    # -------------------------------------------------------------------------
+    # render
+    # -------------------------------------------------------------------------
+
+    def render(self, record):
+        """
+        Function to get the GEDCOM text of a record, rendered again only if its data changed
+        """
+
+        key = record.portrait['gedcomid']
+        if not key:
+            return ''.join(record.lines())
+
+        digest = record.digest
+        self._used.add(key)
+
+        cached = self._store.get(key)
+        if cached is not None and cached[0] == digest:
+            self.reused += 1
+            return cached[1]
+
+        text = ''.join(record.lines())
+        self._store[key] = (digest, text)
+        self.rendered += 1
+
+        return text
+
+    # -------------------------------------------------------------------------
+    # close
+    # -------------------------------------------------------------------------
+
+    def close(self, prune=False):
+        """
+        Function to close the cache (the records not written by this run are dropped if pruned)
+        """
+
+        gone = [key for key in self._store if key not in self._used] if prune else []
+        for key in gone:
+            del self._store[key]
+
+        display(f"GEDCOM records: {self.rendered:,} rendered, {self.reused:,} reused, {len(gone):,} dropped")
+        self._store.close()
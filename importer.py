@@ -0,0 +1,391 @@
+# importer
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to read the individuals and families of a GEDCOM to seed a genealogy
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import re
+from pathlib import Path
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from countries import countries
+from notes import note_table
+from objects import Individual, Family, Place
+
+_url = re.compile(r'https?://[^\s<>"]+')
+
+# --------------------------------------------------------------------------------------------------
+#
+# GedcomImporter class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class GedcomImporter:
+    """
+    Class to read a GEDCOM (written by an earlier run or exported by the owner of the tree) in one pass:
+        - INDI, FAM, NOTE and SOUR records, the other records are skipped
+        - the reference of an individual is taken from its Geneanet url (1 SOUR), its pointer otherwise
+        - places are read as written (PLAC and MAP), they are not searched again
+    """
+
+    _individual_events = {'BIRT': 'birth', 'DEAT': 'death', 'BAPM': 'baptem', 'CHR': 'baptem', 'BURI': 'burial'}
+    _family_events = {'MARR': 'marriage', 'DIV': 'divorce'}
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path, clean_query=None):
+
+        self._path = Path(path)
+
+        # function to get the reference of an url
+        self._clean_query = clean_query
+
+        # pointer -> record
+        self._individuals = {}
+        self._families = {}
+        self._notes = {}
+        self._sources = {}
+
+        # (name, latitude, longitude) -> place
+        self._places = {}
+
+        self._read()
+
+    # -------------------------------------------------------------------------
+    # _read
+    # -------------------------------------------------------------------------
+
+    def _read(self):
+        """
+        Function to read the records line by line (the tags of levels 1 and 2 give the context of the lines below them)
+        """
+
+        records = {
+            'INDI': (self._individuals, self._individual),
+            'FAM': (self._families, self._family),
+            'NOTE': (self._notes, self._note),
+            'SOUR': (self._sources, self._source),
+        }
+
+        record = None
+        handler = None
+        stack = [None, None]
+
+        with open(self._path, encoding='utf-8-sig', errors='replace') as file:
+            for line in file:
+                level, _, line = line.rstrip('\r\n').lstrip().partition(' ')
+
+                if level == '0':
+                    record = handler = None
+                    pointer, _, line = line.partition(' ')
+                    tag, _, value = line.partition(' ')
+                    if pointer.startswith('@') and tag in records:
+                        record = {'text': [value] if value else []}
+                        records[tag][0][pointer] = record
+                        handler = records[tag][1]
+                    continue
+
+                if handler is None or not level.isdigit():
+                    continue
+
+                level = int(level)
+                tag, _, value = line.partition(' ')
+
+                if level <= 2:
+                    stack[level - 1] = tag
+
+                handler(record, level, tag, value, stack)
+
+    # -------------------------------------------------------------------------
+    # _text
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _text(text, level, tag, value, depth):
+        """
+        Function to add a CONT or CONC line to a text
+        """
+
+        if level != depth:
+            return
+
+        if tag == 'CONT':
+            text += ['\n' + value]
+        elif tag == 'CONC':
+            text += [value]
+
+    # -------------------------------------------------------------------------
+    # _event
+    # -------------------------------------------------------------------------
+
+    def _event(self, record, level, tag, value, stack, events):
+        """
+        Function to read the DATE and the place of an event (EVENT, DATE, PLAC, MAP, LATI and LONG)
+        """
+
+        if level == 1:
+            if tag in events:
+                record.setdefault('events', {})[events[tag]] = {}
+            return
+
+        event = record.get('events', {}).get(events.get(stack[0]))
+        if event is None:
+            return
+
+        if level == 2 and tag == 'DATE':
+            event['date'] = value
+        elif level == 2 and tag == 'PLAC':
+            event['place'] = value
+        elif level == 4 and tag in ('LATI', 'LONG') and stack[1] == 'PLAC':
+            event[tag] = value
+
+    # -------------------------------------------------------------------------
+    # _individual
+    # -------------------------------------------------------------------------
+
+    def _individual(self, record, level, tag, value, stack):
+
+        if level == 1:
+            if tag == 'NAME' and 'name' not in record:
+                record['name'] = value
+            elif tag == 'SEX':
+                record['sex'] = value
+            elif tag == 'FAMS':
+                record.setdefault('fams', []).append(value)
+            elif tag == 'FAMC' and 'famc' not in record:
+                record['famc'] = value
+            elif tag in ('NOTE', 'SOUR'):
+                record.setdefault(tag, []).append([value])
+            else:
+                self._event(record, level, tag, value, stack, self._individual_events)
+
+        elif stack[0] == 'NAME':
+            if level == 2 and tag in ('GIVN', 'SURN') and tag not in record:
+                record[tag] = value
+
+        elif stack[0] in ('NOTE', 'SOUR'):
+            if stack[0] in record:
+                self._text(record[stack[0]][-1], level, tag, value, 2)
+
+        else:
+            self._event(record, level, tag, value, stack, self._individual_events)
+
+    # -------------------------------------------------------------------------
+    # _family
+    # -------------------------------------------------------------------------
+
+    def _family(self, record, level, tag, value, stack):
+
+        if level == 1 and tag in ('HUSB', 'WIFE') and tag not in record:
+            record[tag] = value
+        elif level == 1 and tag == 'CHIL':
+            record.setdefault('childs', []).append(value)
+        else:
+            self._event(record, level, tag, value, stack, self._family_events)
+
+    # -------------------------------------------------------------------------
+    # _note
+    # -------------------------------------------------------------------------
+
+    def _note(self, record, level, tag, value, _stack):
+        self._text(record['text'], level, tag, value, 1)
+
+    # -------------------------------------------------------------------------
+    # _source
+    # -------------------------------------------------------------------------
+
+    def _source(self, record, _level, _tag, value, _stack):
+        # only the urls of the sources are used
+        record['text'] += [value]
+
+    # -------------------------------------------------------------------------
+    # _url
+    # -------------------------------------------------------------------------
+
+    def _urls(self, record):
+        """
+        Function to get the urls of the sources of an individual (text or SOUR record), the first one per source
+        """
+
+        urls = []
+        for text in record.get('SOUR', []):
+            value = ''.join(text)
+            source = self._sources.get(value.strip())
+            if source is not None:
+                value = ' '.join(source['text'])
+
+            match = _url.search(value)
+            if match:
+                urls += [match.group(0)]
+
+        return urls
+
+    # -------------------------------------------------------------------------
+    # _place
+    # -------------------------------------------------------------------------
+
+    def _place(self, name, latitude=None, longitude=None):
+        """
+        Function to get the place of a PLAC value: locality, [department, [region,]] country
+        """
+
+        key = (name, latitude, longitude)
+        if key in self._places:
+            return self._places[key]
+
+        def coordinate(value):
+            try:
+                return -float(value[1:]) if value[0] in 'SW' else float(value.lstrip('NE'))
+            except (ValueError, IndexError):
+                return None
+
+        names = [part.strip() for part in name.split(',')]
+
+        # the hierarchy is read from the country (the locality may have commas)
+        result = {'toponymName': names[0]}
+        if len(names) > 1:
+            upper = names[max(1, len(names) - 3):]
+            result['toponymName'] = ', '.join(names[:len(names) - len(upper)])
+            result['countryName'] = upper[-1]
+            result['countryCode'] = countries.get(upper[-1])
+            if len(upper) > 1:
+                result['adminName1'] = upper[-2]
+            if len(upper) > 2:
+                result['adminName2'] = upper[-3]
+
+        if latitude and longitude:
+            result['lat'] = coordinate(latitude)
+            result['lng'] = coordinate(longitude)
+
+        self._places[key] = Place(name, result=result)
+
+        return self._places[key]
+
+    # -------------------------------------------------------------------------
+    # _data
+    # -------------------------------------------------------------------------
+
+    def _data(self, data, record):
+        """
+        Function to set the events of an individual or of a family
+        """
+
+        for event, values in record.get('events', {}).items():
+            data[event] = True
+            if values.get('date'):
+                data[f"{event}date"] = values['date']
+            if values.get('place'):
+                data[f"{event}place"] = self._place(values['place'], values.get('LATI'), values.get('LONG'))
+
+    # -------------------------------------------------------------------------
+    # individuals
+    # -------------------------------------------------------------------------
+
+    def individuals(self):
+        """
+        Function to get the individuals with their families and the directions where their relatives are in the GEDCOM
+        """
+
+        # references
+
+        refs = {}
+        for pointer, record in self._individuals.items():
+            urls = self._urls(record)
+            url = urls[0] if len(urls) > 0 else None
+            record['url'] = url
+            record['sources'] = urls[1:]
+            refs[pointer] = self._clean_query(url) if url and self._clean_query else (url or pointer)
+
+        # families
+
+        families = {}
+        for pointer, record in self._families.items():
+            family = Family()
+            family.spousesref = [refs.get(record.get('HUSB')), refs.get(record.get('WIFE'))]
+            family.childsref = [refs[child] for child in record.get('childs', []) if child in refs]
+            self._data(family.data, record)
+            families[pointer] = family
+
+        # individuals
+
+        for pointer, record in self._individuals.items():
+            individual = Individual()
+            individual.ref = refs[pointer]
+
+            data = individual.data
+            data.url = record['url']
+            data.sources = record['sources']
+
+            name = record.get('name', '')
+            firstname, _, lastname = name.partition('/')
+            data.firstname = record.get('GIVN', firstname.strip()) or None
+            data.lastname = record.get('SURN', lastname.strip('/ ')) or None
+
+            if record.get('sex'):
+                data.sex = record['sex']
+
+            self._data(data, record)
+
+            for text in record.get('NOTE', []):
+                note = self._notes.get(''.join(text).strip())
+                note = ''.join(note['text'] if note is not None else text)
+                if note:
+                    data.notes = data.notes + [note_table.add(note)]
+
+            family = families.get(record.get('famc'))
+            if family is not None:
+                individual.parentsref = [ref for ref in family.spousesref if ref]
+                individual.siblingsref = [ref for ref in family.childsref if ref != individual.ref]
+
+            individual.familiesref = [families[pointer] for pointer in record.get('fams', []) if pointer in families]
+
+            known = {
+                'parents': family is not None,
+                'spouses': len(individual.familiesref) > 0,
+                'childs': len(individual.familiesref) > 0,
+            }
+
+            yield individual, known
+
+    def __len__(self):
+        return len(self._individuals)
+
+    # -------------------------------------------------------------------------
+    # summary
+    # -------------------------------------------------------------------------
+
+    def summary(self):
+        """
+        Function to display the number of records read
+        """
+
+        display(f"GEDCOM {self._path.name}: {len(self._individuals):,} individuals, {len(self._families):,} families, "
+                f"{len(self._notes):,} notes, {len(self._sources):,} sources, {len(self._places):,} places")
@@ -0,0 +1,381 @@
+# kinship
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the kinship queries on the relationship graph of a genealogy
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+from collections import deque
+
+# -------------------------------------------------------------------------
+# bitsets
+# -------------------------------------------------------------------------
+
+
+def _bitset(ids, size):
+    """
+    Function to get the bitset (int) of a collection of ids
+    """
+
+    buffer = bytearray((size + 7) // 8)
+    for idx in ids:
+        buffer[idx >> 3] |= 1 << (idx & 7)
+
+    return int.from_bytes(buffer, 'little')
+
+
+def _members(bits):
+    """
+    Function to get the ids of a bitset (int)
+    """
+
+    ids = []
+    for offset, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+        while byte:
+            low = byte & -byte
+            ids += [(offset << 3) + low.bit_length() - 1]
+            byte ^= low
+
+    return ids
+
+# --------------------------------------------------------------------------------------------------
+#
+# Kinship class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Kinship:
+    """
+    Class of the kinship queries (ancestors, descendants, Sosa numbers, common ancestors, relationships and implex)
+    Results are memoized until the graph changes (individual or edge added)
+    """
+
+    _names = {
+        'self': ('self', 'self', 'self'),
+        'parent': ('father', 'mother', 'parent'),
+        'child': ('son', 'daughter', 'child'),
+        'sibling': ('brother', 'sister', 'sibling'),
+        'half-sibling': ('half-brother', 'half-sister', 'half-sibling'),
+        'pibling': ('uncle', 'aunt', 'uncle or aunt'),
+        'nibling': ('nephew', 'niece', 'nephew or niece'),
+    }
+
+    # Sosa numbers kept per ancestor (their number doubles with each implex above them)
+    _sosa_limit = 64
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, genealogy):
+
+        self._genealogy = genealogy
+        self._graph = genealogy.graph
+
+        self._version = self._graph.version
+        self._cache = {}
+
+    # -------------------------------------------------------------------------
+    # _memoized
+    # -------------------------------------------------------------------------
+
+    def _memoized(self, key, function, *args):
+        """
+        Function to get a memoized result (the cache is cleared when the graph has changed)
+        """
+
+        if self._graph.version != self._version:
+            self._version = self._graph.version
+            self._cache.clear()
+
+        if key not in self._cache:
+            self._cache[key] = function(*args)
+
+        return self._cache[key]
+
+    # -------------------------------------------------------------------------
+    # _id
+    # -------------------------------------------------------------------------
+
+    def _id(self, ref):
+        idx = self._graph.id(ref)
+        if idx is None:
+            raise KeyError(ref)
+        return idx
+
+    # -------------------------------------------------------------------------
+    # _depths
+    # -------------------------------------------------------------------------
+
+    def _depths(self, idx, edges):
+        """
+        Function to get the minimum number of generations to each relative in one direction (breadth-first)
+        """
+
+        depths = {idx: 0}
+        queue = deque([idx])
+        while len(queue) > 0:
+            current = queue.popleft()
+            for other in edges(current):
+                if other not in depths:
+                    depths[other] = depths[current] + 1
+                    queue.append(other)
+
+        return depths
+
+    def _ancestors_depths(self, ref):
+        idx = self._id(ref)
+        return self._memoized(('ancestors', idx), self._depths, idx, self._graph.parents)
+
+    def _descendants_depths(self, ref):
+        idx = self._id(ref)
+        return self._memoized(('descendants', idx), self._depths, idx, self._graph.childs)
+
+    # -------------------------------------------------------------------------
+    # ancestors
+    # -------------------------------------------------------------------------
+
+    def ancestors_bits(self, ref):
+        """
+        Function to get the bitset of the ancestors of an individual
+        """
+
+        idx = self._id(ref)
+        return self._memoized(('ancestors_bits', idx), lambda: _bitset((other for other in self._ancestors_depths(ref) if other != idx), len(self._graph)))
+
+    def ancestors(self, ref):
+        """
+        Function to get the references of the ancestors of an individual
+        """
+        return [self._graph.ref(idx) for idx in _members(self.ancestors_bits(ref))]
+
+    # -------------------------------------------------------------------------
+    # descendants
+    # -------------------------------------------------------------------------
+
+    def descendants_bits(self, ref):
+        """
+        Function to get the bitset of the descendants of an individual
+        """
+
+        idx = self._id(ref)
+        return self._memoized(('descendants_bits', idx), lambda: _bitset((other for other in self._descendants_depths(ref) if other != idx), len(self._graph)))
+
+    def descendants(self, ref):
+        """
+        Function to get the references of the descendants of an individual
+        """
+        return [self._graph.ref(idx) for idx in _members(self.descendants_bits(ref))]
+
+    # -------------------------------------------------------------------------
+    # _sex
+    # -------------------------------------------------------------------------
+
+    def _sex(self, ref):
+        """
+        Function to get the sex of an individual (U if unknown or not scraped)
+        """
+
+        individuals = self._genealogy.individuals
+        if ref in individuals:
+            sex = individuals[ref].portrait['sex']
+            if sex in ('M', 'F'):
+                return sex
+
+        return 'U'
+
+    # -------------------------------------------------------------------------
+    # sosa
+    # -------------------------------------------------------------------------
+
+    def _parents(self, idx):
+        """
+        Function to get the parents of an individual: father first, then mother, otherwise in the order of the page
+        """
+
+        parents = list(self._graph.parents(idx))
+        sexes = [self._sex(self._graph.ref(parent)) for parent in parents]
+
+        if len(parents) == 2 and sexes in (['F', 'M'], ['F', 'U'], ['U', 'M']):
+            parents.reverse()
+
+        return parents[:2]
+
+    def _numbers(self, idx):
+        """
+        Function to get the Sosa numbers of the ancestors generation by generation (the smallest ones up to the limit)
+        An individual reached again (implex) passes its numbers on to its ancestors
+        """
+
+        # no line is longer than the number of ancestors (unless the data has a cycle)
+        limit = len(self._ancestors_depths(self._graph.ref(idx)))
+
+        numbers = {}
+        generation = {idx: [1]}
+        while len(generation) > 0 and limit >= 0:
+            for current, values in generation.items():
+                numbers[current] = sorted(numbers.get(current, []) + values)[:self._sosa_limit]
+
+            following = {}
+            for current, values in generation.items():
+                for position, parent in enumerate(self._parents(current)):
+                    following.setdefault(parent, []).extend(2 * number + position for number in values)
+            generation = {parent: sorted(values)[:self._sosa_limit] for parent, values in following.items()}
+            limit -= 1
+
+        return numbers
+
+    def _paths(self, idx):
+        """
+        Function to count the lines to each ancestor by generation (without enumerating the Sosa numbers)
+        """
+
+        limit = len(self._ancestors_depths(self._graph.ref(idx)))
+
+        counts = []
+        generation = {idx: 1}
+        while len(generation) > 0 and len(counts) <= limit:
+            counts += [generation]
+
+            following = {}
+            for current, count in generation.items():
+                for parent in self._parents(current):
+                    following[parent] = following.get(parent, 0) + count
+            generation = following
+
+        return counts
+
+    def sosa(self, root):
+        """
+        Function to get the Sosa-Stradonitz (Ahnentafel) numbers of the ancestors of the root: reference -> numbers
+        An ancestor reached by many lines keeps its smallest numbers only (see _sosa_limit), implex counts them all
+        """
+
+        idx = self._id(root)
+        numbers = self._memoized(('sosa', idx), self._numbers, idx)
+
+        return {self._graph.ref(other): values for other, values in numbers.items()}
+
+    # -------------------------------------------------------------------------
+    # implex
+    # -------------------------------------------------------------------------
+
+    def implex(self, root):
+        """
+        Function to get the ancestors of the root reached by more than one line: reference -> number of lines
+        """
+
+        idx = self._id(root)
+        counts = self._memoized(('paths', idx), self._paths, idx)
+
+        lines = {}
+        for paths in counts:
+            for other, count in paths.items():
+                lines[other] = lines.get(other, 0) + count
+
+        return {self._graph.ref(other): count for other, count in lines.items() if count > 1}
+
+    def implex_rate(self, root):
+        """
+        Function to get the implex rate per generation: 1 - distinct ancestors / ancestors found
+        """
+
+        idx = self._id(root)
+        counts = self._memoized(('paths', idx), self._paths, idx)
+
+        return {generation: 1 - len(paths) / sum(paths.values()) for generation, paths in enumerate(counts)}
+
+    # -------------------------------------------------------------------------
+    # mrca
+    # -------------------------------------------------------------------------
+
+    def mrca(self, first, second):
+        """
+        Function to get the most recent common ancestors of two individuals with the generations from each of them
+        Returns a list of (reference, generations from first, generations from second)
+        """
+
+        first_depths = self._ancestors_depths(first)
+        second_depths = self._ancestors_depths(second)
+
+        common = first_depths.keys() & second_depths.keys()
+        if len(common) == 0:
+            return []
+
+        candidates = [(first_depths[idx] + second_depths[idx], idx) for idx in sorted(common)]
+        best = min(distance for distance, _ in candidates)
+
+        return [(self._graph.ref(idx), first_depths[idx], second_depths[idx]) for distance, idx in candidates if distance == best]
+
+    # -------------------------------------------------------------------------
+    # relationship
+    # -------------------------------------------------------------------------
+
+    def _name(self, kind, sex, great=0, grand=False):
+        name = self._names[kind][('M', 'F', 'U').index(sex)]
+        if grand:
+            name = "grand" + name
+        return "great-" * great + name
+
+    def relationship(self, first, second):
+        """
+        Function to get the name of the relationship of the second individual to the first one (None if not related by blood)
+        """
+
+        ancestors = self.mrca(first, second)
+        if len(ancestors) == 0:
+            return None
+
+        _, up, down = ancestors[0]
+        sex = self._sex(second)
+
+        if up == 0 and down == 0:
+            return self._name('self', sex)
+
+        if down == 0:
+            return self._name('parent', sex, max(up - 2, 0), up > 1)
+
+        if up == 0:
+            return self._name('child', sex, max(down - 2, 0), down > 1)
+
+        if up == 1 and down == 1:
+            return self._name('sibling' if len(ancestors) > 1 else 'half-sibling', sex)
+
+        if down == 1:
+            return self._name('pibling', sex, up - 2)
+
+        if up == 1:
+            return self._name('nibling', sex, down - 2)
+
+        degree = min(up, down) - 1
+        removed = abs(up - down)
+
+        suffix = 'th' if 10 < degree % 100 < 14 else {1: 'st', 2: 'nd', 3: 'rd'}.get(degree % 10, 'th')
+        name = f"{degree}{suffix} cousin"
+        if removed == 1:
+            name += " once removed"
+        elif removed == 2:
+            name += " twice removed"
+        elif removed > 2:
+            name += f" {removed} times removed"
+
+        return name
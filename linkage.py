@@ -0,0 +1,278 @@
+# linkage
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to link the records of the same individuals scraped from different repositories
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import re
+import zlib
+from urllib.parse import urlparse
+
+# https://pypi.org/project/numpy/
+# pip3 install numpy
+import numpy as np
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display, fold
+from names import soundex, core
+
+# --------------------------------------------------------------------------------------------------
+#
+# Linkage class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Linkage:
+    """
+    Class to find the individuals of different repositories that are the same person
+        - blocking on the phonetic surname (without particles), the initial of the given name and the birth decade
+        - scoring of the pairs of a block by chunks of rows and columns on names (trigrams), birth and death years and birth place
+        - clustering of the best pairs first with at most one individual per repository in a cluster
+    """
+
+    _bits = 256
+
+    # rows and columns of the score matrices computed at once (a block of any size is compared chunk by chunk)
+    _chunk = 1024
+
+    _weights = {'firstname': 0.35, 'lastname': 0.2, 'birth': 0.25, 'death': 0.1, 'place': 0.1}
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, genealogy, threshold=0.85):
+
+        self._threshold = threshold
+
+        self._refs = []
+        repositories = []
+        firstnames = []
+        lastnames = []
+        surnames = []
+        sexes = []
+        births = []
+        deaths = []
+        places = []
+
+        for ref, individual in genealogy.individuals.items():
+            data = individual.portrait
+
+            self._refs += [ref]
+            repositories += [urlparse(data['url'] or '').path]
+            firstnames += [fold(data['firstname'] or '')]
+            lastnames += [fold(data['lastname'] or '')]
+            surnames += [soundex(core(data['lastname'] or ''))]
+            sexes += [data['sex'] if data['sex'] in ('M', 'F') else '']
+            births += [self._year(data['birthdate'])]
+            deaths += [self._year(data['deathdate'])]
+            places += [fold(data['birthplace'].name) if data['birthplace'] else '']
+
+        codes = {repository: code for code, repository in enumerate(dict.fromkeys(repositories))}
+        self._repositories = np.array([codes[repository] for repository in repositories], dtype=np.int64)
+        self._sexes = np.array(sexes)
+
+        self._births = np.array(births, dtype=np.float64)
+        self._deaths = np.array(deaths, dtype=np.float64)
+
+        self._firstnames = self._trigrams(firstnames)
+        self._lastnames = self._trigrams(lastnames)
+        self._places = self._trigrams(places)
+
+        # blocks: phonetic surname, given name initial and birth decade (neighbour decade near its bounds)
+
+        self._blocks = {}
+        for idx, (firstname, surname, birth) in enumerate(zip(firstnames, surnames, births)):
+            if not surname:
+                continue
+            buckets = {None} if birth is None else {int(birth - 2) // 10, int(birth + 2) // 10}
+            for bucket in buckets:
+                self._blocks.setdefault((surname, firstname[:1], bucket), []).append(idx)
+
+    # -------------------------------------------------------------------------
+    # _year
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _year(date):
+        """
+        Function to get the (first) year of a GEDCOM date
+        """
+
+        match = re.search(r'\b(\d{3,4})\b', str(date)) if date else None
+
+        return float(match.group(1)) if match else None
+
+    # -------------------------------------------------------------------------
+    # _trigrams
+    # -------------------------------------------------------------------------
+
+    def _trigrams(self, texts):
+        """
+        Function to get the hashed character trigrams of texts as packed bits
+        """
+
+        vectors = np.zeros((len(texts), self._bits), dtype=np.uint8)
+        for idx, text in enumerate(texts):
+            if text:
+                text = f" {text} "
+                for position in range(len(text) - 2):
+                    vectors[idx, zlib.crc32(text[position:position + 3].encode('utf-8')) % self._bits] = 1
+
+        return np.packbits(vectors, axis=1)
+
+    # -------------------------------------------------------------------------
+    # _jaccard
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _jaccard(rows, columns, missing):
+        """
+        Function to get the Jaccard similarity of the pairs of trigram vectors of rows and columns (missing value if empty)
+        """
+
+        rows = np.unpackbits(rows, axis=1).astype(np.float32)
+        columns = np.unpackbits(columns, axis=1).astype(np.float32)
+        rows_sizes = rows.sum(axis=1)
+        columns_sizes = columns.sum(axis=1)
+
+        inter = rows @ columns.T
+        union = rows_sizes[:, None] + columns_sizes[None, :] - inter
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(union > 0, inter / union, missing)
+
+        empty = (rows_sizes[:, None] == 0) | (columns_sizes[None, :] == 0)
+
+        return np.where(empty, missing, score)
+
+    # -------------------------------------------------------------------------
+    # _years
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _years(rows, columns):
+        """
+        Function to get the agreement of the pairs of years of rows and columns (0.5 if unknown)
+        """
+
+        diff = np.abs(rows[:, None] - columns[None, :])
+
+        score = np.select([diff == 0, diff <= 1, diff <= 2], [1.0, 0.7, 0.4], 0.0)
+
+        return np.where(np.isnan(diff), 0.5, score)
+
+    # -------------------------------------------------------------------------
+    # pairs
+    # -------------------------------------------------------------------------
+
+    def pairs(self):
+        """
+        Function to get the pairs of individuals scored above the threshold: (i, j) -> score
+        """
+
+        pairs = {}
+
+        for block in self._blocks.values():
+            if len(block) < 2:
+                continue
+
+            block = np.array(block, dtype=np.int64)
+
+            repositories = self._repositories[block]
+            if np.all(repositories == repositories[0]):
+                continue
+
+            for start in range(0, len(block), self._chunk):
+                for other in range(start, len(block), self._chunk):
+                    self._score(block[start:start + self._chunk], block[other:other + self._chunk], start == other, pairs)
+
+        return pairs
+
+    # -------------------------------------------------------------------------
+    # _score
+    # -------------------------------------------------------------------------
+
+    def _score(self, rows, columns, diagonal, pairs):
+        """
+        Function to add the pairs of rows and columns scored above the threshold (each pair once on the diagonal)
+        """
+
+        score = self._weights['firstname'] * self._jaccard(self._firstnames[rows], self._firstnames[columns], 0.0) + \
+            self._weights['lastname'] * self._jaccard(self._lastnames[rows], self._lastnames[columns], 0.0) + \
+            self._weights['birth'] * self._years(self._births[rows], self._births[columns]) + \
+            self._weights['death'] * self._years(self._deaths[rows], self._deaths[columns]) + \
+            self._weights['place'] * self._jaccard(self._places[rows], self._places[columns], 0.5)
+
+        # pairs of different repositories and compatible sex only
+
+        rows_sexes, columns_sexes = self._sexes[rows], self._sexes[columns]
+        mask = self._repositories[rows][:, None] != self._repositories[columns][None, :]
+        if diagonal:
+            mask = np.triu(mask, k=1)
+        mask &= (rows_sexes[:, None] == columns_sexes[None, :]) | (rows_sexes[:, None] == '') | (columns_sexes[None, :] == '')
+        mask &= score >= self._threshold
+
+        for i, j in zip(*np.nonzero(mask)):
+            first, second = int(rows[i]), int(columns[j])
+            pairs[(min(first, second), max(first, second))] = float(score[i, j])
+
+    # -------------------------------------------------------------------------
+    # mapping
+    # -------------------------------------------------------------------------
+
+    def mapping(self):
+        """
+        Function to get the references to merge: merged reference -> kept reference (the first one scraped)
+        """
+
+        parent = list(range(len(self._refs)))
+        repositories = {idx: {int(self._repositories[idx])} for idx in range(len(self._refs))}
+
+        def find(idx):
+            while parent[idx] != idx:
+                parent[idx] = parent[parent[idx]]
+                idx = parent[idx]
+            return idx
+
+        pairs = self.pairs()
+        for i, j in sorted(pairs, key=lambda pair: -pairs[pair]):
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j or repositories[root_i] & repositories[root_j]:
+                continue
+
+            # the root is the first individual scraped
+            root_i, root_j = min(root_i, root_j), max(root_i, root_j)
+            parent[root_j] = root_i
+            repositories[root_i] |= repositories.pop(root_j)
+
+        mapping = {self._refs[idx]: self._refs[find(idx)] for idx in range(len(self._refs)) if find(idx) != idx}
+
+        display(f"Linkage: {len(self._blocks):,} blocks, {len(pairs):,} pairs, {len(mapping):,} individuals merged")
+
+        return mapping
@@ -0,0 +1,416 @@
+# logs
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the structured log of the displays: leveled JSON Lines records written by a background thread
+    - a rotating log file of all the records
+    - a spool file of the records of the current report segment (see segment)
+    - an optional Rich view of the records on the console
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# https://rich.readthedocs.io/en/stable/
+# https://pypi.org/project/rich/
+# pip3 install rich
+
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.text import Text
+from rich.pretty import Pretty
+from rich.table import Table
+
+# -------------------------------------------------------------------------
+# logger
+# -------------------------------------------------------------------------
+
+logger = logging.getLogger("genealogy")
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+console = Console(width=132)
+
+_fields = ('kind', 'title', 'data', 'trace')
+
+# -------------------------------------------------------------------------
+# plain
+# -------------------------------------------------------------------------
+
+
+def plain(what):
+    """
+    Function to convert records (mappings) into plain json values (other objects are kept as their repr)
+    """
+
+    if isinstance(what, Mapping):
+        return {str(key): plain(value) for key, value in what.items()}
+
+    if isinstance(what, (list, tuple, set)):
+        return [plain(value) for value in what]
+
+    if what is None or isinstance(what, (str, int, float, bool)):
+        return what
+
+    return repr(what)
+
+# -------------------------------------------------------------------------
+# fields
+# -------------------------------------------------------------------------
+
+
+def fields(record):
+    """
+    Function to get the fields of a log record as saved in JSON Lines
+    """
+
+    return {
+        'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+        'level': record.levelname,
+        'message': record.getMessage(),
+        **{name: getattr(record, name, None) for name in _fields},
+    }
+
+# -------------------------------------------------------------------------
+# render
+# -------------------------------------------------------------------------
+
+
+def render(view, record):
+    """
+    Function to print a record (fields) with a Rich console
+    """
+
+    kind = record.get('kind')
+    title = record.get('title')
+    message = record.get('message') or ''
+
+    if kind == 'data':
+        if title:
+            view.print('\n', Panel(Text(title), style="green"))
+        view.print(Pretty(record.get('data')))
+
+    elif kind == 'exception':
+        view.print(Panel(Text(message), style="red"))
+        view.print(record.get('trace') or '')
+
+    elif kind == 'error':
+        view.print(Text(f"[ERROR] {message}", style="bright_white on red"))
+
+    elif kind == 'heading':
+        view.print(Panel(Text(message.upper()), style="black"))
+
+    elif kind == 'section':
+        view.print('\n', Panel(Text(message), style="cyan"), '\n')
+
+    elif kind == 'titled':
+        view.print('\n', Panel(Text(title), style="cyan"))
+        view.print(message)
+
+    elif kind == 'markdown':
+        view.print(Markdown(message))
+
+    elif kind == 'table':
+        data = record.get('data') or {}
+        table = Table(*data.get('columns', []), title=title, title_justify="left", header_style="cyan")
+        for row in data.get('rows', []):
+            table.add_row(*row)
+        view.print(table)
+
+    else:
+        view.print(Text(message))
+
+# --------------------------------------------------------------------------------------------------
+#
+# handlers
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Class to format a record as one JSON line
+    """
+
+    def format(self, record):
+        return json.dumps(fields(record), ensure_ascii=False, default=str)
+
+
+class ConsoleView(logging.Handler):
+    """
+    Class to print the records on the Rich console
+    """
+
+    def emit(self, record):
+        try:
+            render(console, fields(record))
+        except Exception:
+            self.handleError(record)
+
+
+class SpoolHandler(logging.FileHandler):
+    """
+    Class to write the records of the current report segment, the spool is moved to the segment when it ends
+    The records captured by a thread (see capture) are written to their own spool
+    """
+
+    def __init__(self, path):
+        super().__init__(path, mode="w", encoding="utf-8", delay=True)
+        self._captures = {}
+
+    def _path(self, key=None):
+        spool = Path(self.baseFilename)
+        return spool if key is None else spool.with_suffix(f".{key}.jsonl")
+
+    def emit(self, record):
+        key = getattr(record, 'segment', None)
+        if key is None:
+            super().emit(record)
+            return
+
+        try:
+            if key not in self._captures:
+                self._captures[key] = open(self._path(key), "w", encoding="utf-8")
+            self._captures[key].write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def _close(self, key=None):
+        if key is None:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+        elif key in self._captures:
+            self._captures.pop(key).close()
+
+    def move(self, output, key=None):
+        """
+        Function to end the segment: the spool becomes the output file and a new spool is started
+        """
+
+        self.acquire()
+        try:
+            self._close(key)
+
+            spool = self._path(key)
+            if not spool.exists():
+                spool.touch()
+            os.replace(spool, output)
+        finally:
+            self.release()
+
+    def merge(self, key):
+        """
+        Function to end a capture: the records left in its spool are added to the spool of the current segment
+        """
+
+        self.acquire()
+        try:
+            self._close(key)
+
+            spool = self._path(key)
+            if spool.exists():
+                if self.stream is None:
+                    self.stream = self._open()
+                with open(spool, encoding="utf-8") as file:
+                    self.stream.write(file.read())
+                self.stream.flush()
+                spool.unlink()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            for key in list(self._captures):
+                self._close(key)
+        finally:
+            self.release()
+        super().close()
+
+
+class _SegmentFilter(logging.Filter):
+    """
+    Class to tag the records with the capture of the thread logging them
+    """
+
+    def filter(self, record):
+        record.segment = getattr(_local, 'segment', None)
+        return True
+
+
+class _FlushHandler(logging.Handler):
+    """
+    Class to tell that the records logged before a flush record are written
+    """
+
+    def emit(self, record):
+        event = getattr(record, 'flush', None)
+        if event is not None:
+            event.set()
+
+# --------------------------------------------------------------------------------------------------
+#
+# start, stop, flush, segment and capture
+#
+# --------------------------------------------------------------------------------------------------
+
+
+_state = {'listener': None, 'spool': None}
+
+_local = threading.local()
+
+
+def _direct_view():
+    # without background thread, the records are printed at once
+    logger.handlers = [ConsoleView()]
+
+
+_direct_view()
+
+
+def start(folder, level=logging.INFO, view=True, max_bytes=10 * 1024 * 1024, backups=5):
+    """
+    Function to write the records by a background thread: rotating log file, spool of the segment and console view
+    """
+
+    stop()
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    formatter = JsonFormatter()
+
+    logfile = logging.handlers.RotatingFileHandler(folder / "log.jsonl", maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    logfile.setFormatter(formatter)
+
+    spool = SpoolHandler(folder / "spool.jsonl")
+    spool.setFormatter(formatter)
+
+    handlers = [logfile, spool] + ([ConsoleView()] if view else [])
+    for handler in handlers:
+        handler.addFilter(lambda record: getattr(record, 'kind', None) != 'flush')
+
+    handlers += [_FlushHandler()]
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers)
+
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(_SegmentFilter())
+
+    logger.handlers = [handler]
+    logger.setLevel(level)
+
+    _state['listener'] = listener
+    _state['spool'] = spool
+
+    listener.start()
+
+
+def stop():
+    """
+    Function to write the records left and print the next ones at once
+    """
+
+    listener = _state['listener']
+    if listener is None:
+        return
+
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+    _state['listener'] = None
+    _state['spool'] = None
+
+    _direct_view()
+
+
+def flush(timeout=60):
+    """
+    Function to wait until the records logged before are written
+    """
+
+    if _state['listener'] is None:
+        return
+
+    event = threading.Event()
+    logger.log(logging.CRITICAL + 1, "", extra={'kind': 'flush', 'flush': event})
+    event.wait(timeout)
+
+
+def segment(output):
+    """
+    Function to end the current report segment (of the capture of the thread if any): its records are moved to output (.jsonl), None without spool
+    """
+
+    spool = _state['spool']
+    if spool is None:
+        return None
+
+    flush()
+
+    output_file = Path(output).resolve().with_suffix(".jsonl")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    spool.move(output_file, getattr(_local, 'segment', None))
+
+    return output_file
+
+
+@contextmanager
+def capture(key):
+    """
+    Function to write the records logged by the current thread to their own report segment (key is unique among the threads)
+    The records left when the capture ends are added to the current segment
+    """
+
+    _local.segment = key
+    try:
+        yield
+    finally:
+        _local.segment = None
+
+        spool = _state['spool']
+        if spool is not None:
+            flush()
+            spool.merge(key)
+
+
+def read(path):
+    """
+    Function to stream the records of a JSON Lines file
+    """
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,263 @@
+# names
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the normalized and phonetic keys of french names
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import functools
+import re
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import fold
+
+# -------------------------------------------------------------------------
+# soundex
+# -------------------------------------------------------------------------
+
+_soundex = {
+    **dict.fromkeys('bp', '1'),
+    **dict.fromkeys('ckq', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+    **dict.fromkeys('gj', '7'),
+    **dict.fromkeys('sxz', '8'),
+    **dict.fromkeys('fv', '9'),
+}
+
+
+def soundex(name, length=4):
+    """
+    Function to get the french Soundex of a name: first letter and the codes of the next consonants
+    """
+
+    letters = ''.join(c for c in normalize(name) if c.isalpha())
+    if len(letters) == 0:
+        return ''
+
+    code = letters[0].upper()
+    last = _soundex.get(letters[0])
+    for c in letters[1:]:
+        digit = _soundex.get(c)
+        if digit is not None and digit != last:
+            code += digit
+        # vowels separate the same codes but h, w and y do not
+        if c not in 'hwy':
+            last = digit
+
+    return (code + '0' * length)[:length]
+
+# -------------------------------------------------------------------------
+# particles
+# -------------------------------------------------------------------------
+
+# prepositions dropped before a name (the articles la, le, les and l' are part of the name)
+_particles = ('de', 'du', 'des', 'd')
+
+
+def normalize(name):
+    """
+    Function to get the accent-folded name without spaces nor punctuation ("L'Homme" and "Lhomme" give "lhomme")
+    """
+    return fold(name).replace(' ', '')
+
+
+def core(name):
+    """
+    Function to get the accent-folded name without its leading prepositions, de, du, des and d' ("d'Orléans" gives "orleans")
+    The articles are joined to the name ("de la Fontaine", "La Fontaine" and "Lafontaine" give "lafontaine", "L'Homme" gives "lhomme")
+    """
+
+    words = fold(name).split()
+    while len(words) > 1 and words[0] in _particles:
+        words.pop(0)
+
+    return ''.join(words)
+
+# -------------------------------------------------------------------------
+# phonex
+# -------------------------------------------------------------------------
+
+_vowel = r'[aeiou1234]'
+
+_phonex = [
+    (r'y', 'i'),
+    (r'(?<![csp])h', ''),
+    (r'ph', 'f'),
+    (r'g(ai?[mn])', r'k\1'),
+    (r'[ae]i[nm](?=[aeiou])', 'yn'),
+    (r'eau', 'o'),
+    (r'oua', '2'),
+    (r'[ae]i[nm]', '4'),
+    (r'[ae]i', 'y'),
+    (r'e(?=r|ss|t)', 'y'),
+    (r'[ae][nm](?![aeiou1234])', '1'),
+    (r'in(?![aeiou1234])', '4'),
+    (rf'(?<={_vowel})s(?={_vowel})', 'z'),
+    (r'oe|eu', 'e'),
+    (r'au', 'o'),
+    (r'oi|oy', '3'),
+    (r'ou', '2'),
+    (r'sch|ch|sh', '5'),
+    (r'ss|sc', 's'),
+    (r'c(?=[ei])', 's'),
+    (r'qu|gu|c|q', 'k'),
+    (r'g(?=[aou])', 'k'),
+    (r'a', 'o'),
+    (r'[dp]', 't'),
+    (r'j', 'g'),
+    (r'[bv]', 'f'),
+    (r'm', 'n'),
+    (r'(.)\1+', r'\1'),
+    (r'(?<=.)[tx]$', ''),
+]
+
+_phonex = [(re.compile(pattern), replace) for pattern, replace in _phonex]
+
+
+@functools.lru_cache(maxsize=65536)
+def phonex(name):
+    """
+    Function to get the french phonetic key of a name (Phonex rules, kept as a string)
+    """
+
+    key = normalize(name)
+    for pattern, replace in _phonex:
+        key = pattern.sub(replace, key)
+
+    return key
+
+# --------------------------------------------------------------------------------------------------
+#
+# NameIndex class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class NameIndex:
+    """
+    Class to find individuals by name: normalized name, name without particles or phonetic key
+    """
+
+    _kinds = ('name', 'core', 'phonex')
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self):
+
+        # kind -> key -> references
+        self._keys = {kind: {} for kind in self._kinds}
+
+        # reference -> (firstname key, lastname keys)
+        self._refs = {}
+
+    # -------------------------------------------------------------------------
+    # keys
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def keys(lastname):
+        """
+        Function to get the keys of a last name in the order of the kinds (the same names come back often, the keys are kept)
+        The keys are a tuple as the same value is returned to every caller
+        """
+        return normalize(lastname), core(lastname), phonex(core(lastname))
+
+    # -------------------------------------------------------------------------
+    # add
+    # -------------------------------------------------------------------------
+
+    def add(self, ref, firstname, lastname):
+        """
+        Function to add (or update) an individual
+        """
+
+        self.remove(ref)
+
+        keys = self.keys(lastname or '')
+        for kind, key in zip(self._kinds, keys):
+            if key:
+                self._keys[kind].setdefault(key, set()).add(ref)
+
+        self._refs[ref] = (phonex(firstname or ''), keys)
+
+    # -------------------------------------------------------------------------
+    # remove
+    # -------------------------------------------------------------------------
+
+    def remove(self, ref):
+        """
+        Function to remove an individual
+        """
+
+        if ref not in self._refs:
+            return
+
+        _, keys = self._refs.pop(ref)
+        for kind, key in zip(self._kinds, keys):
+            refs = self._keys[kind].get(key)
+            if refs is not None:
+                refs.discard(ref)
+                if len(refs) == 0:
+                    del self._keys[kind][key]
+
+    # -------------------------------------------------------------------------
+    # find
+    # -------------------------------------------------------------------------
+
+    def find(self, lastname, firstname=None, kind='phonex'):
+        """
+        Function to get the references of the individuals with a last name (and a first name sounding the same)
+        """
+
+        refs = self._keys[kind].get(self.keys(lastname)[self._kinds.index(kind)], set())
+
+        if firstname:
+            first = phonex(firstname)
+            refs = {ref for ref in refs if self._refs[ref][0] == first}
+
+        return refs
+
+    # -------------------------------------------------------------------------
+    # variants
+    # -------------------------------------------------------------------------
+
+    def variants(self, kind='phonex'):
+        """
+        Function to get the groups of individuals whose spellings differ but share a key
+        """
+        return {key: refs for key, refs in self._keys[kind].items() if len(set(self._refs[ref][1][0] for ref in refs)) > 1}
+
+    def __contains__(self, ref):
+        return ref in self._refs
+
+    def __len__(self):
+        return len(self._refs)
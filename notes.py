@@ -0,0 +1,111 @@
+# notes
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the shared table of notes and sources
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import hashlib
+import zlib
+
+# --------------------------------------------------------------------------------------------------
+#
+# NoteTable class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class NoteTable:
+    """
+    Class to store each note once, by hash of its content
+    Notes longer than the threshold are compressed with zlib (no compression if threshold is None)
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, threshold=1024):
+
+        self._threshold = threshold
+        self._notes = {}
+
+    # -------------------------------------------------------------------------
+    # add
+    # -------------------------------------------------------------------------
+
+    def add(self, text):
+        """
+        Function to add a note and return its key
+        """
+
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=10).hexdigest()
+
+        if key not in self._notes:
+            if self._threshold is not None and len(text) > self._threshold:
+                self._notes[key] = zlib.compress(text.encode('utf-8'))
+            else:
+                self._notes[key] = text
+
+        return key
+
+    # -------------------------------------------------------------------------
+    # update
+    # -------------------------------------------------------------------------
+
+    def update(self, other):
+        """
+        Function to add the notes of another table (e.g. restored from a checkpoint)
+        """
+
+        for key, note in other._notes.items():
+            self._notes.setdefault(key, note)
+
+    # -------------------------------------------------------------------------
+    # mapping
+    # -------------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        note = self._notes[key]
+        return zlib.decompress(note).decode('utf-8') if isinstance(note, bytes) else note
+
+    def __contains__(self, key):
+        return key in self._notes
+
+    def __len__(self):
+        return len(self._notes)
+
+    def keys(self):
+        return self._notes.keys()
+
+    # -------------------------------------------------------------------------
+    # size
+    # -------------------------------------------------------------------------
+
+    @property
+    def size(self):
+        """
+        Property to get the stored size of the notes
+        """
+        return sum(len(note) for note in self._notes.values())
+
+
+note_table = NoteTable()
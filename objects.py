@@ -19,6 +19,8 @@ Package with genealogy objects
 
 # pylint: disable=C0112,C0116
 
+from collections.abc import MutableMapping
+
 import requests
 
 # https://pypi.org/project/babel/
@@ -26,11 +28,10 @@ import requests
 import babel
 import babel.dates
 
-# https://pypi.org/project/pycountry/
-# pip3 install pycountry
-import pycountry
-
 from common import display
+from countries import countries
+from placetree import place_tree
+from gazetteer import gazetteer
 
 # --------------------------------------------------------------------------------------------------
 #
@@ -147,24 +148,112 @@ class Date(str):
 # --------------------------------------------------------------------------------------------------
 
 
-class _object(dict):
+class _object(MutableMapping):
+    """
+    Record with slotted attributes (unset slots read as None) and a dict compatible view of the slots set
+    Keys which are not slots are kept aside in _extra (and reported)
+    Unlike the former dicts, keys(), items() and dict(record) skip the unset slots (a None value is no key):
+    the callers read them by attribute, by get() or test them with in, which are all None safe
+    """
+
+    __slots__ = ('_extra',)
+
+    _fields = ()
+    _keys = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._keys = frozenset(cls._fields)
 
     def __init__(self, defaults, *args, **kwargs):
-        super().__init__(defaults, *args, **kwargs)
+        object.__setattr__(self, '_extra', None)
+
+        if args or kwargs:
+            defaults = dict(defaults, *args, **kwargs)
+
+        for key, value in defaults.items():
+            if key not in self._keys:
+                self._set_extra(key, value)
+            elif value is not None:
+                object.__setattr__(self, key, value)
+
+    def _set_extra(self, key, value):
+        if self._extra is None:
+            object.__setattr__(self, '_extra', {})
+        self._extra[key] = value
 
     def __setitem__(self, key, value):
-        if key not in self.keys():
-            display(f"Object new key [{key}] with value [{value}]", error=True)
-        super().__setitem__(key, value)
+        if key in self._keys:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None or key not in self._extra:
+                display(f"Object new key [{key}] with value [{value}]", error=True)
+            self._set_extra(key, value)
 
     def __setattr__(self, key, value):
-        self[key] = value
+        if key in self._keys or key.startswith('_'):
+            object.__setattr__(self, key, value)
+        else:
+            self[key] = value
 
     def __getattr__(self, key):
-        return self.get(key, None)
+        # only called for unset slots and extra keys
+        if key.startswith('_'):
+            raise AttributeError(key)
+        return self._extra.get(key, None) if self._extra else None
+
+    def __getitem__(self, key):
+        if key in self._keys:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __delitem__(self, key):
+        if key in self._keys:
+            if self._isset(key):
+                object.__delattr__(self, key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def _isset(self, key):
+        # an unset slot raises AttributeError (hasattr would go through __getattr__)
+        try:
+            object.__getattribute__(self, key)
+        except AttributeError:
+            return False
+        return True
+
+    def _set_fields(self):
+        return [key for key in self._fields if self._isset(key)]
+
+    def __iter__(self):
+        yield from self._set_fields()
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self._set_fields()) + (len(self._extra) if self._extra else 0)
 
     def __contains__(self, item):
-        return hasattr(self, item) and not getattr(self, item, None) is None
+        return getattr(self, item, None) is not None
+
+    def copy(self):
+        """
+        Function to get a shallow copy of the same class (as dict.copy)
+        """
+
+        other = object.__new__(type(self))
+        object.__setattr__(other, '_extra', dict(self._extra) if self._extra else None)
+        for key in self._set_fields():
+            object.__setattr__(other, key, object.__getattribute__(self, key))
+
+        return other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
 
 # --------------------------------------------------------------------------------------------------
 #
@@ -178,84 +267,122 @@ class Place(_object):
     Place
     """
 
-    def __init__(self, where, *args, **kwargs):
+    __slots__ = _fields = ('name', 'search', 'fullname', 'node', 'country', 'query', 'nb', 'latitude', 'longitude', 'addresstype')
+
+    def __init__(self, where, *args, result=None, **kwargs):
         defaults = {
             'name': where,
             'search': None,
             'fullname': where,
+            'node': None,
         }
 
         try:
-            # GeoNames
-            # https://www.geonames.org
-            geonames_url = "http://api.geonames.org/searchJSON"
+            # a result already known (read from a GEDCOM) is not searched again
 
-            defaults_search = {
-                'username': 'lburais',  
-                # 'username': 'genealogy_scrapper',
-                'maxRows': 10, 
-                'style': 'full',
-                'lang': 'fr'        ,
-                'featureClass': 'P',   
-                'isNameRequired': True,
+            geonames = [result] if result else self._geonames(defaults)
 
-            }
+            if len(geonames) > 0:
+                # shared hierarchy of places
 
-            # try first structured query
+                defaults['node'] = place_tree.node(geonames[0])
 
-            # if last element is a country (ISO code exist)
-            names = defaults['name'].split(',')
+                defaults['fullname'] = defaults['node'].fullname
 
-            country = names[-1].strip()
+                defaults['latitude'] = defaults['node'].latitude
+                defaults['longitude'] = defaults['node'].longitude
 
-            code = pycountry.countries.get(name=country)
-            if code:
-                defaults_search['country'] = code.alpha_2
-                defaults['country'] = defaults_search['country']
+                defaults['addresstype'] = defaults['node'].addresstype
 
-                # first one is the city (if not a country)
-                if len(names) > 1:
-                    defaults_search['q'] = names[0].strip()
-            else:
-                defaults_search['q'] = defaults['name']
+                if not result:
+                    display(f"--> {defaults['fullname']}")
 
-            defaults['search'] = defaults_search
+        except Exception as e:
+            display(f"GeoNames get place - {defaults['name']}: {type(e).__name__}", error=True)
 
-            defaults['query'] = defaults_search['q']
+        if defaults['node'] is None:
+            defaults['node'] = place_tree.node(where=where)
 
-            response = requests.get(geonames_url, params=defaults_search, timeout=10)
+        super().__init__(defaults, *args, **kwargs)
 
-            if response.status_code == 200:
-                defaults['nb'] = len(response.json())
-                if len(response.json()) > 0 and len(response.json()['geonames']) > 0:
-                    for loc in response.json()['geonames']:
-                        display(f"[{response.json()['geonames'].index(loc):2d}] {loc['fclName']}: {loc['toponymName']}: {loc['score']:.2f}")
+    # -------------------------------------------------------------------------
+    # _geonames
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _geonames(defaults):
+        """
+        Function to search the GeoNames results of a place name (local gazetteer first, then the web service)
+        """
 
-                    result = response.json()['geonames'][0]
-                    for key in ['alternateNames', 'bbox']:
-                        del result[key]
+        # GeoNames
+        # https://www.geonames.org
+        geonames_url = "http://api.geonames.org/searchJSON"
 
-                    names = ['toponymName', 'adminName2', 'adminName1', 'countryName']
-                    #names = ['toponymName', 'adminCode5' if 'adminCode5' in result else 'adminCode4', 'adminName2', 'adminName1', 'countryName']
-                    defaults['fullname'] = ", ".join([result[part] for part in names if part in result])
+        defaults_search = {
+            'username': 'lburais',  
+            # 'username': 'genealogy_scrapper',
+            'maxRows': 10, 
+            'style': 'full',
+            'lang': 'fr'        ,
+            'featureClass': 'P',   
+            'isNameRequired': True,
 
-                    defaults['latitude'] = result['lat'] if 'lat' in result else None
-                    defaults['longitude'] = result['lng'] if 'lng' in result else None
+        }
 
-                    defaults['addresstype'] = result['fclName'] if 'fclName' in result else None
-                    defaults['address'] = result
+        # try first structured query
 
-                    names = sorted(set([key for key, value in result.items() if isinstance(value, str) and (key.find('Name') > 0 or key.find('Code') > 0)]))
-                    defaults['details'] = {part: result[part] for part in names}
+        # if last element is a country (ISO code exist)
+        names = defaults['name'].split(',')
 
-                    display(f"--> {defaults['fullname']}")
+        country = names[-1].strip()
+
+        code = countries.get(country)
+        if code:
+            defaults_search['country'] = code
+            defaults['country'] = defaults_search['country']
+
+            # first one is the city (if not a country)
+            if len(names) > 1:
+                defaults_search['q'] = names[0].strip()
+        else:
+            defaults_search['q'] = defaults['name']
+
+        defaults['search'] = defaults_search
+
+        defaults['query'] = defaults_search['q']
+
+        # try first the local gazetteer, then the GeoNames web service
+
+        geonames = gazetteer.search(defaults_search['q'], defaults_search.get('country'), defaults_search['featureClass'], defaults_search['maxRows'])
+
+        if len(geonames) > 0:
+            defaults['nb'] = len(geonames)
+        else:
+            response = requests.get(geonames_url, params=defaults_search, timeout=10)
+
+            if response.status_code == 200:
+                defaults['nb'] = len(response.json())
+                if len(response.json()) > 0:
+                    geonames = response.json().get('geonames', [])
             else:
                 display(f'!! GeoNames cannot fetch data for ({defaults['name']}) [{response.status_code}]: {response.text}')
 
-        except Exception as e:
-            display(f"GeoNames get place - {defaults['name']}: {type(e).__name__}", error=True)
+        for loc in geonames:
+            display(f"[{geonames.index(loc):2d}] {loc['fclName']}: {loc['toponymName']}: {loc['score']:.2f}", verbose=True)
 
-        super().__init__(defaults, *args, **kwargs)
+        return geonames
+
+    # -------------------------------------------------------------------------
+    # details
+    # -------------------------------------------------------------------------
+
+    @property
+    def details(self):
+        """
+        Property to get the GeoNames names and codes of the place
+        """
+        return self.node.details if self.node else {}
 
 # --------------------------------------------------------------------------------------------------
 #
@@ -269,6 +396,8 @@ class Informations(_object):
     Informations
     """
 
+    __slots__ = _fields = ('url', 'author', 'nbindividuals', 'lastchange', 'source')
+
     def __init__(self, *args, **kwargs):
         defaults = {
             'url': None,
@@ -289,39 +418,47 @@ class Informations(_object):
 
 class Data(_object):
     """
-    Data
+    Data (of an individual or of a family)
     """
 
-    def __init__(self, family, *args, **kwargs):
-        if family:
-            defaults = {
-                'gedcomid': None,
-                'spousesid': [],
-                'childsid': []
-            }
-            events = ['marriage', 'divorce']
+    __slots__ = ()
 
-        else:
-            defaults = {
-                'gedcomid': None,
-                'url': None,
-                'firstname': None,
-                'lastname': None,
-                'sex': None,
-                'occupation': None,
-                'notes': [],
-                'familyid': None,
-                'parentsid': [],
-                'siblingsid': [],
-                'familiesid': []
-            }
-            events = ['birth', 'death', 'baptem', 'burial']
-
-        for event in events:
-            defaults[f"{event}"] = defaults[f"{event}date"] = defaults[f"{event}place"] = None
+    _lists = ()
+
+    def __init__(self, *args, **kwargs):
+        defaults = {key: [] for key in self._lists}
 
         super().__init__(defaults, *args, **kwargs)
 
+
+class _IndividualData(Data):
+
+    _events = ['birth', 'death', 'baptem', 'burial']
+
+    __slots__ = _fields = ('gedcomid', 'url', 'sources', 'firstname', 'lastname', 'sex', 'occupation', 'notes', 'notesid', 'familyid', 'parentsid', 'siblingsid',
+                           'familiesid') + \
+        tuple(f"{event}{suffix}" for event in _events for suffix in ['', 'date', 'place'])
+
+    _lists = ('sources', 'notes', 'notesid', 'parentsid', 'siblingsid', 'familiesid')
+
+
+class _FamilyData(Data):
+
+    _events = ['marriage', 'divorce']
+
+    __slots__ = _fields = ('gedcomid', 'spousesid', 'childsid') + \
+        tuple(f"{event}{suffix}" for event in _events for suffix in ['', 'date', 'place'])
+
+    _lists = ('spousesid', 'childsid')
+
+
+def new_data(*args, family=False, **kwargs):
+    """
+    Function to get the data of a family or of an individual
+    """
+
+    return (_FamilyData if family else _IndividualData)(*args, **kwargs)
+
 # --------------------------------------------------------------------------------------------------
 #
 # Individual class
@@ -334,10 +471,12 @@ class Individual(_object):
     Individual
     """
 
+    __slots__ = _fields = ('ref', 'data', 'parentsref', 'siblingsref', 'familiesref', 'families')
+
     def __init__(self, *args, **kwargs):
         defaults = {
             'ref': None,
-            'data': Data(family=False),
+            'data': new_data(family=False),
             'parentsref': [],
             'siblingsref': [],
             'familiesref': [],
@@ -358,10 +497,12 @@ class Family(_object):
     Family
     """
 
+    __slots__ = _fields = ('spousesref', 'data', 'childsref')
+
     def __init__(self, *args, **kwargs):
         defaults = {
             'spousesref': [],
-            'data': Data(family=True),
+            'data': new_data(family=True),
             'childsref': [],
         }
 
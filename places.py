@@ -0,0 +1,219 @@
+# places
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to cluster the variants of a place before geocoding
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import re
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display, fold
+from objects import Place
+
+# --------------------------------------------------------------------------------------------------
+#
+# PlaceIndex class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class PlaceIndex:
+    """
+    Class to normalize place names and group their variants into clusters
+    sharing one geocoded Place:
+        - accents, case, hyphens and apostrophes are folded
+        - arrondissements (15e, 1er arrondissement) and department codes (75, 2A) are removed
+        - names are blocked by locality and compared by token set similarity
+        - a name less specific than others (e.g. without department) is merged only if a single cluster is more specific,
+          a name more specific than a cluster is not merged with it
+    """
+
+    _arrondissement = re.compile(r"\b\d{1,2}\s*(?:e|er|eme|ieme)(?:\s+arrondissement)?\b|\barrondissement\b")
+    _department = re.compile(r"^(?:\d{2,3}|2a|2b)$")
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, threshold=0.8):
+
+        self._threshold = threshold
+
+        # raw name -> cluster, normalized key -> cluster, locality -> clusters
+        self._names = {}
+        self._keys = {}
+        self._blocks = {}
+
+        # cluster -> Place, raw variants and tokens of its first name (without the locality)
+        self._places = []
+        self._variants = []
+        self._tokens = []
+
+    # -------------------------------------------------------------------------
+    # normalize
+    # -------------------------------------------------------------------------
+
+    def normalize(self, where):
+        """
+        Function to get the normalized parts of a place name
+        """
+
+        parts = []
+        for part in where.split(','):
+            part = fold(part)
+            part = ' '.join(self._arrondissement.sub(' ', part).split())
+
+            if len(part) == 0 or self._department.match(part):
+                continue
+
+            if part not in parts:
+                parts += [part]
+
+        return tuple(parts)
+
+    # -------------------------------------------------------------------------
+    # _similar
+    # -------------------------------------------------------------------------
+
+    def _similar(self, tokens, cluster):
+        """
+        Function to compare the tokens (without the locality) of a name with the first name of a cluster
+        A name without tokens (the locality alone) is not similar to any other name
+        """
+
+        other = self._tokens[cluster]
+
+        if len(tokens) == 0 or len(other) == 0:
+            return 0.0
+
+        return len(tokens & other) / min(len(tokens), len(other))
+
+    # -------------------------------------------------------------------------
+    # cluster
+    # -------------------------------------------------------------------------
+
+    def cluster(self, where):
+        """
+        Function to get the cluster of a place name (creating it if needed)
+        """
+
+        if where in self._names:
+            return self._names[where]
+
+        key = self.normalize(where)
+
+        cluster = self._keys.get(key)
+
+        if cluster is None and len(key) > 0:
+            tokens = set(' '.join(key[1:]).split())
+
+            block = self._blocks.get(key[0], [])
+
+            # clusters more specific than the name: ambiguous if more than one (e.g. the same commune in two departments)
+            wider = [candidate for candidate in block if tokens < self._tokens[candidate]]
+
+            candidates = [(self._similar(tokens, candidate), candidate) for candidate in block
+                          if not tokens > self._tokens[candidate] and (len(wider) == 1 or candidate not in wider)]
+            candidates = [candidate for candidate in candidates if candidate[0] >= self._threshold]
+            if len(candidates) > 0:
+                cluster = max(candidates, key=lambda candidate: candidate[0])[1]
+                display(f"Place [{where}] merged with [{self._variants[cluster][0]}]")
+            else:
+                cluster = len(self._places)
+                self._places += [None]
+                self._variants += [[]]
+                self._tokens += [tokens]
+                self._blocks.setdefault(key[0], []).append(cluster)
+
+            self._keys[key] = cluster
+
+        if cluster is None:
+            cluster = len(self._places)
+            self._places += [None]
+            self._variants += [[]]
+            self._tokens += [set()]
+
+        self._names[where] = cluster
+        self._variants[cluster] += [where]
+
+        return cluster
+
+    # -------------------------------------------------------------------------
+    # get
+    # -------------------------------------------------------------------------
+
+    def get(self, where):
+        """
+        Function to get the Place of a place name (one geocoding per cluster)
+        """
+
+        cluster = self.cluster(where)
+
+        if self._places[cluster] is None:
+            self._places[cluster] = Place(where)
+
+        return self._places[cluster]
+
+    # -------------------------------------------------------------------------
+    # replace
+    # -------------------------------------------------------------------------
+
+    def replace(self, merged):
+        """
+        Function to replace the places of the clusters: place name -> place kept
+        """
+
+        for cluster, place in enumerate(self._places):
+            if place is not None and place.name in merged:
+                self._places[cluster] = merged[place.name]
+
+    # -------------------------------------------------------------------------
+    # variants
+    # -------------------------------------------------------------------------
+
+    def variants(self, where):
+        """
+        Function to get all the names merged with a place name
+        """
+
+        return list(self._variants[self._names[where]]) if where in self._names else []
+
+    # -------------------------------------------------------------------------
+    # mapping
+    # -------------------------------------------------------------------------
+
+    def __contains__(self, where):
+        return where in self._names
+
+    def __getitem__(self, where):
+        return self._places[self._names[where]]
+
+    def __len__(self):
+        return len([place for place in self._places if place is not None])
+
+    def values(self):
+        return [place for place in self._places if place is not None]
@@ -0,0 +1,192 @@
+# placetree
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with the shared hierarchy of places: country, region, department and locality
+"""
+
+# --------------------------------------------------------------------------------------------------
+#
+# PlaceNode class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class PlaceNode:
+    """
+    Class of one interned node of the place hierarchy with its GEDCOM PLAC and MAP rendered once
+    """
+
+    __slots__ = ('name', 'code', 'level', 'parent', 'latitude', 'longitude', 'addresstype', 'geonameid', 'key', 'fullname', 'gedcom')
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, name, code, level, parent, latitude=None, longitude=None, addresstype=None, geonameid=None, key=None):
+
+        self.name = name
+        self.code = code
+        self.level = level
+        self.parent = parent
+        self.latitude = float(latitude) if latitude else None
+        self.longitude = float(longitude) if longitude else None
+        self.addresstype = addresstype
+        self.geonameid = geonameid
+        self.key = key
+
+        self.fullname = ", ".join(node.name for node in self.path)
+
+        self.gedcom = f"2 PLAC {self.fullname}\n"
+        if self.latitude and self.longitude:
+            self.gedcom += "3 MAP\n"
+            self.gedcom += f"4 LATI {'N' if self.latitude > 0 else 'S'}{abs(self.latitude):.4f}\n"
+            self.gedcom += f"4 LONG {'E' if self.longitude > 0 else 'W'}{abs(self.longitude):.4f}\n"
+
+    # -------------------------------------------------------------------------
+    # path
+    # -------------------------------------------------------------------------
+
+    @property
+    def path(self):
+        """
+        Property to get the nodes from this one up to the country
+        """
+
+        node = self
+        while node is not None:
+            yield node
+            node = node.parent
+
+    # -------------------------------------------------------------------------
+    # details
+    # -------------------------------------------------------------------------
+
+    @property
+    def details(self):
+        """
+        Property to get the names and codes of the hierarchy with the GeoNames keys
+        """
+
+        keys = {
+            'country': ('countryName', 'countryCode'),
+            'region': ('adminName1', 'adminCode1'),
+            'department': ('adminName2', 'adminCode2'),
+            'locality': ('toponymName', None),
+        }
+
+        details = {}
+        for node in self.path:
+            name, code = keys[node.level]
+            details[name] = node.name
+            if code and node.code:
+                details[code] = node.code
+
+        return details
+
+    def __repr__(self):
+        return f"{self.level}: {self.fullname}"
+
+    def __reduce__(self):
+        # unpickled nodes are interned again in the shared tree
+        return (_intern, (self.name, self.code, self.level, self.parent, self.latitude, self.longitude, self.addresstype, self.geonameid))
+
+# --------------------------------------------------------------------------------------------------
+#
+# PlaceTree class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class PlaceTree:
+    """
+    Class to intern the nodes of the place hierarchy
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self):
+
+        self._nodes = {}
+
+    # -------------------------------------------------------------------------
+    # _key
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(parent, level, name, latitude=None, longitude=None, geonameid=None):
+        """
+        Function to get the key of a node: key of its parent, level, name and, for a locality,
+        its coordinates (as rendered in MAP) or its GeoNames id: two localities of the same name are different nodes
+        """
+
+        if latitude and longitude:
+            identity = (round(float(latitude), 4), round(float(longitude), 4))
+        elif geonameid:
+            identity = ('geonameid', str(geonameid))
+        else:
+            identity = None
+
+        return (parent.key if parent is not None else None, level, name, identity)
+
+    # -------------------------------------------------------------------------
+    # _intern
+    # -------------------------------------------------------------------------
+
+    def _intern(self, name, code, level, parent, latitude=None, longitude=None, addresstype=None, geonameid=None):
+        """
+        Function to get the unique node of a name below a parent
+        """
+
+        key = self._key(parent, level, name, latitude, longitude, geonameid)
+
+        node = self._nodes.get(key)
+        if node is None:
+            node = PlaceNode(name, code, level, parent, latitude, longitude, addresstype, geonameid, key)
+            self._nodes[key] = node
+
+        return node
+
+    # -------------------------------------------------------------------------
+    # node
+    # -------------------------------------------------------------------------
+
+    def node(self, result=None, where=None):
+        """
+        Function to get the locality node of a GeoNames result (or of a place name without result)
+        """
+
+        if not result:
+            return self._intern(where, None, 'locality', None)
+
+        node = None
+        for level, name, code in [('country', 'countryName', 'countryCode'), ('region', 'adminName1', 'adminCode1'), ('department', 'adminName2', 'adminCode2')]:
+            if result.get(name):
+                node = self._intern(result[name], result.get(code), level, node)
+
+        return self._intern(result.get('toponymName', where), None, 'locality', node,
+                            result.get('lat'), result.get('lng'), result.get('fclName'), result.get('geonameId'))
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+place_tree = PlaceTree()
+
+
+def _intern(*args):
+    return place_tree._intern(*args)
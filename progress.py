@@ -0,0 +1,167 @@
+# progress
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to write the results of a crawl while it is running
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from export import individual_row, event_rows
+
+# --------------------------------------------------------------------------------------------------
+#
+# Progress class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Progress:
+    """
+    Class of the progressive output of a crawl:
+        - the individuals are appended to a JSON Lines file as soon as they are scraped
+          (a resumed crawl goes on with the same file, the individuals already in it are not appended again)
+        - a provisional GEDCOM of an isolated snapshot is written again every interval seconds by a background thread
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, folder, name, interval=600, resume=False):
+
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        path = folder / f"{name}.progress.jsonl"
+
+        # references of the individuals written before the crawl was resumed
+        self._written = set()
+        line = "\n"
+        if resume and path.exists():
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        self._written.add(json.loads(line)['ref'])
+                    except (ValueError, KeyError):
+                        # last line cut by a crash
+                        pass
+
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if not line.endswith("\n"):
+            self._file.write("\n")
+        self._gedcom = folder / f"{name}.provisional.ged"
+
+        self._interval = interval
+        self._last = time.monotonic()
+        self._thread = None
+
+        self.count = 0
+
+    # -------------------------------------------------------------------------
+    # individual
+    # -------------------------------------------------------------------------
+
+    def individual(self, ref, individual, level=None):
+        """
+        Function to append an individual just scraped (flushed at once so that the file can be read during the crawl)
+        """
+
+        if ref in self._written:
+            return
+
+        row = individual_row(ref, individual, level)
+        row['spouses'] = [spouse for spouse in individual.spousesref if spouse and spouse != ref]
+        row['childs'] = list(individual.childsref)
+        row['events'] = list(event_rows(ref, 'individual', individual.portrait))
+
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+        self.count += 1
+
+    # -------------------------------------------------------------------------
+    # due
+    # -------------------------------------------------------------------------
+
+    def due(self):
+        """
+        Function to check if a provisional GEDCOM is due (and the previous one is written)
+        """
+
+        if self._interval is None or self._thread is not None and self._thread.is_alive():
+            return False
+
+        return time.monotonic() - self._last >= self._interval
+
+    # -------------------------------------------------------------------------
+    # snapshot
+    # -------------------------------------------------------------------------
+
+    def snapshot(self, genealogy):
+        """
+        Function to write in the background the GEDCOM of a snapshot of the genealogy (see Genealogy.snapshot)
+        """
+
+        self._last = time.monotonic()
+
+        self._thread = threading.Thread(target=self._write, args=(genealogy,), name="provisional-gedcom", daemon=True)
+        self._thread.start()
+
+    def _write(self, genealogy):
+
+        temporary = self._gedcom.with_suffix(".tmp")
+
+        try:
+            start = time.monotonic()
+            genealogy.write(temporary)
+            os.replace(temporary, self._gedcom)
+            display(f"Provisional GEDCOM: {len(genealogy.individuals):,} individuals in {time.monotonic() - start:.1f}s")
+        except Exception as e:
+            display(f"Provisional GEDCOM: {type(e).__name__}", error=True)
+        finally:
+            genealogy.release()
+
+    # -------------------------------------------------------------------------
+    # close
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        """
+        Function to wait for the provisional GEDCOM being written and close the JSON Lines file
+        """
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._file.close()
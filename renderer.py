@@ -0,0 +1,248 @@
+# renderer
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to render the records of a report segment (JSON Lines) into a PDF file in a worker process
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import multiprocessing
+import os
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# https://pypi.org/project/reportlab/
+# pip3 install reportlab
+
+from reportlab.lib.colors import black, red, darkcyan, darkgreen
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
+
+# https://rich.readthedocs.io/en/stable/
+# https://pypi.org/project/rich/
+# pip3 install rich
+
+from rich.pretty import pretty_repr
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from logs import read
+
+# -------------------------------------------------------------------------
+# page layout
+# -------------------------------------------------------------------------
+
+_font = "Courier"
+_bold = "Courier-Bold"
+_size = 7
+_leading = 8.5
+_margin = 30
+
+_styles = {
+    'heading': (_bold, black),
+    'title': (_bold, darkcyan),
+    'data': (_bold, darkgreen),
+    'error': (_bold, red),
+    'text': (_font, black),
+}
+
+# -------------------------------------------------------------------------
+# _lines
+# -------------------------------------------------------------------------
+
+
+def _lines(record, width):
+    """
+    Function to get the lines of a record with their style
+    """
+
+    kind = record.get('kind')
+    title = record.get('title')
+    message = record.get('message') or ''
+
+    def wrap(text, style):
+        for line in str(text).splitlines() or ['']:
+            for part in textwrap.wrap(line, width, replace_whitespace=False, drop_whitespace=False) or ['']:
+                yield part, style
+
+    if kind == 'data':
+        if title:
+            yield '', 'text'
+            yield from wrap(title, 'data')
+        yield from wrap(pretty_repr(record.get('data'), max_width=width), 'text')
+
+    elif kind == 'exception':
+        yield from wrap(message, 'error')
+        yield from wrap(record.get('trace') or '', 'text')
+
+    elif kind == 'error':
+        yield from wrap(f"[ERROR] {message}", 'error')
+
+    elif kind == 'heading':
+        yield from wrap(message.upper(), 'heading')
+
+    elif kind == 'section':
+        yield '', 'text'
+        yield from wrap(message, 'title')
+        yield '', 'text'
+
+    elif kind == 'table':
+        data = record.get('data') or {}
+        rows = [data.get('columns', [])] + data.get('rows', [])
+        sizes = [max(len(str(row[column])) for row in rows) for column in range(len(rows[0]))]
+        yield '', 'text'
+        if title:
+            yield from wrap(title, 'title')
+        for index, row in enumerate(rows):
+            yield from wrap('  '.join(str(cell).ljust(size) for cell, size in zip(row, sizes)).rstrip(), 'data' if index == 0 else 'text')
+
+    elif kind == 'titled':
+        yield '', 'text'
+        yield from wrap(title, 'title')
+        yield from wrap(message, 'text')
+
+    else:
+        yield from wrap(message, 'text')
+
+# -------------------------------------------------------------------------
+# render_pdf
+# -------------------------------------------------------------------------
+
+
+def render_pdf(spool, output):
+    """
+    Function to write the records of a spool into a PDF file page by page (run in a worker process)
+    Returns the output file, the number of pages and the duration
+    """
+
+    start = time.monotonic()
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temporary = output.with_suffix(".tmp")
+
+    pagesize = landscape(A4)
+    width = int((pagesize[0] - 2 * _margin) / (0.6 * _size))
+    rows = int((pagesize[1] - 2 * _margin) / _leading)
+
+    pdf = canvas.Canvas(str(temporary), pagesize=pagesize)
+    pdf.setTitle(output.stem)
+
+    pages = 0
+    text = None
+    row = rows
+
+    def footer():
+        pdf.setFont(_font, _size)
+        pdf.setFillColor(black)
+        pdf.drawRightString(pagesize[0] - _margin, _margin / 2, f"{output.stem} - {pages}")
+
+    for record in read(spool):
+        for line, style in _lines(record, width):
+            if row >= rows:
+                if text is not None:
+                    pdf.drawText(text)
+                    footer()
+                    pdf.showPage()
+                pages += 1
+                text = pdf.beginText(_margin, pagesize[1] - _margin)
+                row = 0
+
+            font, color = _styles[style]
+            text.setFont(font, _size, _leading)
+            text.setFillColor(color)
+            text.textLine(line)
+            row += 1
+
+    if text is not None:
+        pdf.drawText(text)
+        footer()
+    pdf.save()
+
+    os.replace(temporary, output)
+
+    return output, pages, time.monotonic() - start
+
+# --------------------------------------------------------------------------------------------------
+#
+# ReportRenderer class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class ReportRenderer:
+    """
+    Class to render the reports in a worker process while the main process goes on
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, workers=1):
+
+        self._workers = workers
+        self._executor = None
+        self._futures = []
+
+    # -------------------------------------------------------------------------
+    # submit
+    # -------------------------------------------------------------------------
+
+    def submit(self, spool, output, done=None):
+        """
+        Function to render a spool into a PDF file, done is called with the future when rendered
+        """
+
+        if self._executor is None:
+            # spawned, the worker does not inherit the threads of the main process (logs, progress)
+            self._executor = ProcessPoolExecutor(max_workers=self._workers, mp_context=multiprocessing.get_context("spawn"))
+
+        future = self._executor.submit(render_pdf, str(spool), str(Path(output).resolve().with_suffix(".pdf")))
+        if done is not None:
+            future.add_done_callback(done)
+
+        self._futures = [f for f in self._futures if not f.done()] + [future]
+
+        return future
+
+    # -------------------------------------------------------------------------
+    # close
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        """
+        Function to wait for the reports being rendered
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        self._futures = []
+
+
+renderer = ReportRenderer()
@@ -0,0 +1,253 @@
+# report
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to report a genealogy by aggregates (counts, coverage of dates and places, generations and errors)
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import itertools
+from collections import Counter
+
+# https://rich.readthedocs.io/en/stable/
+# https://pypi.org/project/rich/
+# pip3 install rich
+
+from rich.table import Table
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from export import event_rows
+
+# --------------------------------------------------------------------------------------------------
+#
+# Report class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class Report:
+    """
+    Class of the report of a genealogy: the aggregates are computed in one pass over the individuals and the families
+    The details of the individuals and families are printed by pages on request only
+    """
+
+    page_size = 100
+
+    _events = ['birth', 'baptem', 'death', 'burial', 'marriage', 'divorce']
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, genealogy):
+
+        self._genealogy = genealogy
+
+        self.counts = Counter()
+
+        # event -> recorded, dated, with year, placed, located
+        self.coverage = {event: Counter() for event in self._events}
+
+        # level -> individuals, sex, dated births, placed births, years
+        self.generations = {}
+
+        self.errors = Counter()
+
+        self._compute()
+
+    # -------------------------------------------------------------------------
+    # _cover
+    # -------------------------------------------------------------------------
+
+    def _cover(self, owner, kind, data):
+        """
+        Function to count the coverage of the events of an individual or a family
+        """
+
+        rows = {}
+        for row in event_rows(owner, kind, data):
+            rows[row['event']] = row
+
+            coverage = self.coverage[row['event']]
+            coverage['recorded'] += 1
+            if row['date']:
+                coverage['dated'] += 1
+                if row['year'] is not None:
+                    coverage['year'] += 1
+                else:
+                    self.errors['dates without year'] += 1
+            if row['place']:
+                coverage['placed'] += 1
+                if row['latitude'] is not None and row['longitude'] is not None:
+                    coverage['located'] += 1
+                else:
+                    self.errors['places without coordinates'] += 1
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    # _compute
+    # -------------------------------------------------------------------------
+
+    def _compute(self):
+        """
+        Function to compute the aggregates in one pass (individuals and families are read once, from the disk if stored)
+        """
+
+        levels = self._genealogy.levels
+
+        refs = set()
+        referred = Counter()
+
+        for ref, individual in self._genealogy.individuals.items():
+            refs.add(ref)
+            data = individual.portrait
+
+            self.counts['individuals'] += 1
+            self.counts[f"sex {data['sex'] or 'U'}"] += 1
+            if data['url']:
+                self.counts['with url'] += 1
+            if data['notes']:
+                self.counts['with notes'] += 1
+
+            if not data['firstname'] and not data['lastname']:
+                self.errors['individuals without name'] += 1
+            if data['sex'] not in ('M', 'F'):
+                self.errors['individuals without sex'] += 1
+
+            for parent in individual.parentsref:
+                referred[('parents', parent)] += 1
+
+            events = self._cover(ref, 'individual', data)
+
+            level = levels.get(ref)
+            generation = self.generations.setdefault(level, {'individuals': 0, 'M': 0, 'F': 0, 'dated': 0, 'placed': 0, 'years': []})
+            generation['individuals'] += 1
+            if data['sex'] in ('M', 'F'):
+                generation[data['sex']] += 1
+            if 'birth' in events:
+                if events['birth']['year'] is not None:
+                    generation['dated'] += 1
+                    generation['years'] += [events['birth']['year']]
+                if events['birth']['place']:
+                    generation['placed'] += 1
+
+        for family in self._genealogy.families.values():
+            self.counts['families'] += 1
+
+            spouses = [spouse for spouse in family.spousesref if spouse]
+            if len(spouses) == 0:
+                self.errors['families without spouse'] += 1
+            for spouse in spouses:
+                referred[('spouses', spouse)] += 1
+
+            self.counts['childs'] += len(family.childsref)
+            for child in family.childsref:
+                referred[('childs', child)] += 1
+
+            self._cover(family.spousesref, 'family', family.portrait)
+
+        for (relation, ref), count in referred.items():
+            if ref not in refs:
+                self.errors[f"{relation} not found"] += count
+
+    # -------------------------------------------------------------------------
+    # _percent
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _percent(count, total):
+        return f"{count:,} ({100 * count / total:.0f}%)" if total else f"{count:,}"
+
+    # -------------------------------------------------------------------------
+    # summary
+    # -------------------------------------------------------------------------
+
+    def summary(self):
+        """
+        Function to print the aggregates as tables
+        """
+
+        individuals = self.counts['individuals']
+
+        table = Table("Individuals", "Men", "Women", "Unknown", "With url", "With notes", "Families", "Childs")
+        table.add_row(f"{individuals:,}", self._percent(self.counts['sex M'], individuals), self._percent(self.counts['sex F'], individuals),
+                      self._percent(individuals - self.counts['sex M'] - self.counts['sex F'], individuals),
+                      self._percent(self.counts['with url'], individuals), self._percent(self.counts['with notes'], individuals),
+                      f"{self.counts['families']:,}", f"{self.counts['childs']:,}")
+        display(table, title="Counts")
+
+        table = Table("Event", "Recorded", "Dated", "With year", "Placed", "Located")
+        for event, coverage in self.coverage.items():
+            recorded = coverage['recorded']
+            table.add_row(event, f"{recorded:,}", *[self._percent(coverage[key], recorded) for key in ['dated', 'year', 'placed', 'located']])
+        display(table, title="Coverage of dates and places")
+
+        table = Table("Generation", "Individuals", "Men", "Women", "Dated births", "Placed births", "Born")
+        for level in sorted(self.generations, key=lambda level: (level is None, level)):
+            generation = self.generations[level]
+            years = generation['years']
+            table.add_row("-" if level is None else str(level), f"{generation['individuals']:,}",
+                          f"{generation['M']:,}", f"{generation['F']:,}",
+                          self._percent(generation['dated'], generation['individuals']),
+                          self._percent(generation['placed'], generation['individuals']),
+                          f"{min(years)}-{max(years)}" if years else "")
+        display(table, title="Generations")
+
+        if len(self.errors) > 0:
+            table = Table("Error", "Count")
+            for error, count in self.errors.most_common():
+                table.add_row(error, f"{count:,}")
+            display(table, title="Errors")
+
+    # -------------------------------------------------------------------------
+    # pages
+    # -------------------------------------------------------------------------
+
+    @property
+    def pages(self):
+        """
+        Property to get the number of pages of details (individuals then families)
+        """
+
+        return -(-(self.counts['individuals'] + self.counts['families']) // self.page_size)
+
+    # -------------------------------------------------------------------------
+    # details
+    # -------------------------------------------------------------------------
+
+    def details(self, page=1):
+        """
+        Function to print the details of the individuals then the families of one page (from 1)
+        """
+
+        records = itertools.chain(self._genealogy.individuals.values(), self._genealogy.families.values())
+        start = (page - 1) * self.page_size
+
+        display(f"Details: page {page} of {self.pages}", level=2)
+
+        for record in itertools.islice(records, start, start + self.page_size):
+            record.print(short=False)
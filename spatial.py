@@ -0,0 +1,281 @@
+# spatial
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with a spatial index over the geocoded places of a genealogy
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+from itertools import chain
+from pathlib import Path
+
+# https://pypi.org/project/numpy/
+# pip3 install numpy
+import numpy as np
+
+# https://pypi.org/project/pandas/
+# pip3 install pandas
+import pandas as pd
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+
+# --------------------------------------------------------------------------------------------------
+#
+# SpatialIndex class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class SpatialIndex:
+    """
+    Class to index places and events of a genealogy by coordinates (grid hash)
+    The index is built once per genealogy (see Genealogy.spatial) and kept up to date by merge
+    """
+
+    _radius = 6371.0088
+
+    _events = ['birth', 'death', 'baptem', 'burial', 'marriage', 'divorce']
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, genealogy, cell=0.5):
+
+        self._genealogy = genealogy
+        self._cell = cell
+
+        # places
+
+        self._set_places([place for place in genealogy.places.values() if place.latitude and place.longitude])
+
+        # events: owner, type and place
+
+        owners = []
+        types = []
+        where = []
+
+        self._owners = []
+        for ref, individual in chain(genealogy.individuals.items(), genealogy.families.items()):
+            data = individual.portrait
+            owner = len(self._owners)
+            self._owners += [ref]
+            for number, event in enumerate(self._events):
+                place = data[f"{event}place"] if f"{event}place" in data else None
+                if place is not None and place.name in self._index:
+                    owners += [owner]
+                    types += [number]
+                    where += [self._index[place.name]]
+
+        self._event_owner = np.array(owners, dtype=np.int64)
+        self._event_type = np.array(types, dtype=np.int64)
+        self._event_place = np.array(where, dtype=np.int64)
+
+        display(f"Spatial index: {len(self._names):,} places, {len(self._event_place):,} events, {len(self._grid):,} cells")
+
+    # -------------------------------------------------------------------------
+    # _set_places
+    # -------------------------------------------------------------------------
+
+    def _set_places(self, places):
+        """
+        Function to index the coordinates of the places (grid hash: cell -> place indices)
+        """
+
+        self._names = [place.name for place in places]
+        self._places = places
+        self._index = {name: idx for idx, name in enumerate(self._names)}
+
+        self._lat = np.array([float(place.latitude) for place in places], dtype=np.float64)
+        self._lon = np.array([float(place.longitude) for place in places], dtype=np.float64)
+
+        cell = self._cell
+        cells = np.stack([np.floor(self._lat / cell), np.floor(self._lon / cell)], axis=1).astype(np.int64) if len(places) > 0 else np.empty((0, 2), dtype=np.int64)
+        self._grid = {}
+        for idx, key in enumerate(map(tuple, cells)):
+            self._grid.setdefault(key, []).append(idx)
+
+    # -------------------------------------------------------------------------
+    # _distances
+    # -------------------------------------------------------------------------
+
+    def _distances(self, lat, lon, indices):
+        """
+        Function to get the great circle distances (km) from a point to some places
+        """
+
+        lat1, lon1 = np.radians(lat), np.radians(lon)
+        lat2, lon2 = np.radians(self._lat[indices]), np.radians(self._lon[indices])
+
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+
+        return 2 * self._radius * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    # -------------------------------------------------------------------------
+    # _coordinates
+    # -------------------------------------------------------------------------
+
+    def _coordinates(self, where):
+        """
+        Function to get the coordinates of a place name or a (latitude, longitude) tuple
+        """
+
+        if isinstance(where, str):
+            idx = self._index[where]
+            return self._lat[idx], self._lon[idx]
+
+        return float(where[0]), float(where[1])
+
+    # -------------------------------------------------------------------------
+    # near
+    # -------------------------------------------------------------------------
+
+    def near(self, where, km):
+        """
+        Function to get the indices of the places within km of a place (name or coordinates)
+        """
+
+        lat, lon = self._coordinates(where)
+
+        # candidate cells
+
+        dlat = int(np.ceil(km / 111.0 / self._cell))
+        dlon = int(np.ceil(km / (111.0 * max(np.cos(np.radians(min(abs(lat) + km / 111.0, 89.9))), 1e-6)) / self._cell))
+
+        row, col = int(np.floor(lat / self._cell)), int(np.floor(lon / self._cell))
+
+        if (2 * dlat + 1) * (2 * dlon + 1) > len(self._grid):
+            candidates = np.arange(len(self._names))
+        else:
+            candidates = [idx for r in range(row - dlat, row + dlat + 1) for c in range(col - dlon, col + dlon + 1) for idx in self._grid.get((r, c), [])]
+            candidates = np.array(candidates, dtype=np.int64)
+
+        if len(candidates) == 0:
+            return candidates
+
+        return candidates[self._distances(lat, lon, candidates) <= km]
+
+    # -------------------------------------------------------------------------
+    # within
+    # -------------------------------------------------------------------------
+
+    def within(self, where, km, event='birth'):
+        """
+        Function to get the references of individuals (or families) with an event within km of a place
+        """
+
+        places = self.near(where, km)
+
+        mask = np.isin(self._event_place, places)
+        if event:
+            mask &= self._event_type == self._events.index(event)
+
+        return [self._owners[owner] for owner in np.unique(self._event_owner[mask])]
+
+    # -------------------------------------------------------------------------
+    # duplicates
+    # -------------------------------------------------------------------------
+
+    def duplicates(self, decimals=4):
+        """
+        Function to get the groups of places sharing the same coordinates
+        """
+
+        if len(self._names) == 0:
+            return []
+
+        coordinates = np.stack([np.round(self._lat, decimals), np.round(self._lon, decimals)], axis=1)
+        _, inverse, counts = np.unique(coordinates, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+
+        groups = []
+        for group in np.flatnonzero(counts > 1):
+            groups += [[self._places[idx] for idx in np.flatnonzero(inverse == group)]]
+
+        return groups
+
+    # -------------------------------------------------------------------------
+    # merge
+    # -------------------------------------------------------------------------
+
+    def merge(self, decimals=4):
+        """
+        Function to replace places sharing the same coordinates by the first one of their group
+        All the references to the merged places are replaced (see Genealogy.replace_places) and the index is updated
+        """
+
+        merged = {}
+        for group in self.duplicates(decimals):
+            for place in group[1:]:
+                merged[place.name] = group[0]
+                display(f"Place [{place.name}] merged with [{group[0].name}]")
+
+        if len(merged) > 0:
+            self._genealogy.replace_places(merged)
+
+            # the events of a merged place move to the place kept
+
+            kept = [place for place in self._places if place.name not in merged]
+            index = {place.name: idx for idx, place in enumerate(kept)}
+            mapping = np.array([index[merged[name].name if name in merged else name] for name in self._names], dtype=np.int64)
+
+            self._event_place = mapping[self._event_place] if len(self._event_place) > 0 else self._event_place
+            self._set_places(kept)
+
+        return merged
+
+    # -------------------------------------------------------------------------
+    # counts
+    # -------------------------------------------------------------------------
+
+    def counts(self):
+        """
+        Function to get the number of events per place and per type of event
+        """
+
+        table = pd.DataFrame({'name': self._names, 'latitude': self._lat, 'longitude': self._lon})
+
+        for number, event in enumerate(self._events):
+            table[event] = np.bincount(self._event_place[self._event_type == number], minlength=len(self._names))
+
+        table['total'] = np.bincount(self._event_place, minlength=len(self._names))
+
+        return table
+
+    # -------------------------------------------------------------------------
+    # heatmap
+    # -------------------------------------------------------------------------
+
+    def heatmap(self, output):
+        """
+        Function to save the number of events per place into a CSV file
+        """
+
+        output_file = Path(output).resolve().with_suffix(".csv")
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.unlink(missing_ok=True)
+
+        self.counts().to_csv(str(output_file), index=False)
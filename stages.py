@@ -0,0 +1,177 @@
+# stages
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package to produce the outputs of a genealogy (GEDCOM, tables, reports...) concurrently
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# -------------------------------------------------------------------------
+#
+# Internal Python Modules
+#
+# -------------------------------------------------------------------------
+
+from common import display
+from logs import capture
+
+Task = namedtuple("Task", "name function after access report")
+
+# --------------------------------------------------------------------------------------------------
+#
+# OutputStage class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class OutputStage:
+    """
+    Class to run the output tasks of a genealogy on a pool of threads:
+        - a task starts as soon as the tasks it comes after are done, it is skipped if one of them failed
+        - a task reads its own snapshot of the genealogy (see Genealogy.snapshot) taken when it starts,
+          a shared task reads (and updates) the genealogy itself and no snapshot is taken while it runs
+        - the records displayed by a report task are captured in their own segment (see logs.capture)
+    """
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, genealogy, workers=4):
+
+        self._genealogy = genealogy
+        self._workers = workers
+
+        # name -> task, in order of addition
+        self._tasks = {}
+
+        self.durations = {}
+
+    # -------------------------------------------------------------------------
+    # add
+    # -------------------------------------------------------------------------
+
+    def add(self, name, function, after=(), access='snapshot', report=False):
+        """
+        Function to add a task: function(genealogy) run after the tasks named
+        access is 'snapshot', 'shared' or None (the function gets None)
+        """
+
+        if name in self._tasks:
+            raise ValueError(f"Task {name} already added")
+
+        for other in after:
+            if other not in self._tasks:
+                raise ValueError(f"Task {name} after unknown task {other}")
+
+        if access not in ('snapshot', 'shared', None):
+            raise ValueError(f"Task {name} with unknown access {access}")
+
+        self._tasks[name] = Task(name, function, tuple(after), access, report)
+
+        return name
+
+    # -------------------------------------------------------------------------
+    # _run
+    # -------------------------------------------------------------------------
+
+    def _run(self, task, genealogy):
+        """
+        Function to run a task in a thread of the pool
+        """
+
+        start = time.monotonic()
+
+        try:
+            if task.report:
+                with capture(task.name):
+                    return task.function(genealogy)
+
+            return task.function(genealogy)
+
+        finally:
+            if task.access == 'snapshot':
+                genealogy.release()
+
+            self.durations[task.name] = time.monotonic() - start
+
+    # -------------------------------------------------------------------------
+    # run
+    # -------------------------------------------------------------------------
+
+    def run(self):
+        """
+        Function to run the tasks, returns the results of the tasks done
+        """
+
+        start = time.monotonic()
+
+        pending = dict(self._tasks)
+        running = {}
+        results = {}
+        failed = set()
+
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="output") as executor:
+
+            while len(pending) > 0 or len(running) > 0:
+
+                # snapshots are taken before a shared task is started
+
+                ready = sorted(pending.values(), key=lambda task: task.access == 'shared')
+                for task in ready:
+                    if any(other in failed for other in task.after):
+                        del pending[task.name]
+                        failed.add(task.name)
+                        display(f"Output {task.name}: skipped", error=True)
+                        continue
+
+                    if any(other not in results for other in task.after):
+                        continue
+
+                    shared = any(other.access == 'shared' for other in running.values())
+                    if shared and task.access is not None:
+                        continue
+
+                    genealogy = self._genealogy.snapshot() if task.access == 'snapshot' else self._genealogy if task.access == 'shared' else None
+
+                    del pending[task.name]
+                    running[executor.submit(self._run, task, genealogy)] = task
+
+                if len(running) == 0:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        results[task.name] = future.result()
+                    except Exception as e:
+                        failed.add(task.name)
+                        display(f"Output {task.name}: {type(e).__name__} {e}", error=True)
+
+        durations = {name: f"{duration:,.2f}s" for name, duration in self.durations.items()}
+        display(durations, title=f"Outputs in {time.monotonic() - start:,.2f}s", verbose=True)
+
+        return results
@@ -0,0 +1,294 @@
+# storage
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with a disk backed store of individuals and families
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+
+# --------------------------------------------------------------------------------------------------
+#
+# DiskStore class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class DiskStore(MutableMapping):
+    """
+    Class of a mapping persisted in SQLite with a write-through LRU cache of the hot objects
+    Objects changed in place are saved again only once touched (when evicted or flushed)
+    Iteration follows the insertion order and streams the objects from disk (without caching them)
+    The connection is shared by the threads using the store (one at a time)
+    """
+
+    _batch = 500
+    _commit = 1000
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self, path, cache_size=1000, mutable=True, load=None):
+
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS records (key BLOB PRIMARY KEY, value BLOB)")
+
+        self._cache_size = cache_size
+
+        # objects changed in place (touched) are saved again when evicted, a store not mutable is read only
+        self._mutable = mutable
+        self._cache = OrderedDict()
+        self._dirty = set()
+        self._writes = 0
+
+        # function applied to the objects read from disk (e.g. to attach them to another store)
+        self._load = load
+
+    # -------------------------------------------------------------------------
+    # _key
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(key):
+        return pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # -------------------------------------------------------------------------
+    # _read
+    # -------------------------------------------------------------------------
+
+    def _read(self, value):
+        """
+        Function to get an object saved
+        """
+
+        value = pickle.loads(value)
+        if self._load is not None:
+            value = self._load(value)
+
+        return value
+
+    # -------------------------------------------------------------------------
+    # _write
+    # -------------------------------------------------------------------------
+
+    def _write(self, key, value):
+        """
+        Function to persist one object (keeping its insertion order)
+        """
+
+        with self._lock:
+            self._db.execute("INSERT INTO records (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                             (self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+
+            self._writes += 1
+            if self._writes % self._commit == 0:
+                self._db.commit()
+
+    # -------------------------------------------------------------------------
+    # _cached
+    # -------------------------------------------------------------------------
+
+    def _cached(self, key, value):
+        """
+        Function to keep an object in the LRU cache (objects evicted are saved again if touched)
+        """
+
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+
+            while len(self._cache) > self._cache_size:
+                old_key, old_value = self._cache.popitem(last=False)
+                if old_key in self._dirty:
+                    self._dirty.discard(old_key)
+                    self._write(old_key, old_value)
+
+    # -------------------------------------------------------------------------
+    # touch
+    # -------------------------------------------------------------------------
+
+    def touch(self, key, value=None):
+        """
+        Function to mark an object changed in place (the cached one if no value): it is saved again when evicted or flushed
+        Ignored by a store not mutable
+        """
+
+        if not self._mutable:
+            return
+
+        with self._lock:
+            if value is None:
+                value = self._cache[key]
+
+            if self._cache_size > 0:
+                self._cached(key, value)
+                self._dirty.add(key)
+            else:
+                self._write(key, value)
+
+    # -------------------------------------------------------------------------
+    # mapping
+    # -------------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            row = self._db.execute("SELECT value FROM records WHERE key = ?", (self._key(key),)).fetchone()
+            if row is None:
+                raise KeyError(key)
+
+            value = self._read(row[0])
+            self._cached(key, value)
+
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._write(key, value)
+            self._dirty.discard(key)
+            self._cached(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._dirty.discard(key)
+            if self._db.execute("DELETE FROM records WHERE key = ?", (self._key(key),)).rowcount == 0:
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._cache:
+                return True
+            return self._db.execute("SELECT 1 FROM records WHERE key = ?", (self._key(key),)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __iter__(self):
+        for key, _ in self._rows(False):
+            yield key
+
+    # -------------------------------------------------------------------------
+    # _rows
+    # -------------------------------------------------------------------------
+
+    def _rows(self, values=True):
+        """
+        Function to stream the keys (and objects) from disk by batch
+        The cached objects are returned instead of their saved copies, the objects read are not cached
+        (an object changed while iterating is saved by the caller: store[key] = value or touch(key, value))
+        """
+
+        with self._lock:
+            cursor = self._db.execute(f"SELECT key{', value' if values else ''} FROM records ORDER BY rowid")
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self._batch)
+            if not rows:
+                break
+
+            for row in rows:
+                key = pickle.loads(row[0])
+                if not values:
+                    yield key, None
+                    continue
+
+                with self._lock:
+                    value = self._cache[key] if key in self._cache else self._read(row[1])
+
+                yield key, value
+
+    def items(self):
+        return self._rows()
+
+    def values(self):
+        return (value for _, value in self._rows())
+
+    # -------------------------------------------------------------------------
+    # flush
+    # -------------------------------------------------------------------------
+
+    def flush(self):
+        """
+        Function to save the objects touched and commit
+        """
+
+        with self._lock:
+            for key in self._dirty:
+                self._write(key, self._cache[key])
+            self._dirty.clear()
+
+            self._db.commit()
+
+    # -------------------------------------------------------------------------
+    # reader
+    # -------------------------------------------------------------------------
+
+    def reader(self, load=None):
+        """
+        Function to open another store on the same file to read the objects saved (e.g. from another thread)
+        The reader sees the objects as they were when opened (read transaction) until it is closed
+        """
+
+        self.flush()
+
+        reader = DiskStore(self._path, self._cache_size, mutable=False, load=load)
+        reader._db.execute("BEGIN")
+        reader._db.execute("SELECT COUNT(*) FROM records").fetchone()
+
+        return reader
+
+    # -------------------------------------------------------------------------
+    # clear
+    # -------------------------------------------------------------------------
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._dirty.clear()
+            self._db.execute("DELETE FROM records")
+            self._db.commit()
+
+    # -------------------------------------------------------------------------
+    # close
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._db.close()
@@ -0,0 +1,92 @@
+"""
+Tests of the GEDCOM ids kept from one run to the next and of the cache of the rendered records
+"""
+
+import json
+
+from objects import Individual, Place
+from genealogy import GIndividual
+from idmap import IdMap, RenderCache
+
+PARIS = {'toponymName': 'Paris', 'countryName': 'France', 'adminName1': 'IDF', 'adminName2': 'Paris', 'lat': 48.85, 'lng': 2.35}
+
+
+def _individual(ref, gedcomid):
+    individual = Individual()
+    individual.ref = ref
+
+    data = individual.data
+    data.gedcomid = gedcomid
+    data.firstname = "Jean"
+    data.lastname = "Dupont"
+    data.birth = True
+    data.birthdate = "1850"
+    data.birthplace = Place('Paris', result=PARIS)
+
+    return GIndividual.load(individual)
+
+
+def test_ids_kept(tmp_path):
+    path = tmp_path / "gedcom.ids.json"
+
+    ids = IdMap(path)
+    assert ids.table('individuals', ['a', 'b', 'c']) == {'a': 'I00001', 'b': 'I00002', 'c': 'I00003'}
+    ids.save()
+
+    # a run of a smaller scope keeps the ids of the others
+    ids = IdMap(path)
+    assert ids.table('individuals', ['c']) == {'c': 'I00003'}
+    ids.save()
+
+    ids = IdMap(path)
+    assert ids.table('individuals', ['d', 'b', 'a']) == {'d': 'I00004', 'b': 'I00002', 'a': 'I00001'}
+
+
+def test_ids_pruned(tmp_path):
+    path = tmp_path / "gedcom.ids.json"
+
+    ids = IdMap(path)
+    assert ids.table('individuals', ['a', 'b', 'c']) == {'a': 'I00001', 'b': 'I00002', 'c': 'I00003'}
+    assert ids.table('families', [('a', 'b')]) == {('a', 'b'): 'F00001'}
+    ids.save()
+
+    ids = IdMap(path)
+    assert ids.table('individuals', ['c', 'a', 'd']) == {'c': 'I00003', 'a': 'I00001', 'd': 'I00004'}
+    ids.save(prune=True)
+
+    saved = json.loads(path.read_text())
+    assert saved['ids']['individuals'] == {'a': 'I00001', 'c': 'I00003', 'd': 'I00004'}
+    assert saved['ids']['families'] == {}
+
+    # the id of a record gone is not given again
+    assert IdMap(path).id('individuals', 'b') == 'I00005'
+
+
+def test_render_cache(tmp_path):
+    path = tmp_path / "gedcom.cache.sqlite"
+    first, second = _individual('a', 'I00001'), _individual('b', 'I00002')
+
+    cache = RenderCache(path)
+    text = cache.render(first)
+    cache.render(second)
+    cache.close()
+    assert text == ''.join(first.lines())
+    assert cache.rendered == 2
+
+    # the counters and the search results of a place are not rendered
+    first.portrait.birthplace.nb = 12
+    first.portrait.birthplace.search = {'query': 'Paris'}
+
+    cache = RenderCache(path)
+    assert cache.render(first) == text
+    cache.close(prune=True)
+    assert (cache.rendered, cache.reused) == (0, 1)
+
+    # the record not written by the last run was dropped
+    first.portrait.firstname = "Pierre"
+
+    cache = RenderCache(path)
+    assert cache.render(first) == ''.join(first.lines())
+    assert cache.render(second) == ''.join(second.lines())
+    cache.close()
+    assert (cache.rendered, cache.reused) == (2, 0)
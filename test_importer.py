@@ -0,0 +1,76 @@
+"""
+Tests of the GEDCOM import: a GEDCOM written, read back and written again is the same
+"""
+
+from objects import Individual, Family, Place
+from genealogy import Genealogy, GIndividual
+from graph import family_key
+from notes import note_table
+
+PARIS = {'toponymName': 'Paris', 'countryName': 'France', 'adminName1': 'IDF', 'adminName2': 'Paris', 'lat': 48.85, 'lng': 2.35}
+
+# longer than a GEDCOM line, with spaces around the places it is split at
+NOTE = "Témoin au mariage : " + " ".join(f"mot{idx}" for idx in range(80)) + "  deux espaces" + "x" * 150 + " fin"
+
+
+def _ref(idx):
+    return f"n=name{idx}&p=first{idx}"
+
+
+def _genealogy(size):
+    """
+    Function to get a genealogy of ancestors: the parents of idx are 2 * idx + 1 and 2 * idx + 2
+    """
+
+    genealogy = Genealogy(0, False, False, False)
+
+    for idx in range(size):
+        individual = Individual()
+        individual.ref = _ref(idx)
+
+        data = individual.data
+        data.url = f"https://gw.geneanet.org/test?lang=fr&{_ref(idx)}"
+        data.firstname = f"First{idx}"
+        data.lastname = f"Name{idx % 5}"
+        data.sex = 'M' if idx % 2 else 'F'
+        data.birth = True
+        data.birthdate = f"{1 + idx % 28} JAN {1800 + idx}"
+        data.birthplace = Place('Paris', result=PARIS)
+        data.notes = [note_table.add(NOTE if idx == 0 else f"note {idx}\nsecond line")]
+
+        if 2 * idx + 2 < size:
+            individual.parentsref = [_ref(2 * idx + 1), _ref(2 * idx + 2)]
+
+        if idx > 0:
+            child = (idx - 1) // 2
+            family = Family()
+            family.spousesref = [_ref(2 * child + 1), _ref(2 * child + 2)]
+            family.childsref = [_ref(child)]
+            family.data.marriage = True
+            family.data.marriagedate = "ABT 1850"
+            individual.familiesref = [family]
+
+        genealogy._individuals[individual.ref] = GIndividual.load(individual)
+        for family in genealogy._individuals[individual.ref].families:
+            genealogy._families.setdefault(family_key(family.spousesref), family)
+
+    return genealogy
+
+
+def test_round_trip(tmp_path):
+    first = tmp_path / "first.ged"
+    second = tmp_path / "second.ged"
+
+    _genealogy(15).write(first)
+
+    genealogy = Genealogy(0, False, False, False)
+    genealogy.seed(first)
+    genealogy.write(second)
+
+    assert len(genealogy.individuals) == 15
+    assert len(genealogy.families) == 7
+    assert second.read_text(encoding='utf-8') == first.read_text(encoding='utf-8')
+
+    # the long note is split in CONC lines and read back with its spaces
+    assert "1 CONC " in first.read_text(encoding='utf-8')
+    assert genealogy.individuals[_ref(0)].notes == [NOTE]
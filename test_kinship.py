@@ -0,0 +1,106 @@
+"""
+Tests of the kinship queries (Sosa numbers, implex, common ancestors, memoization)
+"""
+
+from types import SimpleNamespace
+
+from objects import Individual
+from genealogy import GIndividual
+from graph import RelationGraph
+from kinship import Kinship
+
+
+def _genealogy(parents, sexes):
+    """
+    Function to get a genealogy of the individuals given by their parents (father, mother)
+    """
+
+    graph = RelationGraph()
+    individuals = {}
+
+    for ref, sex in sexes.items():
+        individual = Individual()
+        individual.ref = ref
+        individual.data.sex = sex
+        individual.parentsref = list(parents.get(ref, []))
+        individuals[ref] = GIndividual.load(individual)
+        graph.add(ref, individuals[ref])
+
+    return SimpleNamespace(graph=graph, individuals=individuals)
+
+
+# root's parents are first cousins: their fathers are brothers, sons of x and y, x is the son of z
+PARENTS = {
+    'root': ('father', 'mother'),
+    'father': ('uncle1', 'aunt1'),
+    'mother': ('uncle2', 'aunt2'),
+    'uncle1': ('x', 'y'),
+    'uncle2': ('x', 'y'),
+    'x': ('z', None),
+}
+
+SEXES = {
+    'root': 'M', 'father': 'M', 'mother': 'F', 'uncle1': 'M', 'aunt1': 'F', 'uncle2': 'M', 'aunt2': 'F',
+    'x': 'M', 'y': 'F', 'z': 'M',
+}
+
+
+def test_sosa_numbers_of_every_line():
+    kinship = Kinship(_genealogy(PARENTS, SEXES))
+
+    sosa = kinship.sosa('root')
+
+    assert sosa['root'] == [1]
+    assert sosa['mother'] == [3]
+    assert sorted(sosa['x']) == [8, 12]
+    assert sorted(sosa['y']) == [9, 13]
+    # the ancestors of an individual reached twice are numbered along both lines
+    assert sorted(sosa['z']) == [16, 24]
+
+
+def test_implex():
+    kinship = Kinship(_genealogy(PARENTS, SEXES))
+
+    assert kinship.implex('root') == {'x': 2, 'y': 2, 'z': 2}
+
+    rates = kinship.implex_rate('root')
+    assert rates[0] == rates[1] == rates[2] == 0
+    assert rates[3] == 0.5
+    assert rates[4] == 0.5
+
+
+def test_implex_of_many_generations():
+    # 60 generations of a single couple: 2 ** 59 lines to the last one, their Sosa numbers are not enumerated
+    parents = {f"man{idx}": (f"man{idx + 1}", f"woman{idx + 1}") for idx in range(60)}
+    parents.update({f"woman{idx}": (f"man{idx + 1}", f"woman{idx + 1}") for idx in range(1, 60)})
+    sexes = {f"man{idx}": 'M' for idx in range(61)}
+    sexes.update({f"woman{idx}": 'F' for idx in range(1, 61)})
+
+    kinship = Kinship(_genealogy(parents, sexes))
+
+    assert kinship.implex('man0')['man60'] == 2 ** 59
+    assert kinship.sosa('man0')['man60'] == [2 ** 60 + 2 * idx for idx in range(Kinship._sosa_limit)]
+    assert kinship.implex_rate('man0')[60] == 1 - 2 / 2 ** 60
+
+
+def test_mrca_and_relationship():
+    kinship = Kinship(_genealogy(PARENTS, SEXES))
+
+    assert kinship.mrca('father', 'mother') == [('x', 2, 2), ('y', 2, 2)]
+    assert kinship.relationship('father', 'mother') == '1st cousin'
+    assert kinship.relationship('root', 'x') == 'great-grandfather'
+    assert kinship.mrca('aunt1', 'aunt2') == []
+
+
+def test_memoized_until_an_edge_is_added():
+    genealogy = _genealogy(PARENTS, SEXES)
+    kinship = Kinship(genealogy)
+
+    assert 'aunt1' not in kinship.ancestors('mother')
+
+    # no individual added, only an edge between two known individuals
+    size = len(genealogy.graph)
+    genealogy.graph.add('aunt2', SimpleNamespace(parentsref=['aunt1'], families=[]))
+    assert len(genealogy.graph) == size
+
+    assert 'aunt1' in kinship.ancestors('mother')
@@ -0,0 +1,88 @@
+"""
+Tests of the linkage of the individuals found in several repositories
+"""
+
+from genealogy import Genealogy
+from importer import GedcomImporter
+from linkage import Linkage
+
+GEDCOM = """0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME Jean /Dupont/
+1 SEX M
+1 BIRT
+2 DATE 12 MAR 1850
+1 SOUR https://gw.geneanet.org/alice?lang=fr&n=dupont&p=jean
+0 @I2@ INDI
+1 NAME Jean /Dupont/
+1 SEX M
+1 BIRT
+2 DATE 1850
+1 SOUR https://gw.geneanet.org/bob?lang=fr&n=dupond&p=jean
+0 @I3@ INDI
+1 NAME Marie /Dupont/
+1 SEX F
+1 BIRT
+2 DATE 1852
+1 SOUR https://gw.geneanet.org/bob?lang=fr&n=dupont&p=marie
+0 @I4@ INDI
+1 NAME Jean /Dupont/
+1 SEX M
+1 BIRT
+2 DATE 1850
+1 SOUR https://gw.geneanet.org/alice?lang=fr&n=dupont&p=jean&oc=1
+0 TRLR
+"""
+
+
+def _genealogy(tmp_path):
+    path = tmp_path / "linkage.ged"
+    path.write_text(GEDCOM, encoding='utf-8')
+
+    genealogy = Genealogy(0, False, False, False)
+    genealogy.seed(path)
+
+    return genealogy
+
+
+def test_pairs_of_different_repositories(tmp_path):
+    genealogy = _genealogy(tmp_path)
+    refs = list(genealogy.individuals)
+
+    linkage = Linkage(genealogy)
+    pairs = {(refs[i], refs[j]) for i, j in linkage.pairs()}
+
+    # same person in alice and bob, not twice in alice and not a woman
+    assert pairs == {(refs[0], refs[1]), (refs[1], refs[3])}
+
+    # one individual per repository in a cluster, the first scraped is kept
+    assert linkage.mapping() == {refs[1]: refs[0]}
+
+
+def test_pairs_by_chunks(tmp_path):
+    genealogy = _genealogy(tmp_path)
+
+    expected = Linkage(genealogy).pairs()
+
+    linkage = Linkage(genealogy)
+    linkage._chunk = 1
+
+    assert linkage.pairs() == expected
+
+
+def test_merged_url_kept_as_source(tmp_path):
+    genealogy = _genealogy(tmp_path)
+
+    genealogy.link()
+
+    gedcom = tmp_path / "linked.ged"
+    gedcom.write_text(genealogy.gedcom, encoding='utf-8')
+
+    assert "1 SOUR https://gw.geneanet.org/alice?lang=fr&n=dupont&p=jean\n1 SOUR https://gw.geneanet.org/bob?lang=fr&n=dupond&p=jean\n" \
+        in gedcom.read_text(encoding='utf-8')
+
+    # read back, the url is the first source and the others are kept
+    individuals = [individual for individual, _ in GedcomImporter(gedcom).individuals()]
+    assert individuals[0].data.url == "https://gw.geneanet.org/alice?lang=fr&n=dupont&p=jean"
+    assert individuals[0].data.sources == ["https://gw.geneanet.org/bob?lang=fr&n=dupond&p=jean"]
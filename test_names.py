@@ -0,0 +1,29 @@
+"""
+Tests of the keys of the names: particles, articles and phonetic variants
+"""
+
+from names import core, NameIndex
+
+
+def test_core_without_prepositions():
+    assert core("d'Orléans") == core("D’Orléans") == core("Orléans") == "orleans"
+    assert core("de la Fontaine") == core("La Fontaine") == core("Lafontaine") == "lafontaine"
+    assert core("du Bellay") == core("Bellay")
+    assert core("L'Homme") == core("Lhomme") == "lhomme"
+
+    # a particle alone is the name
+    assert core("Des") == "des"
+
+
+def test_find_variants():
+    index = NameIndex()
+    index.add('a', "Louis", "d'Orléans")
+    index.add('b', "Louis", "Orléans")
+    index.add('c', "Jean", "de la Fontaine")
+    index.add('d', "Jean", "Lafontaine")
+    index.add('e', "Jean", "Fontaine")
+
+    assert index.find("Orléans", kind='core') == {'a', 'b'}
+    assert index.find("La Fontaine", "Jean", kind='core') == {'c', 'd'}
+    assert index.find("Lafontaine", kind='name') == {'d'}
+    assert set(index.variants('core')) == {'orleans', 'lafontaine'}
@@ -0,0 +1,35 @@
+"""
+Tests of the clusters of place name variants
+"""
+
+from places import PlaceIndex
+
+
+def test_variants_merged():
+    places = PlaceIndex()
+
+    first = places.cluster("Andenne, Namur, Wallonie, Belgique")
+
+    assert places.cluster("ANDENNE, Namur, Wallonie, Belgique") == first
+    assert places.cluster("Andenne, Belgique") == first
+
+
+def test_ambiguous_name_not_merged():
+    places = PlaceIndex()
+
+    gironde = places.cluster("Saint-Martin, Gironde, Nouvelle-Aquitaine, France")
+    var = places.cluster("Saint-Martin, Var, Provence-Alpes-Côte d'Azur, France")
+    assert gironde != var
+
+    # the same commune in two departments: the name without department is a place of its own
+    bare = places.cluster("Saint-Martin, France")
+    assert bare not in (gironde, var)
+
+
+def test_more_specific_name_not_merged():
+    places = PlaceIndex()
+
+    bare = places.cluster("Sainte-Marie, France")
+
+    assert places.cluster("Sainte-Marie, Gironde, Nouvelle-Aquitaine, France") != bare
+    assert places.cluster("Sainte-Marie, France") == bare
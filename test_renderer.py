@@ -0,0 +1,35 @@
+"""
+Tests of the rendering of the reports into PDF files by a spawned worker process
+"""
+
+import json
+
+from renderer import ReportRenderer
+
+RECORDS = [
+    {'kind': 'heading', 'message': "Genealogy report"},
+    {'kind': 'section', 'message': "Individuals"},
+    {'kind': 'titled', 'title': "Jean Dupont", 'message': "Né le 12 mars 1850 à Paris"},
+    {'kind': 'table', 'title': "Places", 'data': {'columns': ["Place", "Count"], 'rows': [["Paris", "12"], ["Lyon", "3"]]}},
+    {'kind': 'data', 'title': "Parameters", 'data': {'ascendants': True, 'level': 3}},
+    {'kind': 'error', 'message': "Individual: page not found"},
+] + [{'kind': 'text', 'message': f"line {idx}"} for idx in range(200)]
+
+
+def test_render_in_a_spawned_process(tmp_path):
+    spool = tmp_path / "report.jsonl"
+    spool.write_text("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in RECORDS), encoding="utf-8")
+
+    done = []
+
+    renderer = ReportRenderer()
+    future = renderer.submit(spool, tmp_path / "report", done.append)
+    output, pages, _ = future.result(timeout=120)
+    renderer.close()
+
+    assert output == tmp_path / "report.pdf"
+    assert output.read_bytes().startswith(b"%PDF")
+    # 216 lines of 62 a page (landscape A4)
+    assert pages == 4
+    assert done == [future]
+    assert not (tmp_path / "report.tmp").exists()
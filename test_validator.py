@@ -0,0 +1,76 @@
+"""
+Tests of the single pass validator of the GEDCOM lines
+"""
+
+from validator import GedcomValidator
+
+GEDCOM = """0 HEAD
+1 CHAR UTF-8
+1 SUBM @B00000@
+
+0 @B00000@ SUBM
+1 NAME Laurent Burais
+
+0 @I00001@ INDI
+1 NAME Jean /Dupont/
+1 BIRT
+2 DATE ABT 12 MAR 1850
+1 FAMS @F00001@
+1 NOTE @N00001@
+
+0 @I00002@ INDI
+1 NAME Marie /Durand/
+1 FAMS @F00001@
+
+0 @F00001@ FAM
+1 HUSB @I00001@
+1 WIFE @I00002@
+1 MARR
+2 DATE BET 1870 AND 1875
+
+0 @N00001@ NOTE first line
+1 CONT second line
+1 CONC  continued
+
+0 TRLR"""
+
+
+def _check(text, size):
+    validator = GedcomValidator()
+    for start in range(0, len(text), size):
+        validator.feed(text[start:start + size])
+    return validator.close()
+
+
+def test_valid_whatever_the_chunks():
+    for size in (1, 7, 64, len(GEDCOM)):
+        check = _check(GEDCOM, size)
+        assert check['status'] == 'ok', check['message']
+        assert check['stats']['INDI'] == 2
+        assert check['stats']['FAM'] == 1
+        assert check['stats']['lines'] == GEDCOM.count("\n") + 1
+
+
+def test_errors():
+    text = GEDCOM.replace("2 DATE ABT 12 MAR 1850", "2 DATE 12/03/1850") \
+        .replace("1 WIFE @I00002@", "1 WIFE @F00001@") \
+        .replace("1 NOTE @N00001@", "1 NOTE @N00002@") \
+        .replace("1 CONC  continued", "2 CONC  continued") \
+        .replace("\n0 TRLR", "")
+
+    check = _check(text, 13)
+
+    assert check['status'] == 'ko'
+    messages = "\n".join(check['message'])
+    assert "invalid DATE [12/03/1850]" in messages
+    assert "WIFE @F00001@ is a FAM record, not INDI" in messages
+    assert "NOTE @N00002@ not defined" in messages
+    assert "CONC at level 2 instead of 1" in messages
+    assert "file does not end with 0 TRLR" in messages
+
+
+def test_long_line():
+    check = _check(GEDCOM.replace("first line", "x" * 300), 100)
+
+    assert check['status'] == 'ko'
+    assert check['message'] == ["line 25: line longer than 255 characters"]
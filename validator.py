@@ -0,0 +1,231 @@
+# validator
+#
+# Copyright (C) 2025  Laurent Burais
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the Affero GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Package with a single pass validator of the GEDCOM lines as they are written
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python Modules
+#
+# -------------------------------------------------------------------------
+
+import re
+
+# -------------------------------------------------------------------------
+# DATE grammar (GEDCOM 5.5.1)
+# -------------------------------------------------------------------------
+
+_month = r'(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)'
+_year = r'\d{1,4}(?:/\d{2})?(?: B\.C\.)?'
+_date = rf'(?:(?:(?:0?[1-9]|[12]\d|3[01]) )?{_month} )?{_year}'
+
+_date_value = re.compile(
+    rf'^(?:{_date}'
+    rf'|(?:ABT|CAL|EST) {_date}'
+    rf'|(?:BEF|AFT) {_date}'
+    rf'|BET {_date} AND {_date}'
+    rf'|FROM {_date}(?: TO {_date})?'
+    rf'|TO {_date}'
+    rf'|INT {_date} \(.*\)'
+    rf'|\(.*\))$'
+)
+
+_line = re.compile(r'^(\d{1,2}) (?:(@[^@ ]+@) )?([A-Za-z0-9_]+)(?: (.*))?$')
+
+_pointer = re.compile(r'^@[^@ ]+@$')
+
+# --------------------------------------------------------------------------------------------------
+#
+# GedcomValidator class
+#
+# --------------------------------------------------------------------------------------------------
+
+
+class GedcomValidator:
+    """
+    Class to check GEDCOM text fed by chunks:
+        - line syntax and level nesting (HEAD first, TRLR last)
+        - pointers defined once and references to records of the right type
+        - CONT/CONC levels and the length of the lines
+        - DATE values
+    """
+
+    _max_length = 255
+    _max_errors = 100
+
+    # tag -> type of the record referenced
+    _references = {
+        'FAMS': 'FAM',
+        'FAMC': 'FAM',
+        'HUSB': 'INDI',
+        'WIFE': 'INDI',
+        'CHIL': 'INDI',
+        'NOTE': 'NOTE',
+        'SUBM': 'SUBM',
+        'REPO': 'REPO',
+    }
+
+    # -------------------------------------------------------------------------
+    # __init__
+    # -------------------------------------------------------------------------
+
+    def __init__(self):
+
+        self._partial = ""
+        self._number = 0
+
+        self._level = None
+        self._parent_level = 0
+        self._last = None
+
+        self._defined = {}
+        # (pointer, type expected) -> line and tag of its first reference
+        self._referenced = {}
+
+        self._errors = []
+        self._count = 0
+
+        self._stats = {}
+
+    # -------------------------------------------------------------------------
+    # _error
+    # -------------------------------------------------------------------------
+
+    def _error(self, message):
+        self._count += 1
+        if len(self._errors) < self._max_errors:
+            self._errors += [f"line {self._number}: {message}"]
+
+    # -------------------------------------------------------------------------
+    # feed
+    # -------------------------------------------------------------------------
+
+    def feed(self, text):
+        """
+        Function to check a chunk of GEDCOM text (lines may be split between chunks)
+        """
+
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+
+        for line in lines:
+            self._check(line)
+
+    # -------------------------------------------------------------------------
+    # _check
+    # -------------------------------------------------------------------------
+
+    def _check(self, line):
+        """
+        Function to check one line
+        """
+
+        self._number += 1
+
+        # blank lines between records are tolerated
+        if len(line.strip()) == 0:
+            return
+
+        if len(line) > self._max_length:
+            self._error(f"line longer than {self._max_length} characters")
+
+        match = _line.match(line)
+        if match is None:
+            self._error(f"invalid line [{line[:50]}]")
+            return
+
+        level, xref, tag, value = int(match.group(1)), match.group(2), match.group(3), match.group(4)
+
+        # level nesting
+
+        if self._level is None:
+            if level != 0 or tag != 'HEAD':
+                self._error("file does not start with 0 HEAD")
+        elif level > self._level + 1:
+            self._error(f"level {level} after level {self._level}")
+
+        if self._last == 'TRLR':
+            self._error("line after 0 TRLR")
+
+        self._level = level
+
+        if level == 0:
+            self._last = tag
+            self._stats[tag] = self._stats.get(tag, 0) + 1
+
+        # CONT/CONC continue the line above them
+
+        if tag in ('CONT', 'CONC'):
+            if level != self._parent_level + 1:
+                self._error(f"{tag} at level {level} instead of {self._parent_level + 1}")
+        else:
+            self._parent_level = level
+
+        # pointers
+
+        if xref is not None:
+            if level != 0:
+                self._error(f"pointer {xref} defined at level {level}")
+            elif xref in self._defined:
+                self._error(f"pointer {xref} defined twice")
+            else:
+                self._defined[xref] = tag
+
+        if value is not None and tag in self._references and _pointer.match(value):
+            if level > 0:
+                # first reference of a pointer for each type expected
+                self._referenced.setdefault((value, self._references[tag]), (self._number, tag))
+
+        # DATE
+
+        if tag == 'DATE' and (value is None or not _date_value.match(value)):
+            self._error(f"invalid DATE [{value}]")
+
+    # -------------------------------------------------------------------------
+    # close
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        """
+        Function to end the check and get the result: status, messages and number of records per type
+        """
+
+        if len(self._partial) > 0:
+            self._check(self._partial)
+            self._partial = ""
+
+        if self._last != 'TRLR':
+            self._error("file does not end with 0 TRLR")
+
+        for (pointer, kind), (number, tag) in self._referenced.items():
+            if pointer not in self._defined:
+                self._count += 1
+                if len(self._errors) < self._max_errors:
+                    self._errors += [f"line {number}: {tag} {pointer} not defined"]
+            elif self._defined[pointer] != kind:
+                self._count += 1
+                if len(self._errors) < self._max_errors:
+                    self._errors += [f"line {number}: {tag} {pointer} is a {self._defined[pointer]} record, not {kind}"]
+
+        if self._count > len(self._errors):
+            self._errors += [f"... {self._count - len(self._errors):,} more errors"]
+
+        return {
+            'status': 'ok' if self._count == 0 else 'ko',
+            'message': self._errors,
+            'stats': {'lines': self._number, **self._stats},
+        }